@@ -0,0 +1,110 @@
+"""
+Measure how long a fresh interpreter takes to import the resources, and to build one model.
+
+Each scenario runs in a new Python process, so nothing is already imported or built.  The
+"every resource" row imports every resource module and builds every model, which is what
+importing fawlty.resources used to cost.
+
+Each median is compared with the one recorded in import_time.json, beside this file, so that
+a change which makes importing slower shows up as a positive delta.  Timings vary between
+machines, so record a baseline on the machine being measured before making changes.
+
+Run from the top of the repository with ``python -m benchmarks.import_time``, adding
+``--record`` to save the results as the new baseline.
+"""
+
+# Built in imports
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+# Constants
+RUNS = 15
+BASELINE_FILE = os.path.join(os.path.dirname(__file__), "import_time.json")
+
+BUILD_ALL = """
+import importlib
+from fawlty.resources import RESOURCE_MODULES
+from fawlty.resources.base import ResourceBase
+for name in RESOURCE_MODULES:
+    importlib.import_module(f"fawlty.resources.{name}")
+def build(cls):
+    for sub in cls.__subclasses__():
+        sub.model_rebuild()
+        build(sub)
+build(ResourceBase)
+"""
+
+SCENARIOS = {
+    "baseline (pydantic + requests)": "import pydantic, requests",
+    "import fawlty.resources": "import fawlty.resources",
+    "Silence only": (
+        "from fawlty.resources.silence import Silence\n"
+        "Silence(check='check-cpu', subscription='linux', "
+        "metadata={'name': 'linux:check-cpu', 'namespace': 'default'})"
+    ),
+    "every resource": BUILD_ALL,
+}
+
+TIMED = """
+import time
+start = time.perf_counter()
+exec(compile({code!r}, "<scenario>", "exec"))
+print(time.perf_counter() - start)
+"""
+
+
+def time_scenario(code: str) -> float:
+    """
+    Return the median seconds a fresh interpreter takes to run some code.
+    """
+
+    times = []
+    for _ in range(RUNS):
+        out = subprocess.run(
+            [sys.executable, "-c", TIMED.format(code=code)],
+            capture_output=True, text=True, check=True,
+        )
+        times.append(float(out.stdout))
+
+    return statistics.median(times)
+
+
+def load_baseline() -> dict:
+    """
+    Return the recorded median milliseconds for each scenario, or an empty dict if no
+    baseline has been recorded.
+    """
+
+    try:
+        with open(BASELINE_FILE, encoding="utf-8") as baseline:
+            return json.load(baseline)
+    except FileNotFoundError:
+        return {}
+
+
+def main():
+    """
+    Time each scenario and print the results, with their change from the baseline.
+    """
+
+    baseline = load_baseline()
+    results = {}
+    for name, code in SCENARIOS.items():
+        results[name] = round(time_scenario(code) * 1e3, 1)
+        line = f"{name:<32} {results[name]:8.1f} ms"
+        if name in baseline:
+            line += f"  ({results[name] - baseline[name]:+.1f} ms from the recorded median)"
+        print(line)
+
+    if "--record" in sys.argv[1:]:
+        with open(BASELINE_FILE, "w", encoding="utf-8") as out:
+            json.dump(results, out, indent=4)
+            out.write("\n")
+        print(f"Recorded the baseline in {BASELINE_FILE}")
+
+
+if __name__ == "__main__":
+    main()
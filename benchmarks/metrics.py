@@ -0,0 +1,61 @@
+"""
+Measure the cost of recording client metrics, by timing resource_get against a canned
+response with and without a ClientMetrics attached.
+
+Run from the top of the repository with ``python -m benchmarks.metrics``.
+"""
+
+# Built in imports
+import json
+import time
+import timeit
+from types import SimpleNamespace
+
+# Our imports
+from fawlty.metrics import ClientMetrics
+from fawlty.resources.namespace import Namespace
+from fawlty.sensu_client import SensuClient
+from fawlty.sensu_server import SensuServer
+from fawlty.sensu_token import SensuToken
+
+# Constants
+NUMBER = 2000
+REPEAT = 5
+SIZES = (1, 100)
+
+
+def build_client(size: int) -> SensuClient:
+    """
+    Build a client whose session answers every request with a collection of namespaces.
+    """
+
+    content = json.dumps([{"name": f"ns{i}"} for i in range(size)]).encode()
+    response = SimpleNamespace(status_code=200, headers={}, content=content)
+
+    client = SensuClient(server=SensuServer(host="localhost"))
+    client.token = SensuToken(
+        access_token="token", refresh_token="refresh", expires_at=int(time.time()) + 3600
+    )
+    client.session.request = lambda *args, **kwargs: response
+
+    return client
+
+
+def main():
+    """
+    Time resource_get with metrics disabled and enabled, and print the results.
+    """
+
+    for size in SIZES:
+        client = build_client(size)
+        for name, metrics in (("disabled", None), ("enabled", ClientMetrics())):
+            client.metrics = metrics
+            best = min(timeit.repeat(
+                lambda: client.resource_get(Namespace, "/api/core/v2/namespaces"),
+                number=NUMBER, repeat=REPEAT,
+            )) / NUMBER
+            print(f"{size:>4} objects, metrics {name:<9} {best * 1e6:10.1f} us per call")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""
+Compare the request body serializers on a large check resource.
+
+Run from the top of the repository with ``python -m benchmarks.serializers``.  The "model_dump + json.dumps" row is the
+encode path used by the client before serializers were pluggable.
+"""
+
+# Built in imports
+import json
+import timeit
+
+# Our imports
+from fawlty.resources.check import Check
+from fawlty.serializers import JSONSerializer, PydanticSerializer, OrjsonSerializer
+from fawlty.exceptions import SensuClientError
+
+# Constants
+NUMBER = 200
+REPEAT = 5
+
+
+def build_check() -> Check:
+    """
+    Build a check with a large command and many output metric thresholds.
+    """
+
+    return Check(
+        command="/usr/lib/nagios/plugins/check_stuff --verbose " * 400,
+        subscriptions=["linux", "web"],
+        metadata={"name": "big-check", "namespace": "default"},
+        output_metric_thresholds=[
+            {
+                "name": f"metric_{i}",
+                "tags": [{"name": "host", "value": f"web{i}"}],
+                "thresholds": [{"max": "90", "status": 2}, {"min": "10", "status": 1}],
+            }
+            for i in range(250)
+        ],
+    )
+
+
+def main():
+    """
+    Time each serializer and print the results.
+    """
+
+    check = build_check()
+    candidates = {
+        "model_dump + json.dumps": lambda: json.dumps(check.model_dump()),
+        "JSONSerializer": lambda s=JSONSerializer(): s.dumps(check),
+        "PydanticSerializer": lambda s=PydanticSerializer(): s.dumps(check),
+    }
+    try:
+        candidates["OrjsonSerializer"] = lambda s=OrjsonSerializer(): s.dumps(check)
+    except SensuClientError:
+        print("orjson is not installed, skipping OrjsonSerializer")
+
+    print(f"Body size: {len(PydanticSerializer().dumps(check))} bytes")
+    for name, func in candidates.items():
+        best = min(timeit.repeat(func, number=NUMBER, repeat=REPEAT)) / NUMBER
+        print(f"{name:<25} {best * 1e6:10.1f} us per call")
+
+
+if __name__ == "__main__":
+    main()
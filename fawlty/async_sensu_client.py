@@ -0,0 +1,793 @@
+"""
+Implements an asyncio based Sensu client, along with a synchronous facade that runs it on a
+background event loop.
+
+The asynchronous client requires the optional "httpx" dependency, which can be installed with
+the "async" extra (``pip install fawlty[async]``).
+"""
+
+# Built in imports
+import asyncio
+import contextvars
+import threading
+import time
+
+# 3rd party imports
+try:
+    import httpx
+except ImportError:  # pragma: no cover
+    httpx = None
+
+# Our imports
+from fawlty.sensu_client import BaseSensuClient
+from fawlty.lazy import LazyResource
+from fawlty.sensu_token import SensuToken
+from fawlty.pagination import CONTINUE_HEADER, get_page_sizer
+from fawlty.token_refresher import DEFAULT_LEAD_TIME, DEFAULT_RETRY_INTERVAL, MIN_WAIT
+from fawlty.deadline import effective_timeout, within_deadline, remaining
+from fawlty.tracing import start_span
+from fawlty.singleflight import AsyncSingleFlight
+from fawlty.exceptions import (
+    SensuNeedRefresh, SensuAuthError, SensuClientError, SensuError, SensuConnectionError,
+    SensuTimeoutError
+)
+
+# Constants
+DEFAULT_MAX_CONNECTIONS = 100
+
+
+def _httpx_timeout(timeout):
+    """
+    Convert a timeout, as SensuServer.timeout and effective_timeout return them, for httpx.
+
+    :param timeout: A number of seconds, a (connect, read) tuple, or None for no timeout.
+    """
+
+    if isinstance(timeout, tuple):
+        return httpx.Timeout(None, connect=timeout[0], read=timeout[1])
+
+    return httpx.Timeout(timeout)
+
+
+class AsyncSensuClient(BaseSensuClient):
+    """
+    An asyncio based Sensu client.  All calls share one pooled set of connections, so a single
+    event loop can have many requests in flight at once.
+    """
+
+    # pylint: disable=R0913,R0914
+    def __init__(
+        self, server=None, max_connections=DEFAULT_MAX_CONNECTIONS, transport=None,
+        retry_policy=None, serializer=None, *, timeout=None, metrics=None, tracer=None,
+        rate_limiter=None, concurrency_limiter=None, token_cache=None, api_key=None
+    ):
+        """
+        Initialize a new asynchronous Sensu client.
+
+        :param server: The SensuServer to connect to.
+        :param max_connections: The maximum number of pooled connections.
+        :param transport: An optional httpx transport, mainly useful for testing.
+        :param timeout: A default timeout for requests, overriding the server's settings.
+                        As with SensuClient, there is no timeout unless one is set here or
+                        on the server (httpx's own default of 5 seconds is not used).
+        :param retry_policy: The default RetryPolicy for calls (default is no retries).
+        :param serializer: The Serializer for request bodies (default is PydanticSerializer).
+        :param metrics: An optional ClientMetrics to record calls in.
+        :param tracer: An optional Tracer to record spans with.
+        :param rate_limiter: An optional RateLimiter capping the rate of requests.
+        :param concurrency_limiter: An optional AIMDLimiter capping the requests in flight.
+        :param token_cache: An optional FileTokenCache to share login tokens through.
+        :param api_key: An API key to authenticate with, instead of logging in.
+        """
+
+        if httpx is None:
+            raise SensuClientError(
+                "AsyncSensuClient requires httpx - install fawlty with the 'async' extra"
+            )
+
+        super().__init__(
+            server=server, retry_policy=retry_policy, serializer=serializer, timeout=timeout,
+            metrics=metrics, tracer=tracer, rate_limiter=rate_limiter,
+            concurrency_limiter=concurrency_limiter, token_cache=token_cache, api_key=api_key,
+        )
+        self._refresh_lock = None
+        self._refresher_task = None
+        self.single_flight = AsyncSingleFlight()
+
+        keep_alive = server.keep_alive if server else True
+        headers = {"Content-Type": "application/json"}
+        options = {"timeout": _httpx_timeout(self._timeout())}
+        if server:
+            headers["Accept-Encoding"] = server.accept_encoding
+            options["verify"] = server.ssl_context()
+
+        self.session = httpx.AsyncClient(
+            headers=headers,
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_connections if keep_alive else 0,
+            ),
+            transport=transport,
+            **options,
+        )
+        if api_key is not None:
+            self.use_api_key(api_key)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.aclose()
+
+    async def aclose(self):
+        """
+        Close the pooled connections held by the client.
+        """
+        await self.stop_token_refresher()
+        await self.session.aclose()
+
+    # pylint: disable=R0913,R0914
+    async def _make_call(
+        self, method, path, fields=None, use_filter=True, *, params=None, retry_policy=None,
+        headers=None, timeout=None, resource=None
+    ):
+        """
+        Wraps the call to httpx to help manage session timeouts and token refreshes.
+
+        :param method: The HTTP method to use.
+        :param path: The path to the API endpoint.
+        :param fields: The body to send; objects and dicts are serialized (default is None).
+        :param use_filter: Whether to use the call_filter (default is True).
+        :param params: Query string parameters to send (default is None).
+        :param retry_policy: The RetryPolicy to use (default is the client's policy).
+        :param headers: Extra headers to send (default is None).
+        :param timeout: A timeout for each attempt, overriding the client's (default is None).
+        :param resource: The resource class the call is for, used in metrics (default is None).
+        :return: The response from the server.
+        """
+
+        with start_span(
+            self.tracer, "fawlty.call", method=method, path=path,
+            resource=getattr(resource, "__name__", None),
+        ) as span:
+            if use_filter:
+                # The token found to need refreshing, so a refresh made meanwhile by
+                # another caller isn't repeated
+                token = self.token
+                try:
+                    self.call_filter()
+                except SensuNeedRefresh:
+                    await self.single_flight_refresh(stale_token=token)
+
+            url = self.server.api_url + path
+            fields, headers = self._prepare_body(fields, headers)
+            span.set_attribute("bytes_out", len(fields) if isinstance(fields, bytes) else 0)
+            if params:
+                # httpx replaces, rather than extends, a query string already in the URL
+                url = httpx.URL(url).copy_merge_params(params)
+                params = None
+
+            policy = retry_policy or self.retry_policy
+            started = time.monotonic()
+            attempt = 0
+            while True:
+                attempt += 1
+                try:
+                    with start_span(self.tracer, "fawlty.attempt", attempt=attempt) as sent:
+                        r = await self._throttled_send(
+                            method, url, path, timeout, content=fields, params=params,
+                            headers=headers,
+                        )
+                        sent.set_attribute("status_code", r.status_code)
+                except (httpx.TransportError, asyncio.TimeoutError) as err:
+                    delay = policy.next_delay(
+                        method, attempt, started, error=True
+                    ) if policy else None
+                    if within_deadline(delay) is None:
+                        if self.metrics is not None:
+                            self._record_call(
+                                method, path, None, resource=resource, started=started,
+                                attempts=attempt, body=fields,
+                            )
+                        if isinstance(err, (httpx.TimeoutException, asyncio.TimeoutError)):
+                            raise SensuTimeoutError(
+                                f"Timed out calling {url} ({err})"
+                            ) from err
+                        raise SensuConnectionError(
+                            f"Failed to connect to {url} ({err})"
+                        ) from err
+                else:
+                    delay = policy.next_delay(
+                        method, attempt, started, status=r.status_code, headers=r.headers
+                    ) if policy else None
+                    if within_deadline(delay) is None:
+                        if self.metrics is not None:
+                            self._record_call(
+                                method, path, r, resource=resource, started=started,
+                                attempts=attempt, body=fields,
+                            )
+                        return r
+
+                await asyncio.sleep(delay)
+
+    # pylint: disable=R0913
+    async def _throttled_send(self, method, url, path, timeout=None, **kwargs):
+        """
+        Send a single request once the client's rate and concurrency limiters allow it.  See
+        SensuClient._throttled_send.
+
+        :param path: The path of the request, which decides its namespace for rate limiting.
+        """
+
+        if self.rate_limiter is not None:
+            await self.rate_limiter.aacquire(path)
+
+        limiter = self.concurrency_limiter
+        if limiter is None:
+            return await self._send(
+                method, url, effective_timeout(self._timeout(), timeout), **kwargs
+            )
+
+        await limiter.aacquire()
+        start = time.monotonic()
+        status = None
+        try:
+            r = await self._send(
+                method, url, effective_timeout(self._timeout(), timeout), **kwargs
+            )
+            status = r.status_code
+        finally:
+            limiter.release(time.monotonic() - start, status)
+
+        return r
+
+    async def _send(self, method, url, timeout=None, **kwargs):
+        """
+        Send a single request, with no retries.  When a deadline is in force, the whole
+        request (not just each wait on the socket) is bounded by the time left.
+
+        :param timeout: A number of seconds or a (connect, read) tuple, for this request.
+        :param kwargs: Further arguments for httpx.AsyncClient.request.
+        """
+
+        kwargs["timeout"] = _httpx_timeout(timeout)
+
+        request = self.session.request(method, url, **kwargs)
+        left = remaining()
+        if left is None:
+            return await request
+
+        return await asyncio.wait_for(request, left)
+
+    async def login(self, username, password):
+        """
+        Login to the Sensu server.  See SensuClient.login for how a token cache is used.
+
+        :param username: The username to login with.
+        :param password: The password to login with.
+        """
+
+        if self.token_cache is None:
+            return await self._login(username, password)
+
+        url = self.server.api_url
+        lock = self.token_cache.lock(url, username)
+        await asyncio.to_thread(lock.acquire)
+        try:
+            self._token_user = username
+            token = self.token_cache.load(url, username)
+            if token is not None and not token.need_refresh():
+                self._use_token(token)
+                return True
+
+            await self._login(username, password)
+            self.token_cache.store(url, username, self.token)
+        finally:
+            lock.release()
+
+        return True
+
+    async def _login(self, username, password):
+        """
+        Login to the Sensu server, without the token cache.
+        """
+
+        self.session.headers.pop("Authorization", None)
+        with start_span(self.tracer, "fawlty.login", username=username) as span:
+            r = await self._send(
+                "GET", self.server.api_url + "/auth", auth=(username, password),
+                timeout=effective_timeout(self._timeout()),
+            )
+            span.set_attribute("status_code", r.status_code)
+
+        if r.status_code < 200 or r.status_code > 299:
+            raise SensuAuthError("Failed to login")
+
+        self._use_token(SensuToken(**r.json()))
+
+        return True
+
+    def _use_token(self, token: SensuToken):
+        """
+        Send later calls with a token.
+        """
+
+        self.token = token
+        self.api_key = None
+        self.session.headers["Authorization"] = f"Bearer {token.access_token}"
+
+    def use_api_key(self, api_key: str):
+        """
+        Authenticate with an API key, instead of logging in.  See SensuClient.use_api_key.
+        """
+
+        self.api_key = api_key
+        self.token = None
+        self._token_user = None
+        self.session.headers["Authorization"] = f"Key {api_key}"
+
+    async def refresh_token(self):
+        """
+        Refresh the token with the Sensu server.  See SensuClient.refresh_token for how a
+        token cache is used.
+        """
+
+        if self.token_cache is None or self._token_user is None:
+            return await self._refresh_token()
+
+        url = self.server.api_url
+        lock = self.token_cache.lock(url, self._token_user)
+        await asyncio.to_thread(lock.acquire)
+        try:
+            token = self.token_cache.load(url, self._token_user)
+            if self._refreshed_elsewhere(token):
+                self._use_token(token)
+                return True
+
+            await self._refresh_token()
+            self.token_cache.store(url, self._token_user, self.token)
+        finally:
+            lock.release()
+
+        return True
+
+    async def _refresh_token(self):
+        """
+        Refresh the token with the Sensu server, without the token cache.
+        """
+
+        data = {"refresh_token": self.token.refresh_token}
+        with start_span(self.tracer, "fawlty.refresh"):
+            r = await self._make_call("POST", "/auth/token", fields=data, use_filter=False)
+
+        if r.status_code < 200 or r.status_code > 299:
+            raise SensuAuthError(f"Failed to refresh token ({r.text})")
+
+        self._use_token(SensuToken(**r.json()))
+
+        return True
+
+    async def single_flight_refresh(self, stale_token=None):
+        """
+        Refresh the token, making sure only one refresh is in flight at a time.  See
+        SensuClient.single_flight_refresh for details.
+
+        :return: True if this call performed the refresh, False if another caller did.
+        """
+
+        if stale_token is None:
+            stale_token = self.token
+
+        # Created lazily, so the lock belongs to the loop the client is used from
+        if self._refresh_lock is None:
+            self._refresh_lock = asyncio.Lock()
+
+        left = remaining()
+        try:
+            await asyncio.wait_for(self._refresh_lock.acquire(), left)
+        except asyncio.TimeoutError as err:
+            raise SensuTimeoutError("Deadline exceeded waiting for a token refresh") from err
+
+        try:
+            if self.token is not stale_token:
+                return False
+
+            return await self.refresh_token()
+        finally:
+            self._refresh_lock.release()
+
+    def start_token_refresher(self, lead_time=DEFAULT_LEAD_TIME,
+                              retry_interval=DEFAULT_RETRY_INTERVAL):
+        """
+        Start a background task, on the running event loop, that refreshes the token ahead
+        of need_refresh().
+
+        :param lead_time: How many seconds ahead of the refresh threshold to refresh.
+        :param retry_interval: How many seconds to wait before retrying a failed refresh.
+        :return: The asyncio task doing the refreshing.
+        """
+
+        if self._refresher_task is None or self._refresher_task.done():
+            self._refresher_task = asyncio.ensure_future(
+                self._refresh_loop(lead_time, retry_interval)
+            )
+
+        return self._refresher_task
+
+    async def stop_token_refresher(self):
+        """
+        Stop the background token refresher, if one is running.
+        """
+
+        task, self._refresher_task = self._refresher_task, None
+        if task is not None and not task.done():
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+
+    async def _refresh_loop(self, lead_time, retry_interval):
+        """
+        The body of the background refresher task.
+        """
+
+        while True:
+            token = self.token
+            if token is None:
+                await asyncio.sleep(retry_interval)
+                continue
+
+            await asyncio.sleep(max(token.seconds_until_refresh(lead_time), MIN_WAIT))
+            if self.token is not token:
+                continue
+
+            try:
+                await self.single_flight_refresh(stale_token=token)
+            except SensuError:
+                await asyncio.sleep(retry_interval)
+
+    async def resource_get(self, cls, get_url, page_size=None, lazy=False) -> list[object]:
+        """
+        Get a resource or resources from the Sensu server.
+
+        :param page_size: If provided, retrieve the collection in pages of this size.
+        :param lazy: Return LazyResource views, which validate fields only as they are read.
+        :return: A list of objects representing the resource(s).
+
+        Without a page_size, identical requests made concurrently from several tasks are
+        coalesced by the client's single_flight.  See SensuClient.resource_get.
+        """
+
+        if page_size is not None:
+            return [
+                _ async for _ in self.resource_iter(
+                    cls=cls, get_url=get_url, page_size=page_size, lazy=lazy
+                )
+            ]
+
+        if self.single_flight is None:
+            return self._build_resources(cls, await self._get_body(cls, get_url), lazy=lazy)
+
+        body, coalesced = await self.single_flight.do(
+            (cls, get_url), lambda: self._get_body(cls, get_url)
+        )
+        if coalesced and self.metrics is not None:
+            self.metrics.record_coalesced("GET", get_url, cls)
+
+        return self._build_resources(cls, body, lazy=lazy)
+
+    async def _get_body(self, cls, get_url) -> bytes:
+        """
+        Get the body of a response for a resource or resources, in a single request.
+        """
+
+        r = await self._make_call(
+            "GET", get_url, retry_policy=self._retry_policy_for(cls, "get"), resource=cls
+        )
+
+        if r.status_code < 200 or r.status_code > 299:
+            raise SensuError(f"Failed to get resource(s) ({r.text})")
+
+        return r.content
+
+    # pylint: disable=R0913,R0914
+    async def resource_iter(
+        self, cls, get_url, page_size=None, params=None, prefetch=True, *, lazy=False
+    ):
+        """
+        Iterate over a collection from the Sensu server, one page at a time.  See
+        SensuClient.resource_iter for details.
+
+        :return: An asynchronous generator of objects representing the resources.
+        """
+
+        sizer = get_page_sizer(page_size, default=getattr(cls, "PAGE_SIZE", None))
+        next_page = None
+
+        try:
+            policy = self._retry_policy_for(cls, "get")
+            page = await self._get_page(
+                get_url, sizer.next_size(), None, params, retry_policy=policy, resource=cls
+            )
+            while True:
+                r, elapsed, limit = page
+                resources = self._build_resources(cls, r.content, lazy=lazy)
+                sizer.observe(elapsed, len(resources), limit)
+
+                token = r.headers.get(CONTINUE_HEADER) if resources else None
+                if token and prefetch:
+                    next_page = asyncio.ensure_future(
+                        self._get_page(
+                            get_url, sizer.next_size(), token, params, retry_policy=policy,
+                            resource=cls,
+                        )
+                    )
+
+                for obj in resources:
+                    yield obj
+
+                if not token:
+                    break
+
+                if next_page:
+                    page = await next_page
+                    next_page = None
+                else:
+                    page = await self._get_page(
+                        get_url, sizer.next_size(), token, params, retry_policy=policy,
+                        resource=cls,
+                    )
+
+        finally:
+            if next_page and not next_page.done():
+                next_page.cancel()
+
+    # pylint: disable=R0913
+    async def _get_page(self, get_url, limit, token, params, *, retry_policy=None, resource=None):
+        """
+        Request a single page of a collection.
+
+        :return: A tuple of the response, the seconds it took, and the requested limit.
+        """
+
+        page_params = self._page_params(limit, token, params)
+
+        start = time.monotonic()
+        r = await self._make_call(
+            "GET", get_url, params=page_params, retry_policy=retry_policy, resource=resource
+        )
+        elapsed = time.monotonic() - start
+
+        if r.status_code < 200 or r.status_code > 299:
+            raise SensuError(f"Failed to get resource(s) ({r.text})")
+
+        return r, elapsed, limit
+
+    async def resource_post(self, obj, url=None) -> bool:
+        """
+        Post a resource to the Sensu server.
+        """
+
+        self._validate_for_write(obj)
+
+        if url is None:
+            url = obj.urlify(purpose="create")
+
+        r = await self._make_call(
+            method="POST", path=url, fields=obj,
+            retry_policy=self._retry_policy_for(type(obj), "create"), resource=type(obj),
+        )
+        self._check_write_response(r, "create")
+        obj.created(r.headers.get("Location"))
+
+        return True
+
+    async def resource_put(self, obj, url=None) -> bool:
+        """
+        Put a resource to the Sensu server.
+        """
+
+        self._validate_for_write(obj)
+
+        if url is None:
+            url = obj.urlify()
+
+        r = await self._make_call(
+            method="PUT", path=url, fields=obj,
+            retry_policy=self._retry_policy_for(type(obj), "update"), resource=type(obj),
+        )
+        self._check_write_response(r, "update")
+
+        return True
+
+    async def resource_delete(self, obj, url=None) -> bool:
+        """
+        Delete a resource from the Sensu server.
+        """
+
+        if url is None:
+            url = obj.urlify()
+
+        r = await self._make_call(
+            method="DELETE", path=url, retry_policy=self._retry_policy_for(type(obj), "delete"),
+            resource=type(obj),
+        )
+        self._check_write_response(r, "delete")
+
+        return True
+
+
+async def _in_context(context, coro):
+    """
+    Await a coroutine with the caller's context variables (such as its deadline and current
+    span) applied.  Each coroutine is run in its own task, so this doesn't leak into others.
+    """
+
+    for var, value in context.items():
+        var.set(value)
+
+    return await coro
+
+
+class BlockingSensuClient:
+    """
+    A synchronous facade over AsyncSensuClient.  The asynchronous client runs on an event loop
+    in a background thread, so existing synchronous callers (including the synchronous
+    resource methods) share its connection pool without being rewritten.
+    """
+
+    def __init__(self, server=None, **kwargs):
+        """
+        Initialize a new blocking Sensu client.
+
+        :param server: The SensuServer to connect to.
+        :param kwargs: Further arguments for the underlying AsyncSensuClient.
+        """
+
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(
+            target=self._loop.run_forever, name="fawlty-event-loop", daemon=True
+        )
+        self._thread.start()
+        self.async_client = self._run(self._create_client(server, kwargs))
+
+    @staticmethod
+    async def _create_client(server, kwargs):
+        """
+        Create the asynchronous client from within the background loop.
+        """
+        return AsyncSensuClient(server=server, **kwargs)
+
+    def _run(self, coro):
+        """
+        Run a coroutine on the background loop and wait for its result.
+        """
+        return asyncio.run_coroutine_threadsafe(
+            _in_context(contextvars.copy_context(), coro), self._loop
+        ).result()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        """
+        Close the underlying client and stop the background loop.
+        """
+
+        if self._loop.is_closed():
+            return
+
+        self._run(self.async_client.aclose())
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
+
+    @property
+    def server(self):
+        """
+        The SensuServer being used by the underlying client.
+        """
+        return self.async_client.server
+
+    @property
+    def token(self):
+        """
+        The login token held by the underlying client.
+        """
+        return self.async_client.token
+
+    @property
+    def tracer(self):
+        """
+        The Tracer used by the underlying client, if any.
+        """
+        return self.async_client.tracer
+
+    def _adopt(self, resources):
+        """
+        Seed resources with this facade, so their synchronous methods work.  Lazy views are
+        read-only, so they are rebuilt around the same data instead.
+        """
+
+        adopted = []
+        for obj in resources:
+            if isinstance(obj, LazyResource):
+                obj = LazyResource(obj.resource_class, obj.raw, client=self)
+            else:
+                obj.set_client(self)
+            adopted.append(obj)
+
+        return adopted
+
+    def login(self, username, password):
+        """
+        Login to the Sensu server.
+        """
+        return self._run(self.async_client.login(username, password))
+
+    def refresh_token(self):
+        """
+        Refresh the token with the Sensu server.
+        """
+        return self._run(self.async_client.refresh_token())
+
+    def use_api_key(self, api_key):
+        """
+        Authenticate with an API key, instead of logging in.
+        """
+        self.async_client.use_api_key(api_key)
+
+    def resource_get(self, cls, get_url, page_size=None, lazy=False) -> list[object]:
+        """
+        Get a resource or resources from the Sensu server.
+        """
+        return self._adopt(self._run(
+            self.async_client.resource_get(cls, get_url, page_size=page_size, lazy=lazy)
+        ))
+
+    # pylint: disable=R0913
+    def resource_iter(
+        self, cls, get_url, page_size=None, params=None, prefetch=True, *, lazy=False
+    ):
+        """
+        Iterate over a collection from the Sensu server, one page at a time.
+        """
+
+        agen = self.async_client.resource_iter(
+            cls, get_url, page_size=page_size, params=params, prefetch=prefetch, lazy=lazy
+        )
+
+        try:
+            while True:
+                try:
+                    # The anext() builtin is not available on python 3.9
+                    obj = self._run(agen.__anext__())  # pylint: disable=C2801
+                except StopAsyncIteration:
+                    return
+
+                yield self._adopt([obj])[0]
+
+        finally:
+            self._run(agen.aclose())
+
+    def resource_post(self, obj, url=None) -> bool:
+        """
+        Post a resource to the Sensu server.
+        """
+        return self._run(self.async_client.resource_post(obj, url=url))
+
+    def resource_put(self, obj, url=None) -> bool:
+        """
+        Put a resource to the Sensu server.
+        """
+        return self._run(self.async_client.resource_put(obj, url=url))
+
+    def resource_delete(self, obj, url=None) -> bool:
+        """
+        Delete a resource from the Sensu server.
+        """
+        return self._run(self.async_client.resource_delete(obj, url=url))
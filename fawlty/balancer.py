@@ -0,0 +1,175 @@
+"""
+A module for spreading requests across the backends of a Sensu cluster, and for keeping
+track of which of them are fit to receive requests.
+"""
+
+# Built in imports
+import random
+import threading
+import time
+from typing import Iterable, List, Optional
+
+# Constants
+LEAST_OUTSTANDING = "least_outstanding"
+LATENCY = "latency"
+LATENCY_DECAY = 0.3
+
+
+class Backend:  # pylint: disable=R0902,R0903
+    """
+    The balancer's view of one backend: its load, its latency and its health.
+    """
+
+    def __init__(self, server):
+        """
+        Instance initialization
+
+        :param server: The SensuServer for the backend.
+        """
+        self.server = server
+        self.outstanding = 0
+        self.latency = None
+        self.failures = 0
+        self.ejected_until = 0.0
+        self.healthy = True
+        self.requests = 0
+        self.errors = 0
+
+    def available(self, now: float) -> bool:
+        """
+        Whether the backend should be sent requests.
+        """
+        return self.healthy and self.ejected_until <= now
+
+
+class Balancer:
+    """
+    Picks the backend for each request.
+
+    With "least_outstanding" balancing, the backend with the fewest requests in flight is
+    picked.  With "latency" balancing, each backend's (exponentially weighted) average
+    response time is scaled by its requests in flight, and the lowest is picked.
+
+    A backend is ejected for eject_seconds after failure_threshold consecutive failures,
+    and whenever a health check finds it unhealthy.  If every backend is out, they are all
+    tried anyway, as refusing to send anything would help no one.
+    """
+
+    # pylint: disable=R0913
+    def __init__(
+        self,
+        servers: Iterable,
+        strategy: str = LEAST_OUTSTANDING,
+        *,
+        failure_threshold: int = 2,
+        eject_seconds: float = 30.0,
+    ):
+        """
+        Instance initialization
+
+        :param servers: The SensuServer of each backend.
+        :param strategy: "least_outstanding" or "latency".
+        :param failure_threshold: The consecutive failures after which a backend is ejected.
+        :param eject_seconds: How long an ejected backend is left out.
+        """
+
+        if strategy not in (LEAST_OUTSTANDING, LATENCY):
+            raise ValueError(f"Unknown balancing strategy '{strategy}'")
+
+        self.backends = [Backend(_) for _ in servers]
+        self.strategy = strategy
+        self.failure_threshold = failure_threshold
+        self.eject_seconds = eject_seconds
+        self._lock = threading.Lock()
+
+    def _score(self, backend: Backend) -> float:
+        """
+        Return a backend's score; the lowest is picked.  Backends with no latency recorded
+        yet score as if they were instant, so they are tried early.
+        """
+
+        if self.strategy == LATENCY:
+            return (backend.latency or 0.0) * (backend.outstanding + 1)
+
+        return backend.outstanding
+
+    def pick(self, exclude: Iterable[Backend] = ()) -> Optional[Backend]:
+        """
+        Pick a backend and count a request as in flight to it.  The caller must call
+        finish when the request completes.
+
+        :param exclude: Backends which must not be picked (such as ones already tried).
+        :return: The backend, or None if every backend is excluded.
+        """
+
+        exclude = list(exclude)
+        now = time.monotonic()
+        with self._lock:
+            candidates = [_ for _ in self.backends if _ not in exclude]
+            available = [_ for _ in candidates if _.available(now)]
+            candidates = available or candidates
+            if not candidates:
+                return None
+
+            backend = min(candidates, key=lambda _: (self._score(_), random.random()))
+            backend.outstanding += 1
+            backend.requests += 1
+
+        return backend
+
+    def finish(self, backend: Backend, elapsed: float, ok: bool):
+        """
+        Record the outcome of a request to a backend.
+
+        :param backend: The backend, as returned by pick.
+        :param elapsed: The seconds the request took.
+        :param ok: Whether the backend handled the request (a connection error or a 5xx
+                   status is a failure).
+        """
+
+        with self._lock:
+            backend.outstanding -= 1
+            if backend.latency is None:
+                backend.latency = elapsed
+            else:
+                backend.latency += LATENCY_DECAY * (elapsed - backend.latency)
+
+            if ok:
+                backend.failures = 0
+                return
+
+            backend.errors += 1
+            backend.failures += 1
+            if backend.failures >= self.failure_threshold:
+                backend.ejected_until = time.monotonic() + self.eject_seconds
+
+    def mark_health(self, backend: Backend, healthy: bool):
+        """
+        Record the result of a health check.  A healthy result also ends any ejection.
+        """
+
+        with self._lock:
+            backend.healthy = healthy
+            if healthy:
+                backend.failures = 0
+                backend.ejected_until = 0.0
+
+    def stats(self) -> List[dict]:
+        """
+        Return the state of each backend.
+        """
+
+        now = time.monotonic()
+        with self._lock:
+            return [
+                {
+                    "api_url": _.server.api_url,
+                    "available": _.available(now),
+                    "healthy": _.healthy,
+                    "outstanding": _.outstanding,
+                    "latency": _.latency,
+                    "requests": _.requests,
+                    "errors": _.errors,
+                }
+                for _ in self.backends
+            ]
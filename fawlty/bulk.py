@@ -0,0 +1,207 @@
+"""
+A module for applying an operation to many resources at once, on a bounded pool of threads.
+"""
+
+# Built in imports
+import contextvars
+import time
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Callable, Iterable, List, Optional
+
+# Constants
+DEFAULT_CONCURRENCY = 8
+OPERATIONS = {
+    "create": "resource_post",
+    "update": "resource_put",
+    "delete": "resource_delete",
+}
+
+
+@dataclass
+class BulkItemResult:
+    """
+    The outcome of applying an operation to a single object.
+    """
+    index: int
+    obj: Any
+    result: Any = None
+    error: Optional[BaseException] = None
+    elapsed: float = 0.0
+
+    @property
+    def ok(self) -> bool:
+        """
+        Whether the operation succeeded.
+        """
+        return self.error is None
+
+
+@dataclass
+class BulkProgress:
+    """
+    A point in time report on the progress of a bulk operation.
+    """
+    submitted: int
+    completed: int
+    failed: int
+    elapsed: float
+
+    @property
+    def rate(self) -> float:
+        """
+        The number of completed operations per second.
+        """
+        return self.completed / self.elapsed if self.elapsed > 0 else 0.0
+
+
+@dataclass
+class BulkResult:
+    """
+    The outcome of a bulk operation.  Results are in the order the objects were provided.
+    """
+    results: List[BulkItemResult] = field(default_factory=list)
+    cancelled: bool = False
+    elapsed: float = 0.0
+
+    @property
+    def succeeded(self) -> List[BulkItemResult]:
+        """
+        The results for objects which were applied successfully.
+        """
+        return [_ for _ in self.results if _.ok]
+
+    @property
+    def failed(self) -> List[BulkItemResult]:
+        """
+        The results for objects which could not be applied.
+        """
+        return [_ for _ in self.results if not _.ok]
+
+    @property
+    def throughput(self) -> float:
+        """
+        The number of operations completed per second.
+        """
+        return len(self.results) / self.elapsed if self.elapsed > 0 else 0.0
+
+
+def _apply_one(method: Callable, index: int, obj: Any) -> BulkItemResult:
+    """
+    Apply the operation to one object, capturing any failure rather than raising it.
+    """
+
+    start = time.monotonic()
+    try:
+        result = method(obj=obj)
+    except Exception as err:  # pylint: disable=W0718
+        return BulkItemResult(index=index, obj=obj, error=err, elapsed=time.monotonic() - start)
+
+    return BulkItemResult(index=index, obj=obj, result=result, elapsed=time.monotonic() - start)
+
+
+# pylint: disable=R0913,R0914
+def bulk_apply(
+    client,
+    objs: Iterable,
+    op: str = "create",
+    *,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    max_pending: Optional[int] = None,
+    progress: Optional[Callable[[BulkProgress], None]] = None,
+    progress_interval: float = 1.0,
+    cancel: Optional[threading.Event] = None,
+    stop_on_error: bool = False,
+) -> BulkResult:
+    """
+    Apply an operation to many objects using a bounded pool of threads sharing the client.
+
+    Objects are pulled from the iterable lazily, and no more than max_pending operations are
+    queued at any time, so very large (or generated) inputs are not materialized up front.
+
+    :param client: The SensuClient to use.
+    :param objs: An iterable of resource objects.
+    :param op: One of "create", "update" or "delete".
+    :param concurrency: The number of worker threads.
+    :param max_pending: The most operations to have queued or running (default 2 * concurrency).
+    :param progress: A callable, given a BulkProgress, called as work completes.
+    :param progress_interval: The minimum number of seconds between progress reports.
+    :param cancel: A threading.Event which, when set, stops any further operations starting.
+    :param stop_on_error: Whether to stop starting operations after the first failure.
+    :return: A BulkResult holding the outcome for every object that was attempted.
+    """
+
+    if op not in OPERATIONS:
+        raise ValueError(f"Unknown bulk operation '{op}' (expected one of {sorted(OPERATIONS)})")
+
+    if concurrency < 1:
+        raise ValueError("Concurrency must be at least 1")
+
+    # Imported here, so that importing the module (for DEFAULT_CONCURRENCY, say) does not
+    # pull in the thread pool
+    from concurrent.futures import (  # pylint: disable=C0415
+        ThreadPoolExecutor, wait, FIRST_COMPLETED
+    )
+
+    method = getattr(client, OPERATIONS[op])
+    max_pending = max_pending or concurrency * 2
+    stopped = threading.Event()
+    outcome = BulkResult()
+    counts = {"submitted": 0, "completed": 0, "failed": 0}
+    start = time.monotonic()
+    last_report = start
+
+    def collect(done):
+        nonlocal last_report
+        for future in done:
+            if future.cancelled():
+                continue
+            item = future.result()
+            outcome.results.append(item)
+            counts["completed"] += 1
+            if not item.ok:
+                counts["failed"] += 1
+                if stop_on_error:
+                    stopped.set()
+
+        now = time.monotonic()
+        if progress and now - last_report >= progress_interval:
+            last_report = now
+            progress(BulkProgress(elapsed=now - start, **counts))
+
+    def cancelled():
+        return stopped.is_set() or (cancel is not None and cancel.is_set())
+
+    pending = set()
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="fawlty-bulk") as pool:
+        try:
+            for index, obj in enumerate(objs):
+                while len(pending) >= max_pending and not cancelled():
+                    done, pending = wait(pending, timeout=0.1, return_when=FIRST_COMPLETED)
+                    collect(done)
+
+                if cancelled():
+                    break
+
+                # Each operation runs in a copy of this context, so any deadline applies
+                pending.add(pool.submit(
+                    contextvars.copy_context().run, _apply_one, method, index, obj
+                ))
+                counts["submitted"] += 1
+
+        finally:
+            if cancelled():
+                outcome.cancelled = True
+                for future in pending:
+                    future.cancel()
+
+            done, _ = wait(pending)
+            collect(done)
+
+    outcome.elapsed = time.monotonic() - start
+    outcome.results.sort(key=lambda _: _.index)
+
+    if progress:
+        progress(BulkProgress(elapsed=outcome.elapsed, **counts))
+
+    return outcome
@@ -0,0 +1,196 @@
+"""
+A module providing a response cache for GET requests, revalidated with ETags.
+"""
+
+# Built in imports
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+# Constants
+DEFAULT_MAX_ENTRIES = 1024
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+DEFAULT_TTL = 30.0
+
+FRESH = "fresh"
+STALE = "stale"
+EXPIRED = "expired"
+
+
+class CacheEntry:  # pylint: disable=R0903
+    """
+    A cached response: its raw body, and how to revalidate it.
+    """
+
+    __slots__ = ("etag", "body", "size", "stored_at", "revalidating")
+
+    def __init__(self, etag: Optional[str], body: bytes):
+        """
+        Instance initialization
+
+        :param etag: The ETag header of the response, if it had one.
+        :param body: The body of the response.
+        """
+        self.etag = etag
+        self.body = body
+        self.size = len(body)
+        self.stored_at = time.monotonic()
+        self.revalidating = False
+
+
+class ResponseCache:
+    """
+    A size bounded, least recently used cache of GET responses.
+
+    An entry younger than the TTL is served without contacting the server.  After that it is
+    revalidated with an If-None-Match request, and a 304 response is served from the body
+    already held.  Within the stale_while_revalidate window after the TTL, the stale entry
+    is served immediately while it is revalidated in the background.
+    """
+
+    # pylint: disable=R0902
+    def __init__(
+        self,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        ttl: float = DEFAULT_TTL,
+        stale_while_revalidate: float = 0.0,
+    ):
+        """
+        Instance initialization
+
+        :param max_entries: The most responses to hold.
+        :param max_bytes: The most response body bytes to hold.
+        :param ttl: How many seconds an entry is served without revalidation.
+        :param stale_while_revalidate: How many seconds past the TTL a stale entry may be
+                                       served while it is revalidated in the background.
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.stale_while_revalidate = stale_while_revalidate
+
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self.bytes_used = 0
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.revalidations = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def lookup(self, key):
+        """
+        Look up an entry, marking it as recently used.
+
+        :return: A tuple of the entry (or None) and its state: FRESH, STALE or EXPIRED.
+        """
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None, EXPIRED
+
+            self._entries.move_to_end(key)
+            age = time.monotonic() - entry.stored_at
+            if age < self.ttl:
+                self.hits += 1
+                return entry, FRESH
+
+            if age < self.ttl + self.stale_while_revalidate:
+                self.stale_hits += 1
+                return entry, STALE
+
+            return entry, EXPIRED
+
+    def begin_revalidation(self, entry: CacheEntry) -> bool:
+        """
+        Claim the background revalidation of a stale entry.
+
+        :return: True if the caller should revalidate it, False if it is already under way.
+        """
+
+        with self._lock:
+            if entry.revalidating:
+                return False
+
+            entry.revalidating = True
+            return True
+
+    def revalidated(self, key, entry: CacheEntry):
+        """
+        Record that the server confirmed (with a 304) that an entry is still current.
+        """
+
+        with self._lock:
+            self.revalidations += 1
+            entry.stored_at = time.monotonic()
+            entry.revalidating = False
+            if key in self._entries:
+                self._entries.move_to_end(key)
+
+    def store(self, key, etag: Optional[str], body: bytes):
+        """
+        Store a response, evicting the least recently used entries to make room.
+        """
+
+        with self._lock:
+            self._discard(key)
+            if len(body) > self.max_bytes:
+                return
+
+            entry = self._entries[key] = CacheEntry(etag, body)
+            self.bytes_used += entry.size
+
+            while len(self._entries) > self.max_entries or self.bytes_used > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._discard(oldest)
+                self.evictions += 1
+
+    def invalidate(self, url_prefix: str):
+        """
+        Drop every entry whose URL starts with the given prefix.
+        """
+
+        with self._lock:
+            for key in [_ for _ in self._entries if _[1].startswith(url_prefix)]:
+                self._discard(key)
+
+    def clear(self):
+        """
+        Drop every entry.
+        """
+
+        with self._lock:
+            self._entries.clear()
+            self.bytes_used = 0
+
+    def stats(self) -> dict:
+        """
+        Return the cache's counters.
+        """
+
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self.bytes_used,
+                "hits": self.hits,
+                "stale_hits": self.stale_hits,
+                "misses": self.misses,
+                "revalidations": self.revalidations,
+                "evictions": self.evictions,
+            }
+
+    def _discard(self, key):
+        """
+        Remove an entry.  The lock must be held.
+        """
+
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.bytes_used -= entry.size
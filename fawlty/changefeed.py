@@ -0,0 +1,316 @@
+"""
+A module for following changes to a collection of resources, such as events or entities,
+by polling.
+
+A ChangeFeed lists the collection on each poll and compares it with the previous listing,
+reporting only the resources which were added, changed or removed.  It keeps a compact
+fingerprint of each resource (a 64 bit hash of the fields that matter) rather than the
+resources themselves, and reads those fields straight from the decoded JSON, so unchanged
+resources are never validated.
+
+The interval between polls adapts to the rate of change, and the fingerprints may be saved
+to a checkpoint file, so that a restarted process reports only what changed while it was
+down rather than every resource again.
+"""
+
+# Built in imports
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple, Union
+
+# Our imports
+from fawlty.resources.entity import Entity
+from fawlty.resources.event import Event
+from fawlty.selectors import LabelSelector, FieldSelector
+from fawlty.tracing import start_span
+
+# Constants
+ADDED = "added"
+CHANGED = "changed"
+REMOVED = "removed"
+
+DEFAULT_INTERVAL = 10.0
+DEFAULT_MIN_INTERVAL = 1.0
+DEFAULT_MAX_INTERVAL = 60.0
+DEFAULT_BUSY = 10
+BACKOFF = 1.5
+CHECKPOINT_VERSION = 1
+
+
+@dataclass
+class Change:
+    """
+    A resource which was added, changed or removed between two polls.
+    """
+    kind: str
+    key: str
+    # The resource, or None when it was removed
+    obj: Any = None
+
+
+def _get(data: Optional[dict], *names: str) -> Any:
+    """
+    Return a nested value from decoded JSON, or None if any part of the path is missing.
+    """
+
+    for name in names:
+        if not isinstance(data, dict):
+            return None
+        data = data.get(name)
+
+    return data
+
+
+def metadata_key(data: dict) -> str:
+    """
+    Key a resource by its namespace (if it has one) and name.
+    """
+
+    return "/".join(
+        _ for _ in (_get(data, "metadata", "namespace"), _get(data, "metadata", "name")) if _
+    )
+
+
+def event_key(data: dict) -> str:
+    """
+    Key an event by its namespace, entity and check.
+    """
+
+    return "/".join((
+        _get(data, "entity", "metadata", "namespace") or "",
+        _get(data, "entity", "metadata", "name") or "",
+        _get(data, "check", "metadata", "name") or "",
+    ))
+
+
+def event_fields(data: dict) -> Any:
+    """
+    The fields of an event which show it has changed: each new check result has a new
+    timestamp and sequence number.
+    """
+    return [data.get("timestamp"), data.get("sequence"), _get(data, "check", "status")]
+
+
+def entity_fields(data: dict) -> Any:
+    """
+    The fields of an entity which show it has changed: all of them, except last_seen, which
+    every keepalive updates.
+    """
+    return {k: v for k, v in data.items() if k != "last_seen"}
+
+
+def whole_resource(data: dict) -> Any:
+    """
+    Compare resources on all of their fields.
+    """
+    return data
+
+
+def fingerprint(value: Any) -> int:
+    """
+    Return a 64 bit hash of a JSON compatible value.
+    """
+
+    encoded = json.dumps(value, sort_keys=True, separators=(",", ":"), default=str)
+
+    return int.from_bytes(hashlib.blake2b(encoded.encode("utf-8"), digest_size=8).digest(), "big")
+
+
+# How to key, and which fields to compare, for the resources usually followed
+FEED_FIELDS: Dict[type, Tuple[Callable[[dict], str], Callable[[dict], Any]]] = {
+    Event: (event_key, event_fields),
+    Entity: (metadata_key, entity_fields),
+}
+
+
+class ChangeFeed:  # pylint: disable=R0902
+    """
+    Follows the changes to a collection of resources by polling it.
+
+    A feed is not thread safe: poll it from one thread at a time.
+    """
+
+    # pylint: disable=R0913,R0914
+    def __init__(
+        self,
+        client,
+        cls: type,
+        namespace: Optional[str] = None,
+        *,
+        label_selector: Union[LabelSelector, str] = None,
+        field_selector: Union[FieldSelector, str] = None,
+        key: Callable[[dict], str] = None,
+        fields: Callable[[dict], Any] = None,
+        interval: float = DEFAULT_INTERVAL,
+        min_interval: float = DEFAULT_MIN_INTERVAL,
+        max_interval: float = DEFAULT_MAX_INTERVAL,
+        busy: int = DEFAULT_BUSY,
+        checkpoint: str = None,
+        materialize: bool = True,
+    ):
+        """
+        Instance initialization
+
+        :param client: The SensuClient to poll with.
+        :param cls: The resource class to follow, such as Event.
+        :param namespace: The namespace to follow (default is every namespace).
+        :param label_selector: Have the server return only resources with matching labels.
+        :param field_selector: Have the server return only resources with matching fields.
+        :param key: Returns the key identifying a resource, from its decoded JSON (default
+                    depends on the class, see FEED_FIELDS, or is the namespace and name).
+        :param fields: Returns the parts of a resource's decoded JSON which are compared
+                       between polls (default depends on the class, or is all of it).
+        :param interval: The seconds to wait between the first polls.
+        :param min_interval: The shortest the interval becomes while changes are frequent.
+        :param max_interval: The longest the interval becomes while nothing changes.
+        :param busy: A poll with at least this many changes halves the interval, while a
+                     poll with none lengthens it.
+        :param checkpoint: A file to save fingerprints in after each poll with changes, and
+                           to resume from.
+        :param materialize: Report added and changed resources as model objects, rather
+                            than as the LazyResource views they were listed as.
+        """
+        default_key, default_fields = FEED_FIELDS.get(cls, (metadata_key, whole_resource))
+        self.client = client
+        self.cls = cls
+        self.namespace = namespace
+        self.label_selector = label_selector
+        self.field_selector = field_selector
+        self.key = key or default_key
+        self.fields = fields or default_fields
+        self.interval = interval
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.busy = busy
+        self.checkpoint = checkpoint
+        self.materialize = materialize
+        self.polls = 0
+        self.fingerprints: Dict[str, int] = {}
+        if checkpoint is not None:
+            self.fingerprints = self._load_checkpoint()
+
+    def _list(self) -> list:
+        """
+        List the collection, as LazyResource views.
+        """
+
+        return self.cls.get(
+            self.client, namespace=self.namespace, lazy=True,
+            all_namespaces=self.namespace is None,
+            label_selector=self.label_selector, field_selector=self.field_selector,
+        )
+
+    def poll(self) -> List[Change]:
+        """
+        List the collection once, and return the changes since the last poll (or since the
+        checkpoint).  The first poll without a checkpoint reports every resource as added.
+        """
+
+        with start_span(
+            getattr(self.client, "tracer", None), "fawlty.poll", resource=self.cls.__name__,
+            namespace=self.namespace,
+        ) as span:
+            changes = self._diff(self._list())
+            span.set_attribute("changes", len(changes))
+
+        self.polls += 1
+        self._adapt(len(changes))
+        if changes and self.checkpoint is not None:
+            self.save_checkpoint()
+
+        return changes
+
+    def _diff(self, views: list) -> List[Change]:
+        """
+        Compare a listing with the stored fingerprints, replacing them with its own.
+        """
+
+        previous = self.fingerprints
+        current = {}
+        changes = []
+        for view in views:
+            data = view.raw
+            key = self.key(data)
+            digest = fingerprint(self.fields(data))
+            current[key] = digest
+
+            old = previous.get(key)
+            if old == digest:
+                continue
+            obj = view.materialize() if self.materialize else view
+            changes.append(Change(ADDED if old is None else CHANGED, key, obj))
+
+        changes.extend(Change(REMOVED, key) for key in previous.keys() - current.keys())
+        self.fingerprints = current
+
+        return changes
+
+    def _adapt(self, count: int):
+        """
+        Adapt the interval between polls to the number of changes the last one found.
+        """
+
+        if count >= self.busy:
+            self.interval = max(self.interval / 2, self.min_interval)
+        elif count == 0:
+            self.interval = min(self.interval * BACKOFF, self.max_interval)
+
+    def follow(self, stop: threading.Event = None) -> Iterator[Change]:
+        """
+        Poll until stopped, yielding each change as it is found and waiting the (adapting)
+        interval between polls.
+
+        :param stop: A threading.Event which, when set, ends the generator.
+        """
+
+        stop = stop or threading.Event()
+        while not stop.is_set():
+            started = time.monotonic()
+            yield from self.poll()
+            stop.wait(max(self.interval - (time.monotonic() - started), 0))
+
+    def save_checkpoint(self):
+        """
+        Save the fingerprints to the checkpoint file.  The file is replaced in one step, so
+        a crash never leaves half of it.
+        """
+
+        state = {
+            "version": CHECKPOINT_VERSION,
+            "resource": self.cls.__name__,
+            "namespace": self.namespace,
+            "fingerprints": self.fingerprints,
+        }
+        directory = os.path.dirname(os.path.abspath(self.checkpoint))
+        fd, temp = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(state, f, separators=(",", ":"))
+            os.replace(temp, self.checkpoint)
+        except BaseException:
+            os.unlink(temp)
+            raise
+
+    def _load_checkpoint(self) -> Dict[str, int]:
+        """
+        Load the fingerprints from the checkpoint file, if it exists and was saved by a feed
+        following the same collection.
+        """
+
+        try:
+            with open(self.checkpoint, "r", encoding="utf-8") as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+        if not isinstance(state, dict) or (
+            state.get("version"), state.get("resource"), state.get("namespace")
+        ) != (CHECKPOINT_VERSION, self.cls.__name__, self.namespace):
+            return {}
+
+        return dict(state.get("fingerprints") or {})
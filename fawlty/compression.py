@@ -0,0 +1,43 @@
+"""
+A module providing compression of request bodies sent to the Sensu server.
+
+Compressed responses need no help from here: the Accept-Encoding header is set from the
+SensuServer, and both requests and httpx decompress gzip and deflate responses as they are
+read, including when a response body is streamed.
+"""
+
+# Built in imports
+import gzip
+from typing import Optional, Tuple, Union
+
+# Constants
+DEFAULT_ACCEPT_ENCODING = "gzip, deflate"
+DEFAULT_COMPRESS_LEVEL = 6
+
+
+def compress_body(
+    body: Union[str, bytes, None], threshold: Optional[int], level: int = DEFAULT_COMPRESS_LEVEL
+) -> Tuple[Union[str, bytes, None], Optional[str]]:
+    """
+    Gzip a request body, if it is large enough to be worth the CPU time.
+
+    :param body: The encoded request body.
+    :param threshold: The smallest body, in bytes, to compress.  None disables compression.
+    :param level: The gzip compression level, from 1 (fastest) to 9 (smallest).
+    :return: A tuple of the body to send and its Content-Encoding (None if uncompressed).
+    """
+
+    if threshold is None or not isinstance(body, (str, bytes)):
+        return body, None
+
+    if isinstance(body, str):
+        body = body.encode()
+
+    if len(body) < threshold:
+        return body, None
+
+    compressed = gzip.compress(body, compresslevel=level)
+    if len(compressed) >= len(body):
+        return body, None
+
+    return compressed, "gzip"
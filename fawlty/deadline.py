@@ -0,0 +1,128 @@
+"""
+A module providing deadlines and per-call timeouts, which apply to every request made to the
+Sensu server within their scope.
+
+Both are held in context variables, so they follow the code that set them: across nested
+calls (such as a token refresh made on the way to another call), into asyncio tasks, and
+into the worker threads the clients start for prefetching and bulk operations.
+"""
+
+# Built in imports
+import contextvars
+import time
+from contextlib import contextmanager
+from typing import Optional, Tuple, Union
+
+# Our imports
+from fawlty.exceptions import SensuTimeoutError
+
+# Constants
+_DEADLINE = contextvars.ContextVar("fawlty_deadline", default=None)
+_TIMEOUT = contextvars.ContextVar("fawlty_timeout", default=None)
+
+Timeout = Optional[Union[float, Tuple[Optional[float], Optional[float]]]]
+
+
+@contextmanager
+def deadline(seconds: float):
+    """
+    Bound the total time spent on every request made within the block, including retries
+    and token refreshes.  A deadline nested within another can shorten it, but not extend it.
+
+    :param seconds: The time budget, in seconds, from now.
+    """
+
+    at = time.monotonic() + seconds
+    outer = _DEADLINE.get()
+    if outer is not None:
+        at = min(at, outer)
+
+    token = _DEADLINE.set(at)
+    try:
+        yield
+    finally:
+        _DEADLINE.reset(token)
+
+
+@contextmanager
+def request_timeout(timeout: Timeout):
+    """
+    Override the client's timeout for each request made within the block.
+
+    :param timeout: A number of seconds, or a (connect, read) tuple.
+    """
+
+    token = _TIMEOUT.set(timeout)
+    try:
+        yield
+    finally:
+        _TIMEOUT.reset(token)
+
+
+def remaining() -> Optional[float]:
+    """
+    Return the seconds left before the current deadline, or None if there isn't one.
+    """
+
+    at = _DEADLINE.get()
+    if at is None:
+        return None
+
+    return at - time.monotonic()
+
+
+def check_deadline():
+    """
+    Raise a SensuTimeoutError if the current deadline has passed.
+    """
+
+    left = remaining()
+    if left is not None and left <= 0:
+        raise SensuTimeoutError("Deadline exceeded")
+
+
+def within_deadline(delay: Optional[float]) -> Optional[float]:
+    """
+    Check a retry delay against the current deadline.
+
+    :param delay: The seconds to wait before retrying, or None if no retry is to be made.
+    :return: The delay, or None if retrying after it would run past the deadline.
+    """
+
+    left = remaining()
+    if delay is None or left is None:
+        return delay
+
+    return delay if delay < left else None
+
+
+def effective_timeout(default: Timeout, timeout: Timeout = None) -> Timeout:
+    """
+    Work out the timeout for a single request.
+
+    The per-call timeout (the argument, or else one set with request_timeout) wins over the
+    client's default, and the result is then cut down to the time left before the deadline.
+
+    :param default: The client's default timeout.
+    :param timeout: A timeout given for this call.
+    :return: A number of seconds, a (connect, read) tuple, or None for no timeout.
+    """
+
+    if timeout is None:
+        timeout = _TIMEOUT.get()
+    if timeout is None:
+        timeout = default
+
+    left = remaining()
+    if left is None:
+        return timeout
+
+    check_deadline()
+
+    if timeout is None:
+        return left
+
+    if isinstance(timeout, tuple):
+        return tuple(left if _ is None else min(_, left) for _ in timeout)
+
+    return min(timeout, left)
@@ -15,6 +15,12 @@ class SensuConnectionError(SensuError):
     """
 
 
+class SensuTimeoutError(SensuConnectionError):
+    """
+    Indicates that a call to the Sensu server timed out, or ran out of time before its deadline
+    """
+
+
 class SensuClientError(SensuError):
     """
     Indicates that the client is not properly configured, or missing.
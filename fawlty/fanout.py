@@ -0,0 +1,94 @@
+"""
+A module for running one call per item (such as per namespace) concurrently, with bounded
+parallelism, handing back results as they arrive.
+"""
+
+# Built in imports
+import contextvars
+from typing import Any, Awaitable, Callable, Iterable, Iterator, List, Tuple
+
+# Our imports
+from fawlty.bulk import DEFAULT_CONCURRENCY
+
+
+def fan_out(
+    func: Callable[[Any], Any], items: Iterable, *, concurrency: int = DEFAULT_CONCURRENCY
+) -> Iterator[Tuple[Any, Any]]:
+    """
+    Call a function for each item on a bounded pool of threads, yielding each item and its
+    result in the order the calls finish.
+
+    No more than concurrency calls are in flight at once, so results not yet consumed are
+    bounded too.  If a call fails, the calls not yet started are abandoned and its exception
+    is raised; the same happens if the generator is closed early.
+
+    :param func: The function to call with each item.
+    :param items: The items.
+    :param concurrency: The most calls to have in flight at once.
+    :return: A generator of (item, result) tuples.
+    """
+
+    if concurrency < 1:
+        raise ValueError("Concurrency must be at least 1")
+
+    # Imported here, so that importing the module does not pull in the thread pool
+    from concurrent.futures import (  # pylint: disable=C0415
+        ThreadPoolExecutor, wait, FIRST_COMPLETED
+    )
+
+    items = iter(items)
+    pending = {}
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="fawlty-fanout") as pool:
+        try:
+            while True:
+                for item in items:
+                    # Each call runs in a copy of this context, so any deadline applies
+                    future = pool.submit(contextvars.copy_context().run, func, item)
+                    pending[future] = item
+                    if len(pending) >= concurrency:
+                        break
+
+                if not pending:
+                    return
+
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield pending.pop(future), future.result()
+
+        finally:
+            for future in pending:
+                future.cancel()
+
+
+async def afan_out(
+    func: Callable[[Any], Awaitable[Any]], items: Iterable, *,
+    concurrency: int = DEFAULT_CONCURRENCY
+) -> List[Any]:
+    """
+    Await a coroutine function for each item as concurrent tasks, no more than concurrency
+    at a time, returning the results in the order of the items.
+
+    :param func: The coroutine function to call with each item.
+    :param items: The items.
+    :param concurrency: The most calls to have in flight at once.
+    :return: The results.
+    """
+
+    if concurrency < 1:
+        raise ValueError("Concurrency must be at least 1")
+
+    # Imported here, as only asynchronous clients need asyncio
+    import asyncio  # pylint: disable=C0415
+
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def bounded(item):
+        async with semaphore:
+            return await func(item)
+
+    tasks = [asyncio.ensure_future(bounded(_)) for _ in items]
+    try:
+        return await asyncio.gather(*tasks)
+    finally:
+        for task in tasks:
+            task.cancel()
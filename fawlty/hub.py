@@ -0,0 +1,492 @@
+"""
+A module for sharing one poller between many consumers in a process.
+
+Components which each want to follow events or entities subscribe to a SubscriptionHub,
+naming the resource class, and optionally a namespace, labels and a predicate.  The hub
+keeps one ChangeFeed per resource class, across every namespace, and hands each change to
+the subscriptions interested in it.  However many components subscribe, the server sees one
+listing per class per poll.  The hub also keeps the resources its feeds have reported, so a
+subscription made while it is running starts from the current collection.  Each subscription
+is handed model objects of its own, validated from the listed JSON.
+
+Each subscription has a bounded queue.  When a consumer falls behind and its queue fills,
+its policy decides what happens: DROP discards new changes, BLOCK holds up the poller (and
+so every other subscription) until there's room, and COALESCE merges a new change into one
+already queued for the same resource, so the consumer sees only the latest state.
+"""
+
+# Built in imports
+import itertools
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+# Our imports
+from fawlty.changefeed import ChangeFeed, Change, ADDED, CHANGED, REMOVED
+from fawlty.lazy import LazyResource
+
+# Constants
+DROP = "drop"
+BLOCK = "block"
+COALESCE = "coalesce"
+POLICIES = (DROP, BLOCK, COALESCE)
+
+DEFAULT_QUEUE_SIZE = 1000
+DEFAULT_RETRY_INTERVAL = 5
+BLOCK_CHECK_INTERVAL = 0.1
+
+
+def resource_labels(obj) -> Dict[str, str]:
+    """
+    Return a resource's labels.  An event's labels are those of its entity and check, as
+    Sensu's label selectors see them.
+    """
+
+    labels = {}
+    for part in (getattr(obj, "entity", None), getattr(obj, "check", None), obj):
+        labels.update(getattr(getattr(part, "metadata", None), "labels", None) or {})
+
+    return labels
+
+
+def _coalesce(queued: Change, change: Change) -> Optional[Change]:
+    """
+    Merge a change into one already queued for the same resource, returning the change to
+    queue in its place, or None if the two cancel out.
+    """
+
+    if queued.kind == ADDED:
+        if change.kind == REMOVED:
+            return None
+        return Change(ADDED, change.key, change.obj)
+
+    if queued.kind == REMOVED and change.kind == ADDED:
+        return Change(CHANGED, change.key, change.obj)
+
+    return change
+
+
+class Subscription:  # pylint: disable=R0902
+    """
+    A consumer's interest in the changes to a resource class, and the queue of changes
+    waiting for it.  Iterate over a subscription, or call get, to receive them.
+    """
+
+    # pylint: disable=R0913
+    def __init__(
+        self,
+        hub: "SubscriptionHub",
+        cls: type,
+        namespace: Optional[str] = None,
+        *,
+        labels: Dict[str, str] = None,
+        predicate: Callable[[Any], bool] = None,
+        policy: str = DROP,
+        maxsize: int = DEFAULT_QUEUE_SIZE,
+    ):
+        """
+        Instance initialization.  Subscriptions are made with SubscriptionHub.subscribe.
+        """
+
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown policy '{policy}' (expected one of {POLICIES})")
+
+        if maxsize < 1:
+            raise ValueError("The queue size must be at least 1")
+
+        self.hub = hub
+        self.cls = cls
+        self.namespace = namespace
+        self.labels = dict(labels or {})
+        self.predicate = predicate
+        self.policy = policy
+        self.maxsize = maxsize
+        self.closed = False
+        self.delivered = 0
+        self.dropped = 0
+        self.coalesced = 0
+        self._cond = threading.Condition()
+        # Queued changes, keyed by resource when coalescing and by arrival otherwise
+        self._queue: "OrderedDict[Any, Change]" = OrderedDict()
+        self._arrivals = itertools.count()
+        # The resources this subscription has been told about, so only those removals
+        # reach it
+        self._keys = set()
+
+    def matches(self, obj) -> bool:
+        """
+        Whether a resource is of interest to this subscription.
+        """
+        return self._selects(obj) and (self.predicate is None or bool(self.predicate(obj)))
+
+    def _selects(self, obj) -> bool:
+        """
+        Whether a resource is in the namespace and has the labels this subscription wants.
+        """
+
+        metadata = getattr(obj, "metadata", None)
+        if self.namespace is not None and getattr(metadata, "namespace", None) != self.namespace:
+            return False
+
+        if self.labels:
+            labels = resource_labels(obj)
+            if any(labels.get(k) != v for k, v in self.labels.items()):
+                return False
+
+        return True
+
+    def _model(self, view: LazyResource):
+        """
+        Return a model object of this subscription's own for a resource the feed listed, or
+        None if the resource isn't of interest.  The namespace and labels are checked on the
+        feed's (read-only) view, so a model is validated only for subscriptions that may
+        want it, and the predicate is given the model.
+        """
+
+        if not self._selects(view):
+            return None
+
+        obj = LazyResource(view.resource_class, view.raw, client=self.hub.client).materialize()
+        if self.predicate is not None and not self.predicate(obj):
+            return None
+
+        return obj
+
+    def _dispatch(self, change: Change, stop: threading.Event):
+        """
+        Queue a change from the feed, if it's of interest.  A resource which no longer
+        matches is reported as removed, if this subscription was told about it.
+        """
+
+        obj = self._model(change.obj) if change.kind != REMOVED else None
+        if obj is not None:
+            self._keys.add(change.key)
+            self._offer(Change(change.kind, change.key, obj), stop)
+        elif change.key in self._keys:
+            self._keys.discard(change.key)
+            self._offer(Change(REMOVED, change.key), stop)
+
+    def _offer(self, change: Change, stop: threading.Event):
+        """
+        Queue a change, applying the policy if the queue is full.
+        """
+
+        with self._cond:
+            if self.closed:
+                return
+
+            if self.policy == COALESCE and change.key in self._queue:
+                merged = _coalesce(self._queue[change.key], change)
+                if merged is None:
+                    del self._queue[change.key]
+                else:
+                    self._queue[change.key] = merged
+                self.coalesced += 1
+                return
+
+            while len(self._queue) >= self.maxsize:
+                if self.policy != BLOCK or self.closed or stop.is_set():
+                    self.dropped += 1
+                    return
+                self._cond.wait(BLOCK_CHECK_INTERVAL)
+
+            key = change.key if self.policy == COALESCE else next(self._arrivals)
+            self._queue[key] = change
+            self._cond.notify_all()
+
+    def get(self, timeout: float = None) -> Optional[Change]:
+        """
+        Return the next change, waiting for one if need be.
+
+        :param timeout: The most seconds to wait (default is to wait until a change arrives
+                        or the subscription is closed).
+        :return: The change, or None if there was none in time or the subscription is
+                 closed and its queue is empty.
+        """
+
+        with self._cond:
+            if not self._cond.wait_for(lambda: self._queue or self.closed, timeout):
+                return None
+
+            if not self._queue:
+                return None
+
+            _, change = self._queue.popitem(last=False)
+            self.delivered += 1
+            self._cond.notify_all()
+
+        return change
+
+    def __iter__(self) -> Iterator[Change]:
+        """
+        Yield changes as they arrive, until the subscription is closed.
+        """
+
+        while True:
+            change = self.get()
+            if change is None:
+                return
+            yield change
+
+    def close(self):
+        """
+        Stop receiving changes.  Changes already queued may still be read.
+        """
+
+        self.hub.unsubscribe(self)
+        with self._cond:
+            self.closed = True
+            self._cond.notify_all()
+
+    def stats(self) -> dict:
+        """
+        Return the number of changes delivered, dropped and coalesced, and those queued.
+        """
+
+        with self._cond:
+            return {
+                "delivered": self.delivered,
+                "dropped": self.dropped,
+                "coalesced": self.coalesced,
+                "pending": len(self._queue),
+            }
+
+
+class SubscriptionHub:  # pylint: disable=R0902
+    """
+    Feeds many subscriptions from one shared ChangeFeed per resource class.
+
+    The hub holds the decoded JSON of every resource its feeds know of, so that new
+    subscriptions start from the current collection: about as much memory as one listing of
+    each class subscribed to.  A class' resources are let go when its last subscription is
+    closed.  Subscriptions are handed model objects of their own, validated from that JSON
+    for each change, so one consumer changing an object doesn't affect any other.
+    """
+
+    def __init__(
+        self, client, *, retry_interval: float = DEFAULT_RETRY_INTERVAL,
+        on_error: Optional[Callable[[Exception], None]] = None, **feed_options
+    ):
+        """
+        Instance initialization
+
+        :param client: The SensuClient to poll with.
+        :param retry_interval: How many seconds to wait before retrying a failed poll.
+        :param on_error: An optional callable, given any error raised by a poll.
+        :param feed_options: Further arguments for each ChangeFeed, such as interval,
+                             min_interval, max_interval and busy.  A checkpoint path is
+                             suffixed with the name of each class, so that each feed keeps
+                             its own file.  The feeds always report LazyResource views, from
+                             which each subscription builds its own models.
+        """
+        self.client = client
+        self.retry_interval = retry_interval
+        self.on_error = on_error
+        self.feed_options = feed_options
+        self.last_error = None
+        self.feeds: Dict[type, ChangeFeed] = {}
+        self._subscriptions: Dict[type, List[Subscription]] = {}
+        # The views of the resources each feed currently knows of, by key, to seed new
+        # subscriptions
+        self._resources: Dict[type, Dict[str, LazyResource]] = {}
+        self._due: Dict[type, float] = {}
+        self._lock = threading.Lock()
+        # Held while changes are handed out, so a new subscription is seeded with the state
+        # from either before or after a poll's changes, never part way through them
+        self._dispatching = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    # pylint: disable=R0913
+    def subscribe(
+        self, cls: type, namespace: Optional[str] = None, *, labels: Dict[str, str] = None,
+        predicate: Callable[[Any], bool] = None, policy: str = DROP,
+        maxsize: int = DEFAULT_QUEUE_SIZE,
+    ) -> Subscription:
+        """
+        Subscribe to the changes to a resource class.
+
+        A new subscription first receives the matching resources the hub already knows of,
+        as added, and then the changes found by later polls.  The first poll of a class
+        reports every resource as added, so subscriptions made before it see the whole
+        collection too.  If the known resources don't all fit in the queue, the rest are
+        dropped, whatever the policy.
+
+        :param cls: The resource class, such as Event.
+        :param namespace: Only receive resources in this namespace (default is all).
+        :param labels: Only receive resources with all of these labels.
+        :param predicate: Only receive resources for which this returns True.
+        :param policy: What to do with changes when the queue is full: DROP, BLOCK or
+                       COALESCE.
+        :param maxsize: The most changes to queue.
+        :return: The Subscription.
+        """
+
+        subscription = Subscription(
+            self, cls, namespace, labels=labels, predicate=predicate, policy=policy,
+            maxsize=maxsize,
+        )
+        with self._dispatching:
+            with self._lock:
+                if cls not in self.feeds:
+                    self.feeds[cls] = self._make_feed(cls)
+                    self._resources[cls] = {}
+                    self._due[cls] = time.monotonic()
+                self._subscriptions.setdefault(cls, []).append(subscription)
+                known = list(self._resources[cls].items())
+
+            # The consumer can't read the queue yet, so seeding must not wait for room
+            seeding = threading.Event()
+            seeding.set()
+            for key, obj in known:
+                subscription._dispatch(Change(ADDED, key, obj), seeding)  # pylint: disable=W0212
+
+        return subscription
+
+    def _make_feed(self, cls: type) -> ChangeFeed:
+        """
+        Make the feed for a class, reporting views, with a checkpoint file of its own.
+        """
+
+        options = dict(self.feed_options, materialize=False)
+        if options.get("checkpoint") is not None:
+            root, ext = os.path.splitext(options["checkpoint"])
+            options["checkpoint"] = f"{root}.{cls.__name__.lower()}{ext}"
+
+        return ChangeFeed(self.client, cls, **options)
+
+    def unsubscribe(self, subscription: Subscription):
+        """
+        Remove a subscription.  A class with no subscriptions left is no longer polled.
+        """
+
+        with self._lock:
+            subscriptions = self._subscriptions.get(subscription.cls, [])
+            if subscription in subscriptions:
+                subscriptions.remove(subscription)
+            if not subscriptions:
+                self._subscriptions.pop(subscription.cls, None)
+                self.feeds.pop(subscription.cls, None)
+                self._resources.pop(subscription.cls, None)
+                self._due.pop(subscription.cls, None)
+
+    def poll(self, cls: type = None) -> int:
+        """
+        Poll the feed for a class (default is every class) once, and hand the changes to
+        the subscriptions.  A class with no subscriptions is skipped.
+
+        :return: The number of changes found.
+        """
+
+        with self._lock:
+            if cls is None:
+                feeds = list(self.feeds.values())
+            else:
+                feeds = [self.feeds[cls]] if cls in self.feeds else []
+
+        count = 0
+        for feed in feeds:
+            changes = feed.poll()
+            count += len(changes)
+            with self._dispatching:
+                with self._lock:
+                    # The last subscription may have gone while the feed was polled
+                    if self.feeds.get(feed.cls) is not feed:
+                        continue
+                    subscriptions = list(self._subscriptions[feed.cls])
+                    resources = self._resources[feed.cls]
+
+                for change in changes:
+                    if change.kind == REMOVED:
+                        resources.pop(change.key, None)
+                    else:
+                        resources[change.key] = change.obj
+                    for subscription in subscriptions:
+                        subscription._dispatch(change, self._stop)  # pylint: disable=W0212
+
+        return count
+
+    def start(self):
+        """
+        Start polling in a background (daemon) thread, each class at its feed's interval.
+        """
+
+        if self._thread and self._thread.is_alive():
+            return
+
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="fawlty-hub", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: Optional[float] = None):
+        """
+        Stop the background thread.
+
+        :param timeout: How many seconds to wait for the thread to finish.
+        """
+
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout)
+
+    @property
+    def running(self) -> bool:
+        """
+        Whether the background thread is running.
+        """
+        return self._thread is not None and self._thread.is_alive()
+
+    def close(self):
+        """
+        Stop polling, and close every subscription.
+        """
+
+        self.stop()
+        with self._lock:
+            subscriptions = [_ for group in self._subscriptions.values() for _ in group]
+        for subscription in subscriptions:
+            subscription.close()
+
+    def _next_due(self) -> Optional[type]:
+        """
+        Return the class whose poll is due soonest, waiting until it is due.
+        """
+
+        with self._lock:
+            if not self._due:
+                cls, due = None, time.monotonic() + self.retry_interval
+            else:
+                cls, due = min(self._due.items(), key=lambda _: _[1])
+
+        if self._stop.wait(max(due - time.monotonic(), 0)):
+            return None
+
+        return cls
+
+    def _run(self):
+        """
+        The body of the background thread.
+        """
+
+        while not self._stop.is_set():
+            cls = self._next_due()
+            if cls is None:
+                continue
+
+            try:
+                self.poll(cls)
+                self.last_error = None
+                wait = None
+            # One bad poll mustn't stop the others, whatever it raised
+            except Exception as err:  # pylint: disable=W0718
+                self.last_error = err
+                if self.on_error:
+                    self.on_error(err)
+                wait = self.retry_interval
+
+            with self._lock:
+                feed = self.feeds.get(cls)
+                if feed is not None:
+                    self._due[cls] = time.monotonic() + (wait or feed.interval)
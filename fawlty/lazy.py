@@ -0,0 +1,155 @@
+"""
+A module providing lazy, read-only views of resources, which validate each field only when
+it is first read.
+"""
+
+# Built in imports
+from functools import lru_cache
+from typing import Any, Optional, Union, get_args, get_origin
+
+# 3rd party imports
+from pydantic import BaseModel, TypeAdapter
+
+# Our imports
+from fawlty.exceptions import SensuResourceError
+
+# Constants
+NoneType = type(None)
+
+
+@lru_cache(maxsize=None)
+def _field_adapter(cls, name: str) -> TypeAdapter:
+    """
+    Return a (cached) TypeAdapter for one field of a model, including its constraints.
+    """
+    return TypeAdapter(cls.model_fields[name].rebuild_annotation())
+
+
+@lru_cache(maxsize=None)
+def _nested_model(cls, name: str) -> Optional[type]:
+    """
+    Return the model class of a field holding a (possibly optional) nested model, if it is one.
+    """
+
+    annotation = cls.model_fields[name].annotation
+    if get_origin(annotation) is Union:
+        args = [_ for _ in get_args(annotation) if _ is not NoneType]
+        if len(args) != 1:
+            return None
+        annotation = args[0]
+
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return annotation
+
+    return None
+
+
+class LazyResource:
+    """
+    A read-only view of a resource, built from its decoded JSON, which offers the same
+    attribute access as the model it stands in for.
+
+    Each field is validated the first time it is read, and the result is kept.  Fields
+    holding a nested model are returned as LazyResource views in turn, so their own fields
+    are validated only as they are read.  Validators that check the model as a whole, and
+    field validator methods, run only when the view is materialized.
+    """
+
+    __slots__ = ("_cls", "_data", "_values", "_model", "_sensu_client")
+
+    def __init__(self, cls, data: dict, client=None):
+        """
+        Instance initialization
+
+        :param cls: The model class the view stands in for.
+        :param data: The decoded JSON of the resource.
+        :param client: The client to seed the materialized resource with.
+        """
+        object.__setattr__(self, "_cls", cls)
+        object.__setattr__(self, "_data", data)
+        object.__setattr__(self, "_values", {})
+        object.__setattr__(self, "_model", None)
+        object.__setattr__(self, "_sensu_client", client)
+
+    def __getattr__(self, name: str) -> Any:
+        """
+        Validate and return a field, the first time it is read.
+        """
+
+        if name not in self._cls.model_fields:
+            # Class level constants, such as BASE_URL, are shared with the model
+            value = getattr(self._cls, name, None)
+            if isinstance(value, property) and not name.startswith("_"):
+                # Properties may read any field, so they're evaluated on the full model
+                return getattr(self.materialize(), name)
+            if name.startswith("_") or value is None or callable(value):
+                raise AttributeError(f"'{self._cls.__name__}' view has no attribute '{name}'")
+            return value
+
+        if name in self._values:
+            return self._values[name]
+
+        field = self._cls.model_fields[name]
+        if name not in self._data:
+            if field.is_required():
+                raise SensuResourceError(f"{self._cls.__name__} is missing the '{name}' field")
+            value = field.get_default(call_default_factory=True)
+
+        else:
+            raw = self._data[name]
+            nested = _nested_model(self._cls, name)
+            if nested is not None and isinstance(raw, dict):
+                value = LazyResource(nested, raw, client=self._sensu_client)
+            else:
+                value = _field_adapter(self._cls, name).validate_python(raw)
+
+        self._values[name] = value
+
+        return value
+
+    def __setattr__(self, name: str, value: Any):
+        raise AttributeError(
+            f"'{self._cls.__name__}' views are read-only; call materialize() to change them"
+        )
+
+    def __dir__(self):
+        return list(self._cls.model_fields) + [
+            "materialize", "model_dump", "raw", "resource_class"
+        ]
+
+    def __repr__(self) -> str:
+        return f"LazyResource({self._cls.__name__})"
+
+    @property
+    def resource_class(self) -> type:
+        """
+        The model class the view stands in for.
+        """
+        return self._cls
+
+    @property
+    def raw(self) -> dict:
+        """
+        The decoded JSON the view was built from, which must not be changed.
+        """
+        return self._data
+
+    def materialize(self):
+        """
+        Fully validate the resource, returning the real model object (seeded with the client
+        the view was retrieved with).  The object is built once, and returned by later calls.
+        """
+
+        if self._model is None:
+            model = self._cls.model_validate(self._data)
+            if self._sensu_client is not None and hasattr(model, "set_client"):
+                model.set_client(self._sensu_client)
+            object.__setattr__(self, "_model", model)
+
+        return self._model
+
+    def model_dump(self, **kwargs) -> dict:
+        """
+        Dump the materialized resource to a dict.
+        """
+        return self.materialize().model_dump(**kwargs)
@@ -0,0 +1,409 @@
+"""
+A module for recording metrics about the calls a client makes to the Sensu server: request
+counts, statuses, bytes sent and received, retries and latencies, along with the time spent
+decoding and validating responses.
+
+Metrics are kept per endpoint template (the path with namespaces and resource names
+replaced by placeholders) and resource class, and can be read as a snapshot dictionary or
+in the Prometheus text exposition format.
+"""
+
+# Built in imports
+import threading
+from collections import Counter
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# Constants
+SUB_BUCKET_BITS = 7
+SUB_BUCKETS = 1 << SUB_BUCKET_BITS
+UNITS_PER_SECOND = 1_000_000
+QUANTILES = (("p50", 0.5), ("p99", 0.99), ("p999", 0.999))
+API_PREFIX_SEGMENTS = 3
+ERROR_STATUS = "error"
+
+
+class Histogram:
+    """
+    A histogram of durations, with log-linear buckets in the style of HdrHistogram.
+
+    Durations are held in microseconds.  Each power of two range is split into SUB_BUCKETS
+    equal buckets, so any recorded value, and so any percentile, is known to within 1%
+    whatever its magnitude.  Buckets are only allocated once a value falls in them.
+    """
+
+    __slots__ = ("counts", "count", "total", "min", "max")
+
+    def __init__(self):
+        """
+        Instance initialization
+        """
+        self.counts = Counter()
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+
+    @staticmethod
+    def _index(value: int) -> int:
+        """
+        Return the bucket index for a value, in microseconds.
+        """
+
+        if value < SUB_BUCKETS:
+            return value
+
+        shift = value.bit_length() - SUB_BUCKET_BITS - 1
+
+        return (shift + 1) * SUB_BUCKETS + (value >> shift) - SUB_BUCKETS
+
+    @staticmethod
+    def _upper_bound(index: int) -> int:
+        """
+        Return the highest value, in microseconds, that falls in a bucket.
+        """
+
+        if index < SUB_BUCKETS:
+            return index
+
+        shift = index // SUB_BUCKETS - 1
+        sub = index % SUB_BUCKETS + SUB_BUCKETS
+
+        return ((sub + 1) << shift) - 1
+
+    def record(self, seconds: float):
+        """
+        Record a duration.
+
+        :param seconds: The duration, in seconds.
+        """
+
+        self.counts[self._index(max(int(seconds * UNITS_PER_SECOND), 0))] += 1
+        self.count += 1
+        self.total += seconds
+        if self.min is None or seconds < self.min:
+            self.min = seconds
+        if self.max is None or seconds > self.max:
+            self.max = seconds
+
+    def percentile(self, quantile: float) -> Optional[float]:
+        """
+        Return the duration, in seconds, that the given fraction of recorded durations do
+        not exceed.
+
+        :param quantile: A fraction between 0 and 1 (0.99 for the 99th percentile).
+        :return: The duration, or None if nothing has been recorded.
+        """
+
+        if not self.count:
+            return None
+
+        rank = max(quantile * self.count, 1)
+        seen = 0
+        for index in sorted(self.counts):
+            seen += self.counts[index]
+            if seen >= rank:
+                break
+
+        value = self._upper_bound(index) / UNITS_PER_SECOND  # pylint: disable=W0631
+
+        return min(max(value, self.min), self.max)
+
+    def summary(self) -> dict:
+        """
+        Return the count, sum, extremes and percentiles of the recorded durations.
+        """
+
+        summary = {"count": self.count, "sum": self.total, "min": self.min, "max": self.max}
+        for name, quantile in QUANTILES:
+            summary[name] = self.percentile(quantile)
+
+        return summary
+
+
+class EndpointStats:  # pylint: disable=R0902,R0903
+    """
+    The metrics for the calls to one endpoint template, for one resource class.
+    """
+
+    def __init__(self):
+        """
+        Instance initialization
+        """
+        self.requests = 0
+        self.coalesced = 0
+        self.statuses = Counter()
+        self.retries = 0
+        self.bytes_out = 0
+        self.bytes_in = 0
+        self.latency = Histogram()
+
+    def summary(self) -> dict:
+        """
+        Return the metrics as plain data.
+        """
+
+        return {
+            "requests": self.requests,
+            "coalesced": self.coalesced,
+            "statuses": dict(self.statuses),
+            "retries": self.retries,
+            "bytes_out": self.bytes_out,
+            "bytes_in": self.bytes_in,
+            "latency": self.latency.summary(),
+        }
+
+
+@lru_cache(maxsize=4096)
+def endpoint_template(path: str) -> str:
+    """
+    Turn a request path into the template of the endpoint it calls, so that metrics are not
+    kept separately for every namespace and resource name.  The namespace becomes
+    {namespace}, and every segment after the collection becomes {name}, so that
+    /api/core/v2/namespaces/default/checks/check-cpu becomes
+    /api/core/v2/namespaces/{namespace}/checks/{name}.
+
+    :param path: The path, which may carry a query string.
+    :return: The endpoint template.
+    """
+
+    segments = path.split("?", 1)[0].strip("/").split("/")
+    if segments[0] != "api" or len(segments) <= API_PREFIX_SEGMENTS:
+        return "/" + "/".join(segments)
+
+    template = segments[:API_PREFIX_SEGMENTS]
+    rest = segments[API_PREFIX_SEGMENTS:]
+    if rest[0] == "namespaces" and len(rest) > 1:
+        template += ["namespaces", "{namespace}"]
+        rest = rest[2:]
+
+    if rest:
+        template += [rest[0]] + ["{name}"] * (len(rest) - 1)
+
+    return "/" + "/".join(template)
+
+
+def _labels(**labels) -> str:
+    """
+    Render a set of Prometheus labels, escaping their values.
+    """
+
+    rendered = []
+    for name, value in labels.items():
+        value = str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+        rendered.append(f'{name}="{value}"')
+
+    return "{" + ",".join(rendered) + "}"
+
+
+def _format(value: Optional[float]) -> str:
+    """
+    Render a number for the Prometheus text format.
+    """
+    return "NaN" if value is None else repr(value)
+
+
+class ClientMetrics:
+    """
+    Collects metrics about a client's calls to the Sensu server.  Give one to a client with
+    its metrics argument or attribute; a client without one records nothing.
+
+    A call's latency covers all of its attempts, including the waits between them, and its
+    status is that of the final attempt (or "error" if it failed to get a response).  The
+    time spent decoding and validating responses into resource objects is kept per resource
+    class.  Streamed responses are decoded as they are read, so only their calls are counted.
+    """
+
+    def __init__(self, prefix: str = "fawlty"):
+        """
+        Instance initialization
+
+        :param prefix: The prefix for the metric names in the Prometheus output.
+        """
+        self.prefix = prefix
+        self._lock = threading.Lock()
+        self._endpoints: Dict[Tuple[str, str, str], EndpointStats] = {}
+        self._decode: Dict[str, Histogram] = {}
+        self._validate: Dict[str, Histogram] = {}
+
+    # pylint: disable=R0913
+    def record_call(
+        self, method: str, path: str, resource, *, status, elapsed: float, attempts: int = 1,
+        bytes_out: int = 0, bytes_in: int = 0
+    ):
+        """
+        Record a call made to the Sensu server.
+
+        :param method: The HTTP method.
+        :param path: The path called, which is reduced to its endpoint template.
+        :param resource: The resource class the call was for, or None.
+        :param status: The status of the final response, or None if there wasn't one.
+        :param elapsed: The seconds the call took, across all attempts.
+        :param attempts: The number of attempts made.
+        :param bytes_out: The size of the request body sent.
+        :param bytes_in: The size of the response body received.
+        """
+
+        with self._lock:
+            stats = self._stats_for(method, path, resource)
+            stats.requests += 1
+            stats.statuses[ERROR_STATUS if status is None else str(status)] += 1
+            stats.retries += attempts - 1
+            stats.bytes_out += bytes_out
+            stats.bytes_in += bytes_in
+            stats.latency.record(elapsed)
+
+    def record_coalesced(self, method: str, path: str, resource):
+        """
+        Record a request which wasn't sent, as it was coalesced with an identical request
+        already in flight.
+
+        :param method: The HTTP method.
+        :param path: The path which would have been called.
+        :param resource: The resource class the request was for, or None.
+        """
+
+        with self._lock:
+            self._stats_for(method, path, resource).coalesced += 1
+
+    def _stats_for(self, method: str, path: str, resource) -> EndpointStats:
+        """
+        Return the metrics for a method, path and resource class, creating them if need be.
+        The lock must be held.
+        """
+
+        key = (method.upper(), endpoint_template(path), _resource_name(resource))
+        stats = self._endpoints.get(key)
+        if stats is None:
+            stats = self._endpoints[key] = EndpointStats()
+
+        return stats
+
+    def record_decode(self, resource, decode: float, validate: Optional[float] = None):
+        """
+        Record the time taken to turn a response body into resource objects.
+
+        :param resource: The resource class the objects were built with.
+        :param decode: The seconds spent parsing the JSON.
+        :param validate: The seconds spent validating the parsed data, or None if it wasn't
+                         (as for lazy views).
+        """
+
+        name = _resource_name(resource)
+        with self._lock:
+            self._decode.setdefault(name, Histogram()).record(decode)
+            if validate is not None:
+                self._validate.setdefault(name, Histogram()).record(validate)
+
+    def reset(self):
+        """
+        Discard everything recorded so far.
+        """
+
+        with self._lock:
+            self._endpoints.clear()
+            self._decode.clear()
+            self._validate.clear()
+
+    def snapshot(self) -> dict:
+        """
+        Return the metrics recorded so far, as plain data.
+
+        :return: A dict with a "calls" list, holding the metrics of each method, endpoint
+                 template and resource class, and "decode" and "validate" dicts of
+                 latency summaries keyed by resource class name.
+        """
+
+        with self._lock:
+            calls = [
+                {"method": method, "endpoint": endpoint, "resource": resource, **stats.summary()}
+                for (method, endpoint, resource), stats in sorted(self._endpoints.items())
+            ]
+
+            return {
+                "calls": calls,
+                "decode": {name: _.summary() for name, _ in sorted(self._decode.items())},
+                "validate": {name: _.summary() for name, _ in sorted(self._validate.items())},
+            }
+
+    def to_prometheus(self) -> str:
+        """
+        Render the metrics in the Prometheus text exposition format.  Latencies are exposed
+        as summaries, with 0.5, 0.99 and 0.999 quantiles.
+        """
+
+        p = self.prefix
+        lines = []
+        with self._lock:
+            endpoints = sorted(self._endpoints.items())
+
+            lines += _header(f"{p}_requests_total", "counter", "Calls made to the Sensu API.")
+            for (method, endpoint, resource), stats in endpoints:
+                for status, count in sorted(stats.statuses.items()):
+                    labels = _labels(
+                        method=method, endpoint=endpoint, resource=resource, status=status
+                    )
+                    lines.append(f"{p}_requests_total{labels} {count}")
+
+            counters = (
+                (
+                    "coalesced_requests_total", "coalesced",
+                    "Requests not sent, as an identical one was already in flight.",
+                ),
+                ("retries_total", "retries", "Retries made after failed attempts."),
+                ("request_bytes_total", "bytes_out", "Request body bytes sent."),
+                ("response_bytes_total", "bytes_in", "Response body bytes received."),
+            )
+            for name, attr, help_text in counters:
+                lines += _header(f"{p}_{name}", "counter", help_text)
+                for (method, endpoint, resource), stats in endpoints:
+                    labels = _labels(method=method, endpoint=endpoint, resource=resource)
+                    lines.append(f"{p}_{name}{labels} {getattr(stats, attr)}")
+
+            lines += _summary(
+                f"{p}_request_duration_seconds", "Call latency, across all attempts.",
+                [
+                    ({"method": method, "endpoint": endpoint, "resource": resource}, stats.latency)
+                    for (method, endpoint, resource), stats in endpoints
+                ],
+            )
+            lines += _summary(
+                f"{p}_decode_duration_seconds", "Time spent parsing response bodies.",
+                [({"resource": name}, _) for name, _ in sorted(self._decode.items())],
+            )
+            lines += _summary(
+                f"{p}_validate_duration_seconds", "Time spent validating resource objects.",
+                [({"resource": name}, _) for name, _ in sorted(self._validate.items())],
+            )
+
+        return "\n".join(lines) + "\n"
+
+
+def _resource_name(resource) -> str:
+    """
+    Return the name metrics are kept under for a resource class.
+    """
+    return getattr(resource, "__name__", "") if resource is not None else ""
+
+
+def _header(name: str, kind: str, help_text: str) -> List[str]:
+    """
+    Return the HELP and TYPE lines for a Prometheus metric.
+    """
+    return [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}"]
+
+
+def _summary(name: str, help_text: str, series: Iterable[Tuple[dict, Histogram]]) -> List[str]:
+    """
+    Return the lines for a Prometheus summary, built from histograms.
+    """
+
+    lines = _header(name, "summary", help_text)
+    for labels, histogram in series:
+        for _, quantile in QUANTILES:
+            rendered = _labels(**labels, quantile=quantile)
+            lines.append(f"{name}{rendered} {_format(histogram.percentile(quantile))}")
+        lines.append(f"{name}_sum{_labels(**labels)} {_format(histogram.total)}")
+        lines.append(f"{name}_count{_labels(**labels)} {histogram.count}")
+
+    return lines
@@ -0,0 +1,114 @@
+"""
+Helpers for retrieving paginated collections from the Sensu API.
+
+The Sensu API pages collections with a ``limit`` query parameter, and hands back a
+``Sensu-Continue`` response header whenever more results remain.  That token is sent
+back as the ``continue`` query parameter to fetch the following page.
+"""
+
+# Built in imports
+from typing import Union
+
+# Constants
+DEFAULT_PAGE_SIZE = 100
+CONTINUE_HEADER = "Sensu-Continue"
+
+
+class PageSizer:
+    """
+    Decides how many items to request per page.  This base class uses a fixed size.
+    """
+
+    def __init__(self, size: int = DEFAULT_PAGE_SIZE):
+        """
+        Instance initialization
+
+        :param size: The number of items to request per page.
+        """
+        if size < 1:
+            raise ValueError("Page size must be at least 1")
+
+        self.size = size
+
+    def next_size(self) -> int:
+        """
+        Return the page size to use for the next request.
+        """
+        return self.size
+
+    def observe(self, elapsed: float, count: int, limit: int):
+        """
+        Record how long a page took to retrieve.  A fixed sizer ignores this.
+
+        :param elapsed: The number of seconds the page request took.
+        :param count: The number of items in the page.
+        :param limit: The page size that was requested.
+        """
+
+
+class AdaptivePageSizer(PageSizer):
+    """
+    A page sizer that tunes the page size from observed response latency, aiming to keep
+    each page request close to a target duration.
+    """
+
+    # pylint: disable=R0913
+    def __init__(
+        self,
+        size: int = DEFAULT_PAGE_SIZE,
+        target_latency: float = 0.5,
+        min_size: int = 10,
+        max_size: int = 1000,
+        max_step: float = 2.0,
+    ):
+        """
+        Instance initialization
+
+        :param size: The initial page size.
+        :param target_latency: The desired number of seconds per page request.
+        :param min_size: The smallest page size that will be used.
+        :param max_size: The largest page size that will be used.
+        :param max_step: The largest factor the size may grow or shrink by in one step.
+        """
+        if min_size < 1 or max_size < min_size:
+            raise ValueError("Page size bounds must satisfy 1 <= min_size <= max_size")
+
+        super().__init__(size=min(max(size, min_size), max_size))
+        self.target_latency = target_latency
+        self.min_size = min_size
+        self.max_size = max_size
+        self.max_step = max_step
+
+    def observe(self, elapsed: float, count: int, limit: int):
+        """
+        Scale the page size toward the target latency.
+
+        Short pages (the final page of a collection) say nothing about how a full page
+        would perform, so they are ignored.
+        """
+
+        if elapsed <= 0 or count < limit:
+            return
+
+        ratio = self.target_latency / elapsed
+        ratio = min(max(ratio, 1 / self.max_step), self.max_step)
+        self.size = min(max(int(limit * ratio), self.min_size), self.max_size)
+
+
+def get_page_sizer(
+    page_size: Union[int, PageSizer, None], default: Union[int, PageSizer, None] = None
+) -> PageSizer:
+    """
+    Normalize a page size argument into a PageSizer instance.
+
+    :param page_size: An integer size, a PageSizer, or None to use the default.
+    :param default: The size (or PageSizer) to use when page_size is None.
+    """
+
+    if page_size is None:
+        page_size = default
+
+    if isinstance(page_size, PageSizer):
+        return page_size
+
+    return PageSizer(size=page_size or DEFAULT_PAGE_SIZE)
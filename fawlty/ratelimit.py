@@ -0,0 +1,378 @@
+"""
+A module for limiting the load a client puts on the Sensu server.
+
+A RateLimiter caps the rate of requests, both overall and per namespace, with token
+buckets.  An AIMDLimiter caps the number of requests in flight, adapting the cap to how the
+server copes: it grows slowly while responses come back quickly, and is cut sharply when
+they slow down or the server reports that it is overloaded.
+
+Both wait no longer than any deadline in force, raising a SensuTimeoutError instead.
+"""
+
+# Built in imports
+import asyncio
+import threading
+import time
+from typing import Dict, Iterable, Optional
+
+# Our imports
+from fawlty.deadline import remaining
+from fawlty.exceptions import SensuTimeoutError
+
+# Constants
+OVERLOAD_STATUSES = (429, 500, 502, 503, 504)
+BASELINE_DECAY = 0.01
+LATENCY_SLACK = 0.01
+
+
+def namespace_of(path: str) -> Optional[str]:
+    """
+    Return the namespace a request path operates within, if any.
+
+    :param path: A path such as /api/core/v2/namespaces/default/checks.
+    """
+
+    segments = path.split("?", 1)[0].strip("/").split("/")
+    if len(segments) > 5 and segments[0] == "api" and segments[3] == "namespaces":
+        return segments[4]
+
+    return None
+
+
+class TokenBucket:
+    """
+    A token bucket, refilled at a steady rate up to a maximum (the burst).  Each request
+    takes a token.  When the bucket is empty, requests reserve tokens ahead of time and
+    wait until they are due, so waiters are served in turn at the configured rate.
+    """
+
+    def __init__(self, rate: float, burst: Optional[float] = None):
+        """
+        Instance initialization
+
+        :param rate: The tokens added per second.
+        :param burst: The most tokens the bucket holds (default is the rate, or 1 if less).
+        """
+
+        if rate <= 0:
+            raise ValueError("The rate must be positive")
+
+        self.rate = rate
+        self.burst = burst if burst is not None else max(rate, 1.0)
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self, max_wait: Optional[float] = None) -> Optional[float]:
+        """
+        Take a token, reserving it ahead of time if the bucket is empty.
+
+        :param max_wait: Don't take a token that wouldn't be due within this many seconds.
+        :return: The seconds to wait before the token is due, or None if it was not taken.
+        """
+
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+
+            wait = max(1 - self._tokens, 0) / self.rate
+            if max_wait is not None and wait > max_wait:
+                return None
+
+            self._tokens -= 1
+
+        return wait
+
+    def refund(self):
+        """
+        Give back a token taken with reserve, which is no longer needed.
+        """
+        with self._lock:
+            self._tokens = min(self.burst, self._tokens + 1)
+
+
+class RateLimiter:  # pylint: disable=R0902
+    """
+    Limits the rate of requests, overall and within each namespace.  A request waits until
+    every bucket that applies to it has a token for it.
+    """
+
+    def __init__(
+        self,
+        rate: Optional[float] = None,
+        burst: Optional[float] = None,
+        *,
+        per_namespace: Optional[float] = None,
+        namespace_burst: Optional[float] = None,
+        namespaces: Optional[Dict[str, float]] = None,
+    ):
+        """
+        Instance initialization
+
+        :param rate: The most requests per second overall (default is no overall limit).
+        :param burst: The most requests made at once after a quiet spell (default is the
+                      rate).
+        :param per_namespace: The most requests per second within any one namespace
+                              (default is no per namespace limit).
+        :param namespace_burst: The burst for each namespace (default is its rate).
+        :param namespaces: Rates for particular namespaces, overriding per_namespace.
+        """
+        self.overall = TokenBucket(rate, burst) if rate else None
+        self.per_namespace = per_namespace
+        self.namespace_burst = namespace_burst
+        self.namespace_rates = dict(namespaces or {})
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._lock = threading.Lock()
+        self.throttled = 0
+        self.waited = 0.0
+
+    def _buckets_for(self, path: str) -> Iterable[TokenBucket]:
+        """
+        Return the buckets which apply to a request.
+        """
+
+        buckets = [self.overall] if self.overall else []
+        namespace = namespace_of(path)
+        if namespace is None:
+            return buckets
+
+        rate = self.namespace_rates.get(namespace, self.per_namespace)
+        if rate:
+            with self._lock:
+                bucket = self._buckets.get(namespace)
+                if bucket is None:
+                    bucket = self._buckets[namespace] = TokenBucket(rate, self.namespace_burst)
+            buckets.append(bucket)
+
+        return buckets
+
+    def reserve(self, path: str) -> float:
+        """
+        Reserve a slot for a request.
+
+        :param path: The path of the request, which decides its namespace.
+        :return: The seconds to wait before making the request.
+        """
+
+        left = remaining()
+        max_wait = None if left is None else max(left, 0)
+
+        taken = []
+        for bucket in self._buckets_for(path):
+            wait = bucket.reserve(max_wait)
+            if wait is None:
+                for _ in taken:
+                    _[0].refund()
+                raise SensuTimeoutError("Deadline exceeded waiting for the rate limiter")
+            taken.append((bucket, wait))
+
+        wait = max((_[1] for _ in taken), default=0.0)
+        if wait > 0:
+            with self._lock:
+                self.throttled += 1
+                self.waited += wait
+
+        return wait
+
+    def acquire(self, path: str):
+        """
+        Wait until a request may be made.
+
+        :param path: The path of the request, which decides its namespace.
+        """
+
+        wait = self.reserve(path)
+        if wait > 0:
+            time.sleep(wait)
+
+    async def aacquire(self, path: str):
+        """
+        Wait, without blocking the event loop, until a request may be made.
+
+        :param path: The path of the request, which decides its namespace.
+        """
+
+        wait = self.reserve(path)
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    def stats(self) -> dict:
+        """
+        Return the number of requests which had to wait, and the total seconds waited.
+        """
+        with self._lock:
+            return {"throttled": self.throttled, "waited": self.waited}
+
+
+class AIMDLimiter:  # pylint: disable=R0902
+    """
+    Limits the requests in flight, adapting the limit with additive increase and
+    multiplicative decrease (AIMD).
+
+    Each response which comes back quickly raises the limit by 1/limit, so it grows by about
+    one for each full round of requests.  A response with an overload status (429 or 5xx),
+    a failed request, or a response much slower than the fastest seen recently, cuts the
+    limit by the backoff ratio.  The limit is cut at most once per round trip, so a burst of
+    slow responses to requests already in flight counts only once.
+
+    A limiter may be shared by several clients, and by threads and event loops.
+    """
+
+    # pylint: disable=R0913
+    def __init__(
+        self,
+        initial_limit: int = 8,
+        *,
+        min_limit: int = 1,
+        max_limit: int = 64,
+        backoff_ratio: float = 0.5,
+        latency_tolerance: float = 2.0,
+        max_latency: Optional[float] = None,
+        overload_statuses: Iterable[int] = OVERLOAD_STATUSES,
+    ):
+        """
+        Instance initialization
+
+        :param initial_limit: The limit to start with.
+        :param min_limit: The lowest the limit is cut to.
+        :param max_limit: The highest the limit grows to.
+        :param backoff_ratio: What the limit is multiplied by when it is cut.
+        :param latency_tolerance: How many times slower than the recent fastest response a
+                                  response may be before the limit is cut.
+        :param max_latency: A response time, in seconds, beyond which the limit is always
+                            cut (default is to only compare with the recent fastest).
+        :param overload_statuses: Response statuses which mean the server is overloaded.
+        """
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.backoff_ratio = backoff_ratio
+        self.latency_tolerance = latency_tolerance
+        self.max_latency = max_latency
+        self.overload_statuses = frozenset(overload_statuses)
+
+        self._limit = float(min(max(initial_limit, min_limit), max_limit))
+        self._baseline = None
+        self._hold_until = 0.0
+        self._cond = threading.Condition()
+        self._async_waiters = []
+        self.in_flight = 0
+        self.decreases = 0
+
+    @property
+    def limit(self) -> int:
+        """
+        The number of requests currently allowed in flight.
+        """
+        return max(int(self._limit), self.min_limit)
+
+    def _try_acquire(self) -> bool:
+        """
+        Take a slot if one is free.  The condition's lock must be held.
+        """
+
+        if self.in_flight >= self.limit:
+            return False
+
+        self.in_flight += 1
+
+        return True
+
+    def acquire(self):
+        """
+        Wait for a slot to make a request in.  Every acquire must be followed by a release.
+        """
+
+        with self._cond:
+            if not self._cond.wait_for(self._try_acquire, timeout=remaining()):
+                raise SensuTimeoutError("Deadline exceeded waiting for the concurrency limiter")
+
+    async def aacquire(self):
+        """
+        Wait, without blocking the event loop, for a slot to make a request in.
+        """
+
+        loop = asyncio.get_running_loop()
+        while True:
+            with self._cond:
+                if self._try_acquire():
+                    return
+                waiter = loop.create_future()
+                self._async_waiters.append((loop, waiter))
+
+            try:
+                await asyncio.wait_for(waiter, remaining())
+            except asyncio.TimeoutError as err:
+                raise SensuTimeoutError(
+                    "Deadline exceeded waiting for the concurrency limiter"
+                ) from err
+
+    def release(self, elapsed: float, status: Optional[int] = None):
+        """
+        Free a slot, and adapt the limit to how the request went.
+
+        :param elapsed: The seconds the request took.
+        :param status: The response status, or None if the request failed.
+        """
+
+        with self._cond:
+            self.in_flight -= 1
+            if self._overloaded(elapsed, status):
+                now = time.monotonic()
+                if now >= self._hold_until:
+                    self._limit = max(self._limit * self.backoff_ratio, self.min_limit)
+                    self._hold_until = now + (self._baseline or elapsed) * self.latency_tolerance
+                    self.decreases += 1
+            else:
+                self._limit = min(self._limit + 1 / self._limit, self.max_limit)
+
+            if status is not None and status not in self.overload_statuses:
+                if self._baseline is None or elapsed < self._baseline:
+                    self._baseline = elapsed
+                else:
+                    self._baseline += BASELINE_DECAY * (elapsed - self._baseline)
+
+            self._cond.notify_all()
+            waiters, self._async_waiters = self._async_waiters, []
+
+        for loop, waiter in waiters:
+            if not loop.is_closed():
+                loop.call_soon_threadsafe(_wake, waiter)
+
+    def _overloaded(self, elapsed: float, status: Optional[int]) -> bool:
+        """
+        Whether a request's outcome shows the server to be overloaded.
+        """
+
+        if status is None or status in self.overload_statuses:
+            return True
+
+        if self.max_latency is not None and elapsed > self.max_latency:
+            return True
+
+        if self._baseline is None:
+            return False
+
+        return elapsed > self._baseline * self.latency_tolerance + LATENCY_SLACK
+
+    def stats(self) -> dict:
+        """
+        Return the current limit, the requests in flight and the number of cuts made.
+        """
+
+        with self._cond:
+            return {
+                "limit": self.limit,
+                "in_flight": self.in_flight,
+                "decreases": self.decreases,
+                "baseline_latency": self._baseline,
+            }
+
+
+def _wake(waiter: asyncio.Future):
+    """
+    Wake a task waiting for a slot, unless it has stopped waiting.
+    """
+
+    if not waiter.done():
+        waiter.set_result(None)
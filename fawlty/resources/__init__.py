@@ -1,23 +1,53 @@
 """
-Import all of the modules from the resource directory
+The Sensu resource modules.
+
+Each module is imported the first time it is used (as an attribute of this package, or
+with a normal import), rather than all of them when the package is imported, so a program
+only pays for the resources it touches.  The models themselves are built on first use too.
 """
 
-import os
+# Built in imports
 import importlib
 
-# Get the current directory
-current_dir = os.path.dirname(__file__)
+# Constants
+# The resource modules, which must be listed here to be reachable as package attributes
+RESOURCE_MODULES = (
+    "apikey",
+    "asset",
+    "check",
+    "clusterrole",
+    "clusterrolebinding",
+    "entity",
+    "event",
+    "filter",
+    "handler",
+    "hook",
+    "mutator",
+    "namespace",
+    "role",
+    "rolebinding",
+    "silence",
+    "user",
+)
+
+__all__ = ["base", *RESOURCE_MODULES]
+
+
+def __getattr__(name: str):
+    """
+    Import a resource module the first time it is looked up (PEP 562).
+    """
 
-# Get a list of all the Python files in the resources directory
-file_list = [f for f in os.listdir(current_dir) if f.endswith('.py')]
+    if name not in __all__:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
-# Import each module dynamically
-for file in file_list:
-    # Remove the file extension to get the module name
-    module_name = os.path.splitext(file)[0]
+    # Importing a submodule also sets it as an attribute of the package, so this is only
+    # called once for each
+    return importlib.import_module(f"{__name__}.{name}")
 
-    # Import the module
-    module = importlib.import_module(f'fawlty.resources.{module_name}')
 
-    # Add the module to the current namespace
-    globals()[module_name] = module
+def __dir__():
+    """
+    List the resource modules along with the package's other attributes.
+    """
+    return sorted(set(globals()) | set(__all__))
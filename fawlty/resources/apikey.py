@@ -0,0 +1,76 @@
+"""
+A module to represent a Sensu API key resource
+"""
+
+# Built in imports
+from typing import Optional, ClassVar
+
+# 3rd party imports
+from pydantic import Field
+
+# Our imports
+from fawlty.resources.base import ResourceBase, MetadataWithoutNamespace
+from fawlty.sensu_client import SensuClient
+from fawlty.exceptions import SensuResourceError
+
+
+class APIKeyMetadata(MetadataWithoutNamespace):
+    """
+    A class to represent the data structure of an API key metadata.  The name is the key
+    itself, which is assigned by the server when the key is created.
+    """
+    name: Optional[str] = None
+
+
+class APIKey(ResourceBase):
+    """
+    A class to represent a Sensu API key resource
+    """
+
+    username: str
+    created_at: Optional[int] = None
+    metadata: APIKeyMetadata = Field(default_factory=APIKeyMetadata)
+    _sensu_client: Optional[SensuClient] = None
+
+    BASE_URL: ClassVar[str] = "/api/core/v2/apikeys"
+
+    @classmethod
+    def get_url(cls, *args, **kwargs) -> str:
+        """
+        Use the non-namespaced version of the class method.
+        """
+        return cls.get_url_without_namespace(*args, **kwargs)
+
+    @property
+    def key(self) -> Optional[str]:
+        """
+        The API key, to give to SensuClient.use_api_key.  It is None until the key has been
+        created.
+        """
+        return self.metadata.name
+
+    def urlify(self, purpose: str = None) -> str:
+        """
+        Return the URL for the API key resource.
+
+        :return: The URL for the API key resource.
+        """
+
+        url = self.BASE_URL
+
+        if purpose != "create":
+            if not self.metadata.name:
+                raise SensuResourceError(
+                    "The API key has no name (the key itself) until it has been created"
+                )
+            url += f"/{self.metadata.name}"
+
+        return url
+
+    def created(self, location: Optional[str]):
+        """
+        Take the key the server assigned from the Location of the created resource.
+        """
+
+        if location:
+            self.metadata.name = location.rstrip("/").rsplit("/", 1)[-1]
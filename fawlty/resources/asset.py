@@ -29,6 +29,7 @@ class Asset(ResourceBase):
     _sensu_client: Optional[SensuClient] = None
 
     BASE_URL: ClassVar[str] = "/api/core/v2/namespaces/{namespace}/assets"
+    ALL_NAMESPACES_URL: ClassVar[str] = "/api/core/v2/assets"
 
     @classmethod
     def get_url(cls, *args, **kwargs) -> str:
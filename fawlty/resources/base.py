@@ -3,14 +3,40 @@ A module containing a base class to use for Sensu resource objects
 """
 
 # Built in imports
-from typing import Optional, Dict
+import importlib
+from typing import Optional, Dict, ClassVar, List, Union
+from urllib.parse import urlencode, quote
 
 # 3rd party imports
 from pydantic import BaseModel, ConfigDict
 
 # Our imports
 from fawlty.exceptions import SensuClientError
-from fawlty.sensu_client import SensuClient
+from fawlty.sensu_client import SensuClient, BaseSensuClient
+from fawlty.pagination import DEFAULT_PAGE_SIZE, PageSizer
+from fawlty.retry import RetryPolicy
+from fawlty.selectors import LabelSelector, FieldSelector, selector_params
+from fawlty.tracing import start_span
+from fawlty.bulk import DEFAULT_CONCURRENCY
+
+
+def add_query(url: str, params: dict = None) -> str:
+    """
+    Add query string parameters to a URL.
+    """
+
+    if not params:
+        return url
+
+    return f"{url}?{urlencode(params, quote_via=quote)}"
+
+
+def _namespace_class() -> type:
+    """
+    Return the Namespace resource class.  It is imported when needed, as its module depends
+    on this one.
+    """
+    return importlib.import_module("fawlty.resources.namespace").Namespace
 
 
 class ResourceBase(BaseModel):
@@ -18,17 +44,27 @@ class ResourceBase(BaseModel):
     A Base class to use for Sensu resource objects
     """
 
-    # Needed to set arbitrary items like BASE_URL and the get_url method
-    model_config = ConfigDict(arbitrary_types_allowed=True)
+    # Needed to set arbitrary items like BASE_URL and the get_url method.  Building the
+    # validators and serializers is deferred until a model is first used, which keeps
+    # importing the resources cheap.
+    model_config = ConfigDict(arbitrary_types_allowed=True, defer_build=True)
 
-    def __init__(self, *args, **kwargs):
-        """
-        Instance initialization
-        """
+    # The page size used when iterating over collections of this resource.  May be set to
+    # an AdaptivePageSizer to have it tuned from observed response latency.
+    PAGE_SIZE: ClassVar[Union[int, PageSizer]] = DEFAULT_PAGE_SIZE
+
+    # Retry policies for this resource, overriding the client's.  RETRY_POLICIES is keyed by
+    # operation ("get", "create", "update" or "delete") and wins over RETRY_POLICY.
+    RETRY_POLICY: ClassVar[Optional[RetryPolicy]] = None
+    RETRY_POLICIES: ClassVar[Dict[str, RetryPolicy]] = {}
 
-        super().__init__(*args, **kwargs)
+    # The URL listing this resource across every namespace in one request, where the API
+    # has one.  Without it, listing all namespaces fans out a request per namespace.
+    ALL_NAMESPACES_URL: ClassVar[Optional[str]] = None
 
-        self._sensu_client = None
+    # A private attribute, so that objects validated without calling __init__ (for example
+    # straight from a JSON response) start without a client too
+    _sensu_client: Optional[BaseSensuClient] = None
 
     def set_client(self, client: SensuClient):
         """
@@ -37,9 +73,11 @@ class ResourceBase(BaseModel):
         self._sensu_client = client
 
     @classmethod
-    def get_url_with_namespace(cls, namespace: str, name: str = None) -> str:
+    def get_url_with_namespace(cls, namespace: str, name: str = None, params: dict = None) -> str:
         """
         Get the URL to retrieve a resource or resources, with a namespace.
+
+        :param params: Query string parameters (such as selectors) to add to the URL.
         """
 
         if not hasattr(cls, "BASE_URL"):
@@ -49,37 +87,337 @@ class ResourceBase(BaseModel):
         if name is not None:
             url += f"/{name}"
 
-        return url
+        return add_query(url, params)
 
     @classmethod
-    def get_url_without_namespace(cls, name: str = None) -> str:
+    def get_url_without_namespace(cls, name: str = None, params: dict = None) -> str:
         """
         Get the URL to retrieve a resource or resources, without a namespace.
+
+        :param params: Query string parameters (such as selectors) to add to the URL.
         """
 
         url = cls.BASE_URL
         if name is not None:
             url += f"/{name}"
 
-        return url
+        return add_query(url, params)
 
+    # pylint: disable=R0913
     @classmethod
-    def get(cls, client: SensuClient, namespace: str = None, name: str = None) -> list[object]:
+    def get(
+        cls, client: SensuClient, namespace: str = None, name: str = None,
+        page_size: Union[int, PageSizer] = None, lazy: bool = False, *,
+        label_selector: Union[LabelSelector, str] = None,
+        field_selector: Union[FieldSelector, str] = None,
+        all_namespaces: bool = False, concurrency: int = DEFAULT_CONCURRENCY,
+    ) -> list[object]:
         """
         Get a resource or resources from the Sensu server.
+
+        :param page_size: If provided, retrieve the collection in pages of this size.
+        :param lazy: Return read-only LazyResource views, which validate each field only when
+                     it is first read.  Call materialize() on a view to get the real object.
+        :param label_selector: Have the server return only resources with matching labels.
+        :param field_selector: Have the server return only resources with matching fields.
+        :param all_namespaces: Get the resources in every namespace, in a single request
+                               where the API allows, or else a request per namespace.
+        :param concurrency: The most per namespace requests to have in flight at once.
         :return: A list of objects representing the resource(s).
         """
 
-        if namespace is None:
-            get_url = cls.get_url(name=name)
+        params = selector_params(label_selector, field_selector)
+
+        kwargs = {}
+        if page_size is not None:
+            kwargs["page_size"] = page_size
+        if lazy:
+            kwargs["lazy"] = True
+
+        with cls._span(client, "get", namespace, name) as span:
+            if all_namespaces and cls._namespaced():
+                cls._check_all_namespaces(namespace, name)
+                span.set_attribute("all_namespaces", True)
+                resources = cls._get_all_namespaces(client, params, kwargs, concurrency)
+            else:
+                get_url = cls._build_get_url(namespace=namespace, name=name, params=params)
+                resources = client.resource_get(cls=cls, get_url=get_url, **kwargs)
+            span.set_attribute("count", len(resources))
+
+        return resources
+
+    @classmethod
+    def _get_all_namespaces(cls, client, params, kwargs, concurrency) -> list[object]:
+        """
+        Get the resources in every namespace, merged in the order of the namespaces.
+        """
+
+        if cls.ALL_NAMESPACES_URL is not None:
+            return client.resource_get(
+                cls=cls, get_url=add_query(cls.ALL_NAMESPACES_URL, params), **kwargs
+            )
+
+        # Imported here, as only listings across namespaces need it
+        from fawlty.fanout import fan_out  # pylint: disable=C0415
+
+        namespaces = cls._namespace_names(client)
+        found = dict(fan_out(
+            lambda ns: client.resource_get(
+                cls=cls, get_url=cls.get_url(namespace=ns, params=params), **kwargs
+            ),
+            namespaces, concurrency=concurrency,
+        ))
 
+        return [obj for ns in namespaces for obj in found[ns]]
+
+    # pylint: disable=R0913
+    @classmethod
+    def iter_get(
+        cls, client: SensuClient, namespace: str = None,
+        page_size: Union[int, PageSizer] = None, prefetch: bool = True, *,
+        label_selector: Union[LabelSelector, str] = None,
+        field_selector: Union[FieldSelector, str] = None,
+        all_namespaces: bool = False, concurrency: int = DEFAULT_CONCURRENCY,
+    ):
+        """
+        Iterate over a collection of resources from the Sensu server, page by page.
+
+        :param page_size: An integer or PageSizer (default is the class' PAGE_SIZE).
+        :param prefetch: Whether to fetch the next page while the current one is consumed.
+        :param label_selector: Have the server return only resources with matching labels.
+        :param field_selector: Have the server return only resources with matching fields.
+        :param all_namespaces: Iterate over the resources in every namespace.  Without an
+                               ALL_NAMESPACES_URL, each namespace is fetched by a pool of
+                               threads, and its resources yielded as soon as it arrives.
+        :param concurrency: The most namespaces to fetch at once.
+        :return: A generator of objects representing the resources.
+        """
+
+        params = selector_params(label_selector, field_selector)
+
+        if all_namespaces and cls._namespaced():
+            cls._check_all_namespaces(namespace)
+            if cls.ALL_NAMESPACES_URL is None:
+                return cls._iter_namespaces(client, page_size, params, concurrency)
+            get_url = add_query(cls.ALL_NAMESPACES_URL, params)
         else:
-            get_url = cls.get_url(namespace=namespace, name=name)
+            get_url = cls._build_get_url(namespace=namespace, params=params)
+
+        return client.resource_iter(
+            cls=cls, get_url=get_url, page_size=page_size, prefetch=prefetch
+        )
+
+    @classmethod
+    def _iter_namespaces(cls, client, page_size, params, concurrency):
+        """
+        Fetch the resources in each namespace concurrently, yielding them a namespace at a
+        time, in the order the namespaces arrive.
+        """
+
+        def fetch(ns):
+            return list(client.resource_iter(
+                cls=cls, get_url=cls.get_url(namespace=ns, params=params),
+                page_size=page_size, prefetch=False,
+            ))
+
+        # Imported here, as only listings across namespaces need it
+        from fawlty.fanout import fan_out  # pylint: disable=C0415
 
-        resources = client.resource_get(cls=cls, get_url=get_url)
+        for _, resources in fan_out(
+            fetch, cls._namespace_names(client), concurrency=concurrency
+        ):
+            yield from resources
+
+    @classmethod
+    def stream_get(
+        cls, client: SensuClient, namespace: str = None, spool_threshold: int = None, *,
+        label_selector: Union[LabelSelector, str] = None,
+        field_selector: Union[FieldSelector, str] = None,
+    ):
+        """
+        Retrieve a collection of resources from the Sensu server in a single request,
+        decoding the response incrementally and yielding each object as it arrives.
+
+        :param spool_threshold: If set, spool the response body to a temporary file, holding
+                                at most this many bytes in memory.
+        :param label_selector: Have the server return only resources with matching labels.
+        :param field_selector: Have the server return only resources with matching fields.
+        :return: A generator of objects representing the resources.
+        """
+
+        get_url = cls._build_get_url(
+            namespace=namespace, params=selector_params(label_selector, field_selector)
+        )
+
+        return client.resource_stream(cls=cls, get_url=get_url, spool_threshold=spool_threshold)
+
+    # pylint: disable=R0913
+    @classmethod
+    async def aget(
+        cls, client: BaseSensuClient, namespace: str = None, name: str = None,
+        page_size: Union[int, PageSizer] = None, *,
+        label_selector: Union[LabelSelector, str] = None,
+        field_selector: Union[FieldSelector, str] = None,
+        all_namespaces: bool = False, concurrency: int = DEFAULT_CONCURRENCY,
+    ) -> list[object]:
+        """
+        Get a resource or resources from the Sensu server, using an AsyncSensuClient.  See
+        get for the arguments.
+
+        :return: A list of objects representing the resource(s).
+        """
+
+        params = selector_params(label_selector, field_selector)
+
+        with cls._span(client, "get", namespace, name) as span:
+            if all_namespaces and cls._namespaced():
+                cls._check_all_namespaces(namespace, name)
+                span.set_attribute("all_namespaces", True)
+                resources = await cls._aget_all_namespaces(
+                    client, params, page_size, concurrency
+                )
+            else:
+                get_url = cls._build_get_url(namespace=namespace, name=name, params=params)
+                resources = await client.resource_get(
+                    cls=cls, get_url=get_url, page_size=page_size
+                )
+            span.set_attribute("count", len(resources))
 
         return resources
 
+    @classmethod
+    async def _aget_all_namespaces(cls, client, params, page_size, concurrency):
+        """
+        Get the resources in every namespace, using an AsyncSensuClient.
+        """
+
+        if cls.ALL_NAMESPACES_URL is not None:
+            return await client.resource_get(
+                cls=cls, get_url=add_query(cls.ALL_NAMESPACES_URL, params), page_size=page_size
+            )
+
+        # Imported here, as only listings across namespaces need it
+        from fawlty.fanout import afan_out  # pylint: disable=C0415
+
+        found = await afan_out(
+            lambda ns: client.resource_get(
+                cls=cls, get_url=cls.get_url(namespace=ns, params=params), page_size=page_size
+            ),
+            await cls._anamespace_names(client), concurrency=concurrency,
+        )
+
+        return [obj for resources in found for obj in resources]
+
+    # pylint: disable=R0913
+    @classmethod
+    def aiter(
+        cls, client: BaseSensuClient, namespace: str = None,
+        page_size: Union[int, PageSizer] = None, prefetch: bool = True, *,
+        label_selector: Union[LabelSelector, str] = None,
+        field_selector: Union[FieldSelector, str] = None,
+    ):
+        """
+        Iterate over a collection of resources page by page, using an AsyncSensuClient.
+
+        :return: An asynchronous generator of objects representing the resources.
+        """
+
+        get_url = cls._build_get_url(
+            namespace=namespace, params=selector_params(label_selector, field_selector)
+        )
+
+        return client.resource_iter(
+            cls=cls, get_url=get_url, page_size=page_size, prefetch=prefetch
+        )
+
+    @classmethod
+    def _namespaced(cls) -> bool:
+        """
+        Whether this resource lives within namespaces.
+        """
+        return "{namespace}" in getattr(cls, "BASE_URL", "")
+
+    @staticmethod
+    def _check_all_namespaces(namespace: str = None, name: str = None):
+        """
+        Reject a namespace or name given along with all_namespaces.
+        """
+
+        if namespace is not None or name is not None:
+            raise ValueError("all_namespaces can't be combined with a namespace or name")
+
+    @staticmethod
+    def _namespace_names(client) -> List[str]:
+        """
+        Return the names of every namespace.
+        """
+
+        namespace = _namespace_class()
+
+        return [_.name for _ in client.resource_get(cls=namespace, get_url=namespace.get_url())]
+
+    @staticmethod
+    async def _anamespace_names(client) -> List[str]:
+        """
+        Return the names of every namespace, using an AsyncSensuClient.
+        """
+
+        namespace = _namespace_class()
+        namespaces = await client.resource_get(cls=namespace, get_url=namespace.get_url())
+
+        return [_.name for _ in namespaces]
+
+    @classmethod
+    def _build_get_url(cls, namespace: str = None, name: str = None, params: dict = None) -> str:
+        """
+        Build the URL for retrieving a resource or resources.
+        """
+
+        kwargs = {"name": name}
+        if params:
+            kwargs["params"] = params
+
+        if namespace is None:
+            return cls.get_url(**kwargs)
+
+        return cls.get_url(namespace=namespace, **kwargs)
+
+    @classmethod
+    def _span(cls, client, operation: str, namespace: str = None, name: str = None):
+        """
+        Start a tracing span for an operation on this resource, if the client has a tracer.
+
+        :param client: The client carrying out the operation.
+        :param operation: One of "get", "create", "update" or "delete".
+        :return: A context manager yielding the span.
+        """
+
+        return start_span(
+            getattr(client, "tracer", None), f"fawlty.{operation}", resource=cls.__name__,
+            namespace=namespace, name=name,
+        )
+
+    def _object_span(self, operation: str):
+        """
+        Start a tracing span for an operation on this object, with its namespace and name.
+        """
+
+        metadata = getattr(self, "metadata", None)
+
+        return self._span(
+            self._sensu_client, operation, getattr(metadata, "namespace", None),
+            getattr(metadata, "name", None),
+        )
+
+    def created(self, location: Optional[str]):
+        """
+        Called by the client once the resource has been created, with the Location header
+        of the response (if any).  Resources whose name is assigned by the server override
+        this to pick it up.
+
+        :param location: The URL of the new resource.
+        """
+
     def create(self) -> bool:
         """
         Create resource.
@@ -90,7 +428,8 @@ class ResourceBase(BaseModel):
                 f"Could not create '{self.__class__.__name__}' object without a client"
             )
 
-        return self._sensu_client.resource_post(obj=self)
+        with self._object_span("create"):
+            return self._sensu_client.resource_post(obj=self)
 
     def update(self) -> bool:
         """
@@ -102,7 +441,8 @@ class ResourceBase(BaseModel):
                 f"Could not update '{self.__class__.__name__}' object without a client"
             )
 
-        return self._sensu_client.resource_put(obj=self)
+        with self._object_span("update"):
+            return self._sensu_client.resource_put(obj=self)
 
     def delete(self) -> bool:
         """
@@ -114,7 +454,47 @@ class ResourceBase(BaseModel):
                 f"Could not delete '{self.__class__.__name__}' object without a client"
             )
 
-        return self._sensu_client.resource_delete(obj=self)
+        with self._object_span("delete"):
+            return self._sensu_client.resource_delete(obj=self)
+
+    async def acreate(self) -> bool:
+        """
+        Create resource, using an AsyncSensuClient.
+        """
+
+        if not self._sensu_client:
+            raise SensuClientError(
+                f"Could not create '{self.__class__.__name__}' object without a client"
+            )
+
+        with self._object_span("create"):
+            return await self._sensu_client.resource_post(obj=self)
+
+    async def aupdate(self) -> bool:
+        """
+        Update resource, using an AsyncSensuClient.
+        """
+
+        if not self._sensu_client:
+            raise SensuClientError(
+                f"Could not update '{self.__class__.__name__}' object without a client"
+            )
+
+        with self._object_span("update"):
+            return await self._sensu_client.resource_put(obj=self)
+
+    async def adelete(self) -> bool:
+        """
+        Delete resource, using an AsyncSensuClient.
+        """
+
+        if not self._sensu_client:
+            raise SensuClientError(
+                f"Could not delete '{self.__class__.__name__}' object without a client"
+            )
+
+        with self._object_span("delete"):
+            return await self._sensu_client.resource_delete(obj=self)
 
 
 class MetadataWithoutNamespace(BaseModel):
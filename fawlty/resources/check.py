@@ -147,6 +147,7 @@ class Check(ResourceBase):
     _sensu_client: Optional[SensuClient] = None
 
     BASE_URL: ClassVar[str] = "/api/core/v2/namespaces/{namespace}/checks"
+    ALL_NAMESPACES_URL: ClassVar[str] = "/api/core/v2/checks"
 
     @classmethod
     def get_url(cls, *args, **kwargs) -> str:
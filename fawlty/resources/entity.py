@@ -56,6 +56,7 @@ class Entity(ResourceBase):
         return value
 
     BASE_URL: ClassVar[str] = "/api/core/v2/namespaces/{namespace}/entities"
+    ALL_NAMESPACES_URL: ClassVar[str] = "/api/core/v2/entities"
 
     @classmethod
     def get_url(cls, *args, **kwargs) -> str:
@@ -140,6 +140,7 @@ class Event(ResourceBase):
     _sensu_client: Optional[SensuClient] = None
 
     BASE_URL: ClassVar[str] = "/api/core/v2/namespaces/{namespace}/events"
+    ALL_NAMESPACES_URL: ClassVar[str] = "/api/core/v2/events"
 
     @classmethod
     def get_url(cls, *args, **kwargs) -> str:
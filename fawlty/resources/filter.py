@@ -30,6 +30,7 @@ class Filter(ResourceBase):
     _sensu_client: Optional[SensuClient] = None
 
     BASE_URL: ClassVar[str] = "/api/core/v2/namespaces/{namespace}/filters"
+    ALL_NAMESPACES_URL: ClassVar[str] = "/api/core/v2/filters"
 
     @classmethod
     def get_url(cls, *args, **kwargs) -> str:
@@ -89,6 +89,7 @@ class Handler(ResourceBase):
         return self
 
     BASE_URL: ClassVar[str] = "/api/core/v2/namespaces/{namespace}/handlers"
+    ALL_NAMESPACES_URL: ClassVar[str] = "/api/core/v2/handlers"
 
     @classmethod
     def get_url(cls, *args, **kwargs) -> str:
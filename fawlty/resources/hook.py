@@ -30,6 +30,7 @@ class Hook(ResourceBase):
     _sensu_client: Optional[SensuClient] = None
 
     BASE_URL: ClassVar[str] = "/api/core/v2/namespaces/{namespace}/hooks"
+    ALL_NAMESPACES_URL: ClassVar[str] = "/api/core/v2/hooks"
 
     @classmethod
     def get_url(cls, *args, **kwargs) -> str:
@@ -63,6 +63,7 @@ class Mutator(ResourceBase):
         return self
 
     BASE_URL: ClassVar[str] = "/api/core/v2/namespaces/{namespace}/mutators"
+    ALL_NAMESPACES_URL: ClassVar[str] = "/api/core/v2/mutators"
 
     @classmethod
     def get_url(cls, *args, **kwargs) -> str:
@@ -65,6 +65,7 @@ class Role(ResourceBase):
     _sensu_client: Optional[SensuClient] = None
 
     BASE_URL: ClassVar[str] = "/api/core/v2/namespaces/{namespace}/roles"
+    ALL_NAMESPACES_URL: ClassVar[str] = "/api/core/v2/roles"
 
     @classmethod
     def get_url(cls, *args, **kwargs) -> str:
@@ -46,6 +46,7 @@ class RoleBinding(ResourceBase):
     _sensu_client: Optional[SensuClient] = None
 
     BASE_URL: ClassVar[str] = "/api/core/v2/namespaces/{namespace}/rolebindings"
+    ALL_NAMESPACES_URL: ClassVar[str] = "/api/core/v2/rolebindings"
 
     @classmethod
     def get_url(cls, *args, **kwargs) -> str:
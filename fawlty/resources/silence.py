@@ -46,6 +46,7 @@ class Silence(ResourceBase):
         return self
 
     BASE_URL: ClassVar[str] = "/api/core/v2/namespaces/{namespace}/silenced"
+    ALL_NAMESPACES_URL: ClassVar[str] = "/api/core/v2/silenced"
 
     @classmethod
     def get_url(cls, *args, **kwargs) -> str:
@@ -6,7 +6,6 @@ from typing import Optional, List, ClassVar
 
 # 3rd party imports
 from pydantic import field_validator
-import bcrypt
 
 # Our imports
 from fawlty.resources.base import ResourceBase
@@ -19,6 +18,9 @@ def hash_password(passwd: str) -> str:
     Takes a password and switches it to a hashed form for use in Sensu
     """
 
+    # Imported here, as bcrypt is only needed when setting passwords
+    import bcrypt  # pylint: disable=C0415
+
     pw_bytes = passwd.encode('utf-8')
     salt = bcrypt.gensalt()
     pw_hash = bcrypt.hashpw(pw_bytes, salt)
@@ -0,0 +1,165 @@
+"""
+A module providing the retry policy used when calls to the Sensu server fail transiently.
+"""
+
+# Built in imports
+import random
+import threading
+import time
+from collections import Counter
+from email.utils import parsedate_to_datetime
+from typing import Iterable, Optional
+
+# Constants
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+IDEMPOTENT_METHODS = ("GET", "HEAD", "OPTIONS", "PUT", "DELETE")
+
+
+class RetryPolicy:
+    """
+    Decides whether, and how long after, a failed call should be retried.
+
+    Connection errors and the configured statuses are retried for idempotent methods, using
+    exponential backoff with full jitter.  A 429 response means the server did not act on
+    the request, so it is retried for any method.  A Retry-After header, when present, sets
+    the delay instead.  No retry is made that would run past the total time budget.
+    """
+
+    # pylint: disable=R0913,R0902
+    def __init__(
+        self,
+        max_attempts: int = 3,
+        *,
+        backoff_factor: float = 0.5,
+        max_backoff: float = 30.0,
+        jitter: bool = True,
+        retry_statuses: Iterable[int] = RETRY_STATUSES,
+        retry_methods: Iterable[str] = IDEMPOTENT_METHODS,
+        total_timeout: Optional[float] = None,
+        respect_retry_after: bool = True,
+    ):
+        """
+        Instance initialization
+
+        :param max_attempts: The most attempts to make, including the first.
+        :param backoff_factor: The delay, in seconds, before the first retry.  Each later
+                               retry doubles it.
+        :param max_backoff: The longest delay between attempts.
+        :param jitter: Whether to randomize delays (between zero and the computed backoff).
+        :param retry_statuses: HTTP status codes that may be retried.
+        :param retry_methods: HTTP methods that are safe to retry.
+        :param total_timeout: The most seconds to spend on a call, across all attempts.
+        :param respect_retry_after: Whether to honour the Retry-After response header.
+        """
+        self.max_attempts = max_attempts
+        self.backoff_factor = backoff_factor
+        self.max_backoff = max_backoff
+        self.jitter = jitter
+        self.retry_statuses = frozenset(retry_statuses)
+        self.retry_methods = frozenset(_.upper() for _ in retry_methods)
+        self.total_timeout = total_timeout
+        self.respect_retry_after = respect_retry_after
+
+        self._lock = threading.Lock()
+        self.retries = 0
+        self.retries_by_reason = Counter()
+
+    def backoff(self, attempt: int) -> float:
+        """
+        Return the delay before the given retry.
+
+        :param attempt: The number of attempts made so far.
+        """
+
+        delay = min(self.backoff_factor * (2 ** (attempt - 1)), self.max_backoff)
+        if self.jitter:
+            delay = random.uniform(0, delay)
+
+        return delay
+
+    # pylint: disable=R0911
+    def next_delay(
+        self, method: str, attempt: int, started: float, *, status: Optional[int] = None,
+        headers=None, error: bool = False
+    ) -> Optional[float]:
+        """
+        Decide whether a call should be retried.
+
+        :param method: The HTTP method of the call.
+        :param attempt: The number of attempts made so far.
+        :param started: The time.monotonic() value when the call began.
+        :param status: The response status code, if a response was received.
+        :param headers: The response headers, if a response was received.
+        :param error: Whether the attempt failed with a connection error.
+        :return: The seconds to wait before retrying, or None if no retry should be made.
+        """
+
+        if attempt >= self.max_attempts:
+            return None
+
+        if error:
+            reason = "connection_error"
+            if method.upper() not in self.retry_methods:
+                return None
+
+        elif status in self.retry_statuses:
+            reason = f"status_{status}"
+            if status != 429 and method.upper() not in self.retry_methods:
+                return None
+
+        else:
+            return None
+
+        delay = None
+        if self.respect_retry_after and headers:
+            delay = parse_retry_after(headers.get("Retry-After"))
+        if delay is None:
+            delay = self.backoff(attempt)
+
+        if self.total_timeout is not None:
+            if time.monotonic() - started + delay > self.total_timeout:
+                return None
+
+        self.record(reason)
+
+        return delay
+
+    def record(self, reason: str):
+        """
+        Record that a retry is being made.
+
+        :param reason: Why the retry is being made (for example "status_503").
+        """
+        with self._lock:
+            self.retries += 1
+            self.retries_by_reason[reason] += 1
+
+    def stats(self) -> dict:
+        """
+        Return the retry counts recorded by this policy.
+        """
+        with self._lock:
+            return {"retries": self.retries, "by_reason": dict(self.retries_by_reason)}
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    Parse a Retry-After header, which is either a number of seconds or an HTTP date.
+
+    :return: The number of seconds to wait, or None if the header is missing or unparseable.
+    """
+
+    if not value:
+        return None
+
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+
+    return max(when.timestamp() - time.time(), 0.0)
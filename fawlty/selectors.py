@@ -0,0 +1,157 @@
+"""
+A module for building the label and field selectors Sensu uses to filter collections on the
+server, before they are sent to the client.
+"""
+
+# Built in imports
+import re
+from typing import ClassVar, Iterable, Optional, Union
+
+# Constants
+BARE_VALUE_RE = re.compile(r'^[\w\.\-/:]+$')
+
+
+def _quote(value) -> str:
+    """
+    Render a value for a selector, quoting it if it isn't a single plain word.
+    """
+
+    value = str(value)
+    if BARE_VALUE_RE.match(value):
+        return value
+
+    if '"' in value:
+        raise ValueError(f"Selector values may not contain double quotes ({value})")
+
+    return f'"{value}"'
+
+
+class Selector:
+    """
+    A set of requirements which resources must all meet.  Each builder method returns a new
+    selector with the requirement added, so selectors may be built up in a chain, and two
+    selectors of the same kind may be combined with the & operator.
+    """
+
+    PARAM: ClassVar[str] = ""
+
+    def __init__(self, *requirements: str):
+        """
+        Instance initialization
+
+        :param requirements: Requirements already written in Sensu's selector syntax.
+        """
+        self.requirements = tuple(requirements)
+
+    def _add(self, key: str, operator: str, value: str) -> "Selector":
+        """
+        Return a new selector with a requirement added.
+        """
+
+        if not key:
+            raise ValueError("Selector keys may not be empty")
+
+        return type(self)(*self.requirements, f"{key} {operator} {value}")
+
+    def eq(self, key: str, value) -> "Selector":
+        """
+        Require the key to equal the value.
+        """
+        return self._add(key, "==", _quote(value))
+
+    def ne(self, key: str, value) -> "Selector":
+        """
+        Require the key not to equal the value.
+        """
+        return self._add(key, "!=", _quote(value))
+
+    def in_(self, key: str, values: Iterable) -> "Selector":
+        """
+        Require the key to equal one of the values (or, for a list field such as
+        subscriptions, require one of the values to be among its items).
+        """
+        return self._add(key, "in", self._list(values))
+
+    def notin(self, key: str, values: Iterable) -> "Selector":
+        """
+        Require the key to equal none of the values.
+        """
+        return self._add(key, "notin", self._list(values))
+
+    def matches(self, key: str, value) -> "Selector":
+        """
+        Require the key to contain the value.
+        """
+        return self._add(key, "matches", _quote(value))
+
+    @staticmethod
+    def _list(values: Iterable) -> str:
+        """
+        Render a list of values for the in and notin operators.
+        """
+
+        values = [_quote(_) for _ in values]
+        if not values:
+            raise ValueError("The in and notin operators need at least one value")
+
+        return f"[{', '.join(values)}]"
+
+    def __and__(self, other: "Selector") -> "Selector":
+        if type(other) is not type(self):
+            return NotImplemented
+
+        return type(self)(*self.requirements, *other.requirements)
+
+    def __bool__(self) -> bool:
+        return bool(self.requirements)
+
+    def __eq__(self, other) -> bool:
+        return type(other) is type(self) and other.requirements == self.requirements
+
+    def __hash__(self) -> int:
+        return hash((type(self), self.requirements))
+
+    def __str__(self) -> str:
+        return " && ".join(self.requirements)
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({str(self)!r})"
+
+
+class LabelSelector(Selector):
+    """
+    Selects resources by the labels in their metadata, for example
+    LabelSelector().eq("region", "us-west-1").
+    """
+
+    PARAM: ClassVar[str] = "labelSelector"
+
+
+class FieldSelector(Selector):
+    """
+    Selects resources by their fields, for example
+    FieldSelector().eq("entity.entity_class", "proxy").
+    """
+
+    PARAM: ClassVar[str] = "fieldSelector"
+
+
+def selector_params(
+    label_selector: Optional[Union[LabelSelector, str]] = None,
+    field_selector: Optional[Union[FieldSelector, str]] = None,
+) -> dict:
+    """
+    Build the query string parameters for a pair of selectors.
+
+    :param label_selector: A LabelSelector, or a label selector already written as a string.
+    :param field_selector: A FieldSelector, or a field selector already written as a string.
+    :return: A dict of query string parameters, empty if neither selector is set.
+    """
+
+    params = {}
+    if label_selector:
+        params[LabelSelector.PARAM] = str(label_selector)
+    if field_selector:
+        params[FieldSelector.PARAM] = str(field_selector)
+
+    return params
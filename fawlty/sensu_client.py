@@ -1,23 +1,53 @@
+# pylint: disable=C0302
 """
 Implements a class to act as a Sensu client.
 """
 
 # Built in imports
-import json
+import contextvars
+import socket
+import threading
+import time
+from functools import lru_cache
+from typing import List
 
 # 3rd party imports
+import pydantic_core
 import requests
-from pydantic import ValidationError
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection
+from pydantic import BaseModel, TypeAdapter, ValidationError
 
 # Our imports
 from fawlty.sensu_token import SensuToken
+from fawlty.pagination import CONTINUE_HEADER, get_page_sizer
+from fawlty.bulk import DEFAULT_CONCURRENCY
+from fawlty.retry import RetryPolicy
+from fawlty.token_refresher import TokenRefresher, DEFAULT_LEAD_TIME
+from fawlty.cache import FRESH, STALE
+from fawlty.streaming import iter_json_array, spool, iter_file, DEFAULT_CHUNK_SIZE
+from fawlty.serializers import default_serializer
+from fawlty.compression import compress_body
+from fawlty.lazy import LazyResource
+from fawlty.deadline import effective_timeout, within_deadline, remaining
+from fawlty.tracing import start_span
+from fawlty.singleflight import SingleFlight
 from fawlty.exceptions import (
-    SensuConnectionError, SensuNeedRefresh,
+    SensuConnectionError, SensuTimeoutError, SensuNeedRefresh,
     SensuAuthError, SensuNeedLogin,
-    SensuResourceError, SensuError
+    SensuResourceError, SensuError,
+    SensuResourceMissingError, SensuResourceExistsError
 )
 
 
+@lru_cache(maxsize=None)
+def list_adapter(cls) -> TypeAdapter:
+    """
+    Return a (cached) TypeAdapter validating a JSON array of the given resource class.
+    """
+    return TypeAdapter(List[cls])
+
+
 def debug_r(r: object):
     """
     Debug a requests response
@@ -26,22 +56,76 @@ def debug_r(r: object):
     print(f"Text: {r.text}")
 
 
-class SensuClient:
+class SensuHTTPAdapter(HTTPAdapter):
     """
-    A class to act as a Sensu client.
+    A transport adapter which hands a shared SSL context to its connection pools, so every
+    pooled connection to the server is set up the same way.
+    """
+
+    def __init__(self, ssl_context=None, socket_options=None, **kwargs):
+        """
+        Instance initialization
+
+        :param ssl_context: The SSL context to use for https connections.
+        :param socket_options: Socket options to set on new connections.
+        :param kwargs: Further arguments for HTTPAdapter (pool sizes, etc).
+        """
+        self.ssl_context = ssl_context
+        self.socket_options = socket_options
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, *args, **kwargs):
+        """
+        Initialize the pool manager with our SSL context and socket options.
+        """
+
+        if self.ssl_context is not None:
+            kwargs["ssl_context"] = self.ssl_context
+        if self.socket_options is not None:
+            kwargs["socket_options"] = self.socket_options
+
+        super().init_poolmanager(*args, **kwargs)
+
+
+class BaseSensuClient:  # pylint: disable=R0902,R0903
+    """
+    Behaviour shared by the synchronous and asynchronous Sensu clients.  Anything in here
+    must not perform I/O.
     """
 
-    def __init__(self, server=None):
+    # pylint: disable=R0913
+    def __init__(
+        self, server=None, retry_policy=None, serializer=None, *, timeout=None, metrics=None,
+        tracer=None, rate_limiter=None, concurrency_limiter=None, token_cache=None,
+        api_key=None
+    ):
         """
         Initialize a new Sensu client.
 
-        :param server: The name of the client.
-        :param address: The address of the client.
+        :param server: The SensuServer to connect to.
+        :param timeout: A default timeout for requests, overriding the server's settings.
+        :param retry_policy: The default RetryPolicy for calls (default is no retries).
+        :param serializer: The Serializer for request bodies (default is PydanticSerializer).
+        :param metrics: An optional ClientMetrics to record calls in.
+        :param tracer: An optional Tracer to record spans with.
+        :param rate_limiter: An optional RateLimiter capping the rate of requests.
+        :param concurrency_limiter: An optional AIMDLimiter capping the requests in flight.
+        :param token_cache: An optional FileTokenCache to share login tokens through.
+        :param api_key: An API key to authenticate with, instead of logging in.
         """
         self.server = server
         self.token = None
-        self.session = requests.Session()
-        self.session.headers.update({"Content-Type": "application/json"})
+        self.timeout = timeout
+        self.retry_policy = retry_policy
+        self.serializer = serializer or default_serializer()
+        self.metrics = metrics
+        self.tracer = tracer
+        self.rate_limiter = rate_limiter
+        self.concurrency_limiter = concurrency_limiter
+        self.token_cache = token_cache
+        # The user logged in as, which the token is cached under
+        self._token_user = None
+        self.api_key = api_key
 
     def call_filter(self):
         """
@@ -51,6 +135,10 @@ class SensuClient:
         if not self.server:
             raise SensuConnectionError("No sensu server defined")
 
+        # API keys don't expire, so there's nothing more to check
+        if self.api_key is not None:
+            return
+
         if not self.token:
             raise SensuNeedLogin("No login token found")
 
@@ -60,87 +148,836 @@ class SensuClient:
         if self.token.need_refresh():
             raise SensuNeedRefresh("Token needs to be refreshed")
 
-    def _make_call(self, method, path, fields=None, use_filter=True):
+    def _timeout(self):
+        """
+        Return the default timeout for a request: the client's own, or else the server's.
+        """
+
+        if self.timeout is not None:
+            return self.timeout
+
+        return self.server.timeout() if self.server else None
+
+    def _refreshed_elsewhere(self, token) -> bool:
+        """
+        Whether a token loaded from the token cache has been refreshed by another process,
+        so can be used in place of this client's.
+        """
+
+        return (
+            token is not None
+            and not token.need_refresh()
+            and token.access_token != self.token.access_token
+        )
+
+    def _encode_body(self, fields):
+        """
+        Serialize a request body, unless it has already been encoded.
+
+        :param fields: A resource object, dict or list to serialize, or a str or bytes body.
+        """
+
+        if isinstance(fields, (BaseModel, dict, list)):
+            with start_span(
+                self.tracer, "fawlty.encode", resource=type(fields).__name__
+            ) as span:
+                body = self.serializer.dumps(fields)
+                span.set_attribute("bytes", len(body))
+
+            return body
+
+        return fields
+
+    def _prepare_body(self, fields, headers):
+        """
+        Serialize a request body, and gzip it if it is over the server's size threshold.
+
+        :param fields: The body to send, as accepted by _encode_body.
+        :param headers: The extra headers for the request, if any.
+        :return: A tuple of the body and the headers to send.
+        """
+
+        body, encoding = compress_body(
+            self._encode_body(fields), self.server.compress_requests_over,
+            self.server.compress_level,
+        )
+        if encoding:
+            headers = {**(headers or {}), "Content-Encoding": encoding}
+
+        return body, headers
+
+    def _retry_policy_for(self, cls, operation: str):
+        """
+        Find the retry policy for an operation on a resource class.  A policy set for the
+        operation in the class' RETRY_POLICIES wins, then the class' RETRY_POLICY, and
+        finally the client's own policy.
+
+        :param cls: The resource class being operated on.
+        :param operation: One of "get", "create", "update" or "delete".
+        """
+
+        policies = getattr(cls, "RETRY_POLICIES", None)
+        if isinstance(policies, dict) and isinstance(policies.get(operation), RetryPolicy):
+            return policies[operation]
+
+        policy = getattr(cls, "RETRY_POLICY", None)
+        if isinstance(policy, RetryPolicy):
+            return policy
+
+        return self.retry_policy
+
+    # pylint: disable=R0913
+    def _record_call(self, method, path, r, *, resource, started, attempts, body, stream=False):
+        """
+        Record a call in the client's metrics.
+
+        :param r: The final response, or None if the call failed without one.
+        :param resource: The resource class the call was for, if any.
+        :param started: The time.monotonic() at which the call started.
+        :param attempts: The number of attempts made.
+        :param body: The (encoded) request body sent.
+        :param stream: Whether the response body was left to be streamed.
+        """
+
+        bytes_in = 0
+        if r is not None:
+            length = r.headers.get("Content-Length")
+            if length is not None and length.isdigit():
+                bytes_in = int(length)
+            elif not stream:
+                bytes_in = len(r.content)
+
+        self.metrics.record_call(
+            method, path, resource, status=r.status_code if r is not None else None,
+            elapsed=time.monotonic() - started, attempts=attempts,
+            bytes_out=len(body) if isinstance(body, (bytes, str)) else 0, bytes_in=bytes_in,
+        )
+
+    @staticmethod
+    def _page_params(limit, token, params):
+        """
+        Build the query string parameters for a single page of a collection.
+        """
+
+        page_params = dict(params or {})
+        page_params["limit"] = limit
+        if token:
+            page_params["continue"] = token
+
+        return page_params
+
+    @staticmethod
+    def _validate_for_write(obj):
+        """
+        Validate an object before it is written to the Sensu server.
+        """
+
+        try:
+            obj.model_validate(obj)
+        except ValidationError as err:
+            raise SensuResourceError(str(err)) from err
+
+    @staticmethod
+    def _check_write_response(r, action: str):
+        """
+        Raise an appropriate exception if a write to the Sensu server failed.
+
+        :param r: The response from the server.
+        :param action: A description of the attempted action, for the error message.
+        """
+
+        if 200 <= r.status_code <= 299:
+            return
+
+        if r.status_code == 404:
+            raise SensuResourceMissingError(f"Failed to {action} resource ({r.text})")
+
+        if r.status_code == 409:
+            raise SensuResourceExistsError(f"Failed to {action} resource ({r.text})")
+
+        raise SensuResourceError(f"Failed to {action} resource ({r.status_code}: {r.text})")
+
+    def _build_resources(self, cls, body: bytes, lazy=False) -> list[object]:
+        """
+        Build resource objects, seeded with this client, from a response body.
+
+        The raw body is validated directly by pydantic-core, so no intermediate list of
+        dicts is built and each object is validated only once.
+
+        :param lazy: Return LazyResource views, which validate fields as they are read.
+        """
+
+        if self.metrics is not None or self.tracer is not None:
+            return self._build_resources_timed(cls, body, lazy)
+
+        if lazy:
+            return [LazyResource(cls, _, client=self) for _ in pydantic_core.from_json(body)]
+
+        resources = list_adapter(cls).validate_json(body)
+        for obj in resources:
+            obj.set_client(self)
+
+        return resources
+
+    def _build_resources_timed(self, cls, body, lazy) -> list[object]:
+        """
+        Build resource objects as _build_resources does, recording the time spent decoding
+        and validating in the metrics and as spans.  The body is parsed first and then
+        validated, so the two can be timed separately.
+        """
+
+        name = cls.__name__
+        with start_span(self.tracer, "fawlty.decode", resource=name, bytes=len(body)):
+            start = time.perf_counter()
+            data = pydantic_core.from_json(body)
+            decoded = time.perf_counter()
+
+        if lazy:
+            if self.metrics is not None:
+                self.metrics.record_decode(cls, decoded - start)
+            return [LazyResource(cls, _, client=self) for _ in data]
+
+        with start_span(self.tracer, "fawlty.validate", resource=name, count=len(data)):
+            resources = list_adapter(cls).validate_python(data)
+            validated = time.perf_counter()
+
+        if self.metrics is not None:
+            self.metrics.record_decode(cls, decoded - start, validated - decoded)
+        for obj in resources:
+            obj.set_client(self)
+
+        return resources
+
+
+class SensuClient(BaseSensuClient):  # pylint: disable=R0902
+    """
+    A class to act as a Sensu client.
+    """
+
+    # pylint: disable=R0913
+    def __init__(
+        self, server=None, timeout=None, retry_policy=None, response_cache=None,
+        serializer=None, *, metrics=None, tracer=None, rate_limiter=None,
+        concurrency_limiter=None, token_cache=None, api_key=None
+    ):
+        """
+        Initialize a new Sensu client.
+
+        :param server: The SensuServer to connect to.
+        :param timeout: A default timeout for requests, overriding the server's settings.
+        :param retry_policy: The default RetryPolicy for calls (default is no retries).
+        :param response_cache: An optional ResponseCache for resource_get.
+        :param serializer: The Serializer for request bodies (default is PydanticSerializer).
+        :param metrics: An optional ClientMetrics to record calls in.
+        :param tracer: An optional Tracer to record spans with.
+        :param rate_limiter: An optional RateLimiter capping the rate of requests.
+        :param concurrency_limiter: An optional AIMDLimiter capping the requests in flight.
+        :param token_cache: An optional FileTokenCache to share login tokens through.
+        :param api_key: An API key to authenticate with, instead of logging in.
+        """
+        self.session = requests.Session()
+        self.session.headers.update({"Content-Type": "application/json"})
+        self.response_cache = response_cache
+        self.token_refresher = None
+        self.single_flight = SingleFlight()
+        self._refresh_lock = threading.Lock()
+        super().__init__(
+            server=server, retry_policy=retry_policy, serializer=serializer, timeout=timeout,
+            metrics=metrics, tracer=tracer, rate_limiter=rate_limiter,
+            concurrency_limiter=concurrency_limiter, token_cache=token_cache, api_key=api_key,
+        )
+        if api_key is not None:
+            self.use_api_key(api_key)
+
+    @property
+    def server(self):
+        """
+        The SensuServer this client talks to.
+        """
+        return self._server
+
+    @server.setter
+    def server(self, server):
+        """
+        Set the SensuServer, and configure the session's connection handling to suit it.
+        """
+        self._server = server
+        self.configure_session()
+
+    def configure_session(self):
+        """
+        Apply the server's connection pooling, keep-alive, SSL and compression settings to
+        the session.
+
+        Connections are kept in a pool per host and reused by later calls, so steady state
+        traffic does not pay for new TCP connections or TLS handshakes.
+        """
+
+        if self._server is None:
+            return
+
+        socket_options = list(HTTPConnection.default_socket_options)
+        if self._server.keep_alive:
+            socket_options.append((socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1))
+            self.session.headers.pop("Connection", None)
+        else:
+            self.session.headers["Connection"] = "close"
+
+        adapter = SensuHTTPAdapter(
+            ssl_context=self._server.ssl_context(),
+            socket_options=socket_options,
+            pool_connections=self._server.pool_connections,
+            pool_maxsize=self._server.pool_maxsize,
+            pool_block=self._server.pool_block,
+        )
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.verify = not self._server.ignore_cert
+        self.session.headers["Accept-Encoding"] = self._server.accept_encoding
+
+    # pylint: disable=R0913,R0914
+    def _make_call(
+        self, method, path, fields=None, use_filter=True, *, params=None, retry_policy=None,
+        headers=None, stream=False, timeout=None, resource=None
+    ):
         """
         Wraps the call to the requests library to help manage session timeouts and token refreshes.
 
         :param method: The HTTP method to use.
         :param path: The path to the API endpoint.
-        :param data: The data to send (default is None).
+        :param fields: The body to send; objects and dicts are serialized (default is None).
         :param use_filter: Whether to use the call_filter (default is True).
+        :param params: Query string parameters to send (default is None).
+        :param retry_policy: The RetryPolicy to use (default is the client's policy).
+        :param headers: Extra headers to send (default is None).
+        :param stream: Whether to leave the response body to be streamed (default is False).
+        :param timeout: A timeout for each attempt, overriding the client's (default is None).
+        :param resource: The resource class the call is for, used in metrics (default is None).
         :return: The response from the server.
         """
 
-        if use_filter:
-            try:
-                self.call_filter()
-            except SensuNeedRefresh:
-                self.refresh_token()
+        with start_span(
+            self.tracer, "fawlty.call", method=method, path=path,
+            resource=getattr(resource, "__name__", None),
+        ) as span:
+            if use_filter:
+                # The token found to need refreshing, so a refresh made meanwhile by
+                # another caller isn't repeated
+                token = self.token
+                try:
+                    self.call_filter()
+                except SensuNeedRefresh:
+                    self.single_flight_refresh(stale_token=token)
+
+            fields, headers = self._prepare_body(fields, headers)
+            span.set_attribute("bytes_out", len(fields) if isinstance(fields, bytes) else 0)
 
-        url = self.server.api_url + path
-        if isinstance(fields, dict):
-            fields = json.dumps(fields)
+            policy = retry_policy or self.retry_policy
+            started = time.monotonic()
+            attempt = 0
+            while True:
+                attempt += 1
+                try:
+                    with start_span(self.tracer, "fawlty.attempt", attempt=attempt) as sent:
+                        r = self._throttled_send(
+                            method, path, timeout, data=fields, params=params, headers=headers,
+                            stream=stream,
+                        )
+                        sent.set_attribute("status_code", r.status_code)
+                except (requests.ConnectionError, requests.Timeout) as err:
+                    delay = policy.next_delay(
+                        method, attempt, started, error=True
+                    ) if policy else None
+                    if within_deadline(delay) is None:
+                        if self.metrics is not None:
+                            self._record_call(
+                                method, path, None, resource=resource, started=started,
+                                attempts=attempt, body=fields,
+                            )
+                        url = self.server.api_url + path
+                        if isinstance(err, requests.Timeout):
+                            raise SensuTimeoutError(
+                                f"Timed out calling {url} ({err})"
+                            ) from err
+                        raise SensuConnectionError(
+                            f"Failed to connect to {url} ({err})"
+                        ) from err
+                else:
+                    delay = policy.next_delay(
+                        method, attempt, started, status=r.status_code, headers=r.headers
+                    ) if policy else None
+                    if within_deadline(delay) is None:
+                        if self.metrics is not None:
+                            self._record_call(
+                                method, path, r, resource=resource, started=started,
+                                attempts=attempt, body=fields, stream=stream,
+                            )
+                        return r
+                    r.close()
 
-        # TODO - Add ssl param(s)
-        r = self.session.request(method, url, data=fields)
+                time.sleep(delay)
+
+    def _throttled_send(self, method, path, timeout=None, **kwargs):
+        """
+        Send a single request once the client's rate and concurrency limiters allow it.
+
+        :param timeout: A timeout overriding the client's, which is then limited by any
+                        deadline in force (after waiting on the limiters).
+        :param kwargs: Further arguments for _send.
+        """
+
+        if self.rate_limiter is not None:
+            self.rate_limiter.acquire(path)
+
+        limiter = self.concurrency_limiter
+        if limiter is None:
+            kwargs["timeout"] = effective_timeout(self._timeout(), timeout)
+            return self._send(method, path, **kwargs)
+
+        limiter.acquire()
+        start = time.monotonic()
+        status = None
+        try:
+            kwargs["timeout"] = effective_timeout(self._timeout(), timeout)
+            r = self._send(method, path, **kwargs)
+            status = r.status_code
+        finally:
+            limiter.release(time.monotonic() - start, status)
 
         return r
 
+    def _send(self, method, path, **kwargs):
+        """
+        Send a single request to the server, with no retries.
+
+        :param method: The HTTP method to use.
+        :param path: The path to the API endpoint.
+        :param kwargs: Further arguments for requests.Session.request.  The timeout defaults
+                       to the client's, limited by any deadline in force.
+        :return: The response from the server.
+        """
+
+        kwargs.setdefault("timeout", effective_timeout(self._timeout()))
+
+        return self.session.request(method, self.server.api_url + path, **kwargs)
+
     def login(self, username, password):
         """
         Login to the Sensu server.
 
+        With a token cache, a token cached for the same server and username (by this or
+        another process) is used instead, unless it needs refreshing.  The password is not
+        checked in that case.
+
         :param username: The username to login with.
         :param password: The password to login with.
         """
 
-        # TODO - Add ssl param(s)
+        if self.token_cache is None:
+            return self._login(username, password)
+
+        url = self.server.api_url
+        with self.token_cache.lock(url, username):
+            self._token_user = username
+            token = self.token_cache.load(url, username)
+            if token is not None and not token.need_refresh():
+                self._use_token(token)
+                return True
+
+            self._login(username, password)
+            self.token_cache.store(url, username, self.token)
+
+        return True
+
+    def _login(self, username, password):
+        """
+        Login to the Sensu server, without the token cache.
+        """
+
         # TODO - Add error handling
         self.session.headers.pop("Authorization", None)
-        r = self.session.get(self.server.api_url + "/auth", auth=(username, password))
+        with start_span(self.tracer, "fawlty.login", username=username) as span:
+            r = self._send("GET", "/auth", auth=(username, password))
+            span.set_attribute("status_code", r.status_code)
 
         if r.status_code < 200 or r.status_code > 299:
             raise SensuAuthError("Failed to login")
 
-        self.token = SensuToken(**r.json())
-        self.session.headers.update({"Authorization": f"Bearer {self.token.access_token}"})
+        self._use_token(SensuToken(**r.json()))
 
         return True
 
+    def _use_token(self, token: SensuToken):
+        """
+        Send later calls with a token.
+        """
+
+        self.token = token
+        self.api_key = None
+        self.session.headers.update({"Authorization": f"Bearer {token.access_token}"})
+
+    def use_api_key(self, api_key: str):
+        """
+        Authenticate with an API key, instead of logging in.  API keys don't expire, so
+        calls skip the token checks and are never held up by a refresh.
+
+        :param api_key: The key, as created with the APIKey resource.
+        """
+
+        self.api_key = api_key
+        self.token = None
+        self._token_user = None
+        self.session.headers.update({"Authorization": f"Key {api_key}"})
+
     def refresh_token(self):
         """
-        Refresh the token with the Sensu server."""
+        Refresh the token with the Sensu server.
+
+        With a token cache, if another process has already refreshed the token, its token
+        is used instead, and a refreshed token is cached for the others.
+        """
+
+        if self.token_cache is None or self._token_user is None:
+            return self._refresh_token()
+
+        url = self.server.api_url
+        with self.token_cache.lock(url, self._token_user):
+            token = self.token_cache.load(url, self._token_user)
+            if self._refreshed_elsewhere(token):
+                self._use_token(token)
+                return True
+
+            self._refresh_token()
+            self.token_cache.store(url, self._token_user, self.token)
+
+        return True
+
+    def _refresh_token(self):
+        """
+        Refresh the token with the Sensu server, without the token cache.
+        """
 
-        # TODO - Add ssl param(s)
         data = {"refresh_token": self.token.refresh_token}
-        r = self._make_call("POST", "/auth/token", fields=data, use_filter=False)
+        with start_span(self.tracer, "fawlty.refresh"):
+            r = self._make_call("POST", "/auth/token", fields=data, use_filter=False)
 
         if r.status_code < 200 or r.status_code > 299:
             raise SensuAuthError(f"Failed to refresh token ({r.text})")
 
-        self.token = SensuToken(**r.json())
-        self.session.headers.update({"Authorization": f"Bearer {self.token.access_token}"})
+        self._use_token(SensuToken(**r.json()))
 
         return True
 
-    def resource_get(self, cls, get_url) -> list[object]:
+    def single_flight_refresh(self, stale_token=None):
+        """
+        Refresh the token, making sure only one refresh is in flight at a time.
+
+        Callers that arrive while a refresh is under way wait for it, and then use the token
+        it produced rather than refreshing (and rotating the refresh token) again.
+
+        :param stale_token: The token the caller found to need refreshing (default is the
+                            current token).
+        :return: True if this call performed the refresh, False if another caller did.
+        """
+
+        if stale_token is None:
+            stale_token = self.token
+
+        left = remaining()
+        # pylint: disable=R1732
+        if not self._refresh_lock.acquire(timeout=-1 if left is None else max(left, 0)):
+            raise SensuTimeoutError("Deadline exceeded waiting for a token refresh")
+
+        try:
+            if self.token is not stale_token:
+                return False
+
+            return self.refresh_token()
+        finally:
+            self._refresh_lock.release()
+
+    def start_token_refresher(self, lead_time=DEFAULT_LEAD_TIME, **kwargs) -> TokenRefresher:
+        """
+        Start a background thread that refreshes the token ahead of need_refresh(), so that
+        calls never wait on a refresh.
+
+        :param lead_time: How many seconds ahead of the refresh threshold to refresh.
+        :param kwargs: Further arguments for TokenRefresher.
+        :return: The running TokenRefresher.
+        """
+
+        if self.token_refresher is None:
+            self.token_refresher = TokenRefresher(self, lead_time=lead_time, **kwargs)
+
+        self.token_refresher.start()
+
+        return self.token_refresher
+
+    def stop_token_refresher(self):
+        """
+        Stop the background token refresher, if one is running.
+        """
+
+        if self.token_refresher is not None:
+            self.token_refresher.stop()
+            self.token_refresher = None
+
+    def resource_get(self, cls, get_url, page_size=None, lazy=False) -> list[object]:
         """
         Get a resource or resources from the Sensu server.
+
+        :param page_size: If provided, retrieve the collection in pages of this size (an
+                          integer or a PageSizer), rather than with a single request.
+        :param lazy: Return LazyResource views, which validate fields only as they are read.
+                     These bypass the response cache.
         :return: A list of objects representing the resource(s).
+
+        Without a page_size, identical requests made concurrently from several threads are
+        coalesced by the client's single_flight: one is sent, and each caller builds its own
+        objects from its response body.
         """
 
-        r = self._make_call("GET", get_url)
+        if page_size is not None:
+            return list(
+                self.resource_iter(cls=cls, get_url=get_url, page_size=page_size, lazy=lazy)
+            )
+
+        if self.single_flight is None:
+            return self._build_resources(cls, self._get_body(cls, get_url, lazy), lazy=lazy)
+
+        body, coalesced = self.single_flight.do(
+            (cls, get_url, lazy), lambda: self._get_body(cls, get_url, lazy)
+        )
+        if coalesced and self.metrics is not None:
+            self.metrics.record_coalesced("GET", get_url, cls)
+
+        return self._build_resources(cls, body, lazy=lazy)
+
+    def _get_body(self, cls, get_url, lazy) -> bytes:
+        """
+        Get the body of a response for a resource or resources, in a single request or from
+        the response cache.
+        """
+
+        if self.response_cache is not None and not lazy:
+            return self._cached_get(cls, get_url)
+
+        r = self._make_call(
+            "GET", get_url, retry_policy=self._retry_policy_for(cls, "get"), resource=cls
+        )
 
         if r.status_code < 200 or r.status_code > 299:
             raise SensuError(f"Failed to get resource(s) ({r.text})")
 
-        resources = []
-        for _ in r.json():
-            obj = cls(**_)
-            obj.set_client(self)
-            resources.append(obj)
+        return r.content
 
-        return resources
+    def _cached_get(self, cls, get_url) -> bytes:
+        """
+        Get the body of a response through the response cache.  The cache holds the raw
+        body, and each caller validates its own objects from it, so changing one does not
+        alter the cache.
+        """
+
+        cache = self.response_cache
+        key = (cls, get_url)
+        entry, state = cache.lookup(key)
+
+        if state == STALE and cache.begin_revalidation(entry):
+            threading.Thread(
+                target=self._background_revalidate, args=(cls, get_url, entry),
+                name="fawlty-cache-revalidate", daemon=True,
+            ).start()
+
+        if state in (FRESH, STALE):
+            return entry.body
+
+        return self._revalidate(cls, get_url, entry)
+
+    def _revalidate(self, cls, get_url, entry) -> bytes:
+        """
+        Fetch a resource or resources, conditionally if a cached copy has an ETag, and update
+        the response cache.
+
+        :return: The (cached) response body.
+        """
+
+        cache = self.response_cache
+        key = (cls, get_url)
+        headers = {"If-None-Match": entry.etag} if entry and entry.etag else None
+
+        try:
+            r = self._make_call(
+                "GET", get_url, headers=headers, retry_policy=self._retry_policy_for(cls, "get"),
+                resource=cls,
+            )
+        finally:
+            if entry:
+                entry.revalidating = False
+
+        if r.status_code == 304 and entry:
+            cache.revalidated(key, entry)
+            return entry.body
+
+        if r.status_code < 200 or r.status_code > 299:
+            raise SensuError(f"Failed to get resource(s) ({r.text})")
+
+        cache.store(key, r.headers.get("ETag"), r.content)
+
+        return r.content
+
+    def _background_revalidate(self, cls, get_url, entry):
+        """
+        Revalidate a stale cache entry.  Failures leave the entry in place, to be retried by
+        a later reader.
+        """
+
+        try:
+            self._revalidate(cls, get_url, entry)
+        except SensuError:
+            pass
+
+    def _invalidate_cache(self, obj):
+        """
+        Drop any cached responses that a write to the given object may have changed.
+        """
+
+        if self.response_cache is None:
+            return
+
+        collection_url = obj.urlify(purpose="create")
+        if isinstance(collection_url, str):
+            self.response_cache.invalidate(collection_url)
+
+        # Listings across every namespace include the object too
+        all_namespaces_url = getattr(type(obj), "ALL_NAMESPACES_URL", None)
+        if isinstance(all_namespaces_url, str):
+            self.response_cache.invalidate(all_namespaces_url)
+
+    # pylint: disable=R0913
+    def resource_stream(
+        self, cls, get_url, params=None, spool_threshold=None, chunk_size=DEFAULT_CHUNK_SIZE
+    ):
+        """
+        Get a collection from the Sensu server, decoding the response body incrementally and
+        yielding each object as soon as its element of the JSON array has arrived.  Only one
+        element is held in decoded form at a time, whatever the size of the response.
+
+        If spool_threshold is set, the body is first read into a temporary file, which stays
+        in memory up to that many bytes and moves to disk beyond it.  That frees the
+        connection promptly when the caller is slow to consume the objects.
+
+        :param cls: The resource class to build objects with.
+        :param get_url: The URL of the collection.
+        :param params: Query string parameters to send.
+        :param spool_threshold: If set, spool the body, holding at most this many bytes in
+                                memory.
+        :param chunk_size: The number of bytes to read from the body at a time.
+        :return: A generator of objects representing the resources.
+        """
+
+        r = self._make_call(
+            "GET", get_url, params=params, stream=True,
+            retry_policy=self._retry_policy_for(cls, "get"), resource=cls,
+        )
+        spooled = None
+
+        try:
+            if r.status_code < 200 or r.status_code > 299:
+                raise SensuError(f"Failed to get resource(s) ({r.text})")
+
+            chunks = r.iter_content(chunk_size=chunk_size)
+            if spool_threshold is not None:
+                spooled = spool(chunks, spool_threshold)
+                r.close()
+                chunks = iter_file(spooled, chunk_size)
+
+            for _ in iter_json_array(chunks):
+                obj = cls.model_validate(_)
+                obj.set_client(self)
+                yield obj
+
+        finally:
+            r.close()
+            if spooled is not None:
+                spooled.close()
+
+    # pylint: disable=R0913
+    def resource_iter(
+        self, cls, get_url, page_size=None, params=None, prefetch=True, *, lazy=False
+    ):
+        """
+        Iterate over a collection from the Sensu server, one page at a time.
+
+        Pages are requested with the "limit" query parameter, and the "Sensu-Continue"
+        response header is followed until the collection is exhausted.  When prefetch is
+        enabled, the next page is requested while the current one is being consumed.
+
+        :param cls: The resource class to build objects with.
+        :param get_url: The URL of the collection.
+        :param page_size: An integer or PageSizer (default is the class' PAGE_SIZE).
+        :param params: Additional query string parameters to send.
+        :param prefetch: Whether to fetch the next page in the background (default is True).
+        :param lazy: Yield LazyResource views, which validate fields only as they are read.
+        :return: A generator of objects representing the resources.
+        """
+
+        # Imported here, so that importing the client does not pull in the thread pool
+        from concurrent.futures import ThreadPoolExecutor  # pylint: disable=C0415
+
+        sizer = get_page_sizer(page_size, default=getattr(cls, "PAGE_SIZE", None))
+        executor = ThreadPoolExecutor(max_workers=1) if prefetch else None
+
+        try:
+            policy = self._retry_policy_for(cls, "get")
+            page = self._get_page(
+                get_url, sizer.next_size(), None, params, retry_policy=policy, resource=cls
+            )
+            while True:
+                r, elapsed, limit = page
+                resources = self._build_resources(cls, r.content, lazy=lazy)
+                sizer.observe(elapsed, len(resources), limit)
+
+                token = r.headers.get(CONTINUE_HEADER) if resources else None
+                if token and executor:
+                    # The prefetch runs in this context, so it honours any deadline
+                    page = executor.submit(
+                        contextvars.copy_context().run, self._get_page, get_url,
+                        sizer.next_size(), token, params, retry_policy=policy, resource=cls,
+                    )
+
+                yield from resources
+
+                if not token:
+                    break
+
+                page = page.result() if executor else self._get_page(
+                    get_url, sizer.next_size(), token, params, retry_policy=policy, resource=cls
+                )
+
+        finally:
+            if executor:
+                executor.shutdown(wait=False, cancel_futures=True)
+
+    # pylint: disable=R0913
+    def _get_page(self, get_url, limit, token, params, *, retry_policy=None, resource=None):
+        """
+        Request a single page of a collection.
+
+        :return: A tuple of the response, the seconds it took, and the requested limit.
+        """
+
+        page_params = self._page_params(limit, token, params)
+
+        start = time.monotonic()
+        r = self._make_call(
+            "GET", get_url, params=page_params, retry_policy=retry_policy, resource=resource
+        )
+        elapsed = time.monotonic() - start
+
+        if r.status_code < 200 or r.status_code > 299:
+            raise SensuError(f"Failed to get resource(s) ({r.text})")
+
+        return r, elapsed, limit
 
     def resource_post(self, obj, url=None) -> bool:
         """
@@ -148,17 +985,18 @@ class SensuClient:
         :return: The object representing the resource.
         """
 
-        try:
-            obj.model_validate(obj)
-        except ValidationError as err:
-            raise SensuResourceError(str(err)) from err
+        self._validate_for_write(obj)
 
         if url is None:
             url = obj.urlify(purpose="create")
 
-        self._make_call(method="POST", path=url, fields=obj.model_dump())
-
-        # TODO: Handle a failure
+        r = self._make_call(
+            method="POST", path=url, fields=obj,
+            retry_policy=self._retry_policy_for(type(obj), "create"), resource=type(obj),
+        )
+        self._invalidate_cache(obj)
+        self._check_write_response(r, "create")
+        obj.created(r.headers.get("Location"))
 
         return True
 
@@ -168,17 +1006,17 @@ class SensuClient:
         :return: The object representing the resource.
         """
 
-        try:
-            obj.model_validate(obj)
-        except ValidationError as err:
-            raise SensuResourceError(str(err)) from err
+        self._validate_for_write(obj)
 
         if url is None:
             url = obj.urlify()
 
-        self._make_call(method="PUT", path=url, fields=obj.model_dump())
-
-        # TODO: Handle a failure
+        r = self._make_call(
+            method="PUT", path=url, fields=obj,
+            retry_policy=self._retry_policy_for(type(obj), "update"), resource=type(obj),
+        )
+        self._invalidate_cache(obj)
+        self._check_write_response(r, "update")
 
         return True
 
@@ -193,6 +1031,34 @@ class SensuClient:
         if url is None:
             url = obj.urlify()
 
-        self._make_call(method="DELETE", path=url)
+        r = self._make_call(
+            method="DELETE", path=url, retry_policy=self._retry_policy_for(type(obj), "delete"),
+            resource=type(obj),
+        )
+        self._invalidate_cache(obj)
+        self._check_write_response(r, "delete")
 
         return True
+
+    def bulk_apply(
+        self, objs, op="create", *, concurrency=DEFAULT_CONCURRENCY, max_pending=None,
+        progress=None, progress_interval=1.0, cancel=None, stop_on_error=False
+    ):
+        """
+        Create, update or delete many resources concurrently, on a bounded pool of threads
+        sharing this client's session.  The server's pool_maxsize should be at least the
+        concurrency, or connections will be opened and discarded.
+
+        See fawlty.bulk.bulk_apply for a description of the arguments.
+
+        :return: A BulkResult, holding the result or error for each object.
+        """
+
+        # Imported here, as few scripts make bulk changes
+        from fawlty.bulk import bulk_apply  # pylint: disable=C0415
+
+        return bulk_apply(
+            self, objs, op=op, concurrency=concurrency, max_pending=max_pending,
+            progress=progress, progress_interval=progress_interval, cancel=cancel,
+            stop_on_error=stop_on_error,
+        )
@@ -0,0 +1,36 @@
+"""
+A module to represent the connection information for a cluster of Sensu backends
+"""
+
+# Built in imports
+from typing import List, Literal, Optional
+
+# 3rd party imports
+from pydantic import BaseModel, field_validator
+
+# Our imports
+from fawlty.sensu_server import SensuServer
+
+
+class SensuCluster(BaseModel):
+    """
+    A class to represent a cluster of Sensu backends, which all serve the same API.
+    """
+
+    backends: List[SensuServer]
+    balancing: Literal["least_outstanding", "latency"] = "least_outstanding"
+    failure_threshold: int = 2
+    eject_seconds: float = 30.0
+    health_interval: float = 10.0
+    health_timeout: float = 2.0
+    hedge_after: Optional[float] = None
+
+    @field_validator("backends")
+    def validate_backends(cls, value):
+        """
+        Validate that there is at least one backend.
+        """
+        if len(value) < 1:
+            raise ValueError("A cluster must have at least one backend.")
+
+        return value
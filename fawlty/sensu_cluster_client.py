@@ -0,0 +1,266 @@
+"""
+Implements a Sensu client which spreads its calls across the backends of a cluster.
+"""
+
+# Built in imports
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+# 3rd party imports
+import requests
+from urllib3.exceptions import NewConnectionError
+
+# Our imports
+from fawlty.sensu_client import SensuClient
+from fawlty.balancer import Balancer
+from fawlty.retry import IDEMPOTENT_METHODS
+from fawlty.deadline import effective_timeout
+
+# Constants
+HEALTH_PATH = "/health"
+
+
+def _never_sent(err: Exception) -> bool:
+    """
+    Whether a connection error happened before the request could reach the server, so that
+    it is safe to send the request to another backend whatever its method.
+    """
+
+    if isinstance(err, requests.ConnectTimeout):
+        return True
+
+    reason = getattr(err.args[0], "reason", None) if err.args else None
+
+    return isinstance(reason, NewConnectionError)
+
+
+def _close_response(future):
+    """
+    Close the response of a request which lost a hedging race.
+    """
+
+    if not future.cancelled() and future.exception() is None:
+        future.result().close()
+
+
+class SensuClusterClient(SensuClient):
+    """
+    A Sensu client for a cluster of backends.
+
+    Each request is sent to the backend picked by the cluster's balancing strategy.  If a
+    backend can't be reached, the request fails over to the next one, which is always done
+    for idempotent methods, and otherwise only when the request was never sent.  Backends
+    which fail repeatedly are left out for a while, as are backends found unhealthy by the
+    optional background health checks.  When the cluster's hedge_after is set, a GET which
+    hasn't been answered within that many seconds is also sent to a second backend, and
+    whichever answers first is used.
+
+    The session's connection pooling, SSL, timeout and compression settings are taken from
+    the first backend.
+    """
+
+    # pylint: disable=R0913
+    def __init__(
+        self, cluster, timeout=None, retry_policy=None, response_cache=None, serializer=None,
+        *, metrics=None, tracer=None, rate_limiter=None, concurrency_limiter=None,
+        token_cache=None, api_key=None
+    ):
+        """
+        Initialize a new Sensu cluster client.
+
+        :param cluster: The SensuCluster to connect to.
+        :param timeout: A default timeout for requests, overriding the servers' settings.
+        :param retry_policy: The default RetryPolicy for calls (default is no retries).
+        :param response_cache: An optional ResponseCache for resource_get.
+        :param serializer: The Serializer for request bodies (default is PydanticSerializer).
+        :param metrics: An optional ClientMetrics to record calls in.
+        :param tracer: An optional Tracer to record spans with.
+        :param rate_limiter: An optional RateLimiter capping the rate of requests.
+        :param concurrency_limiter: An optional AIMDLimiter capping the requests in flight.
+        :param token_cache: An optional FileTokenCache to share login tokens through.
+        :param api_key: An API key to authenticate with, instead of logging in.
+        """
+        self.cluster = cluster
+        self.balancer = Balancer(
+            cluster.backends,
+            cluster.balancing,
+            failure_threshold=cluster.failure_threshold,
+            eject_seconds=cluster.eject_seconds,
+        )
+        self.hedged_requests = 0
+        self._hedge_pool = None
+        self._hedge_lock = threading.Lock()
+        self._health_stop = threading.Event()
+        self._health_thread = None
+        super().__init__(
+            server=cluster.backends[0], timeout=timeout, retry_policy=retry_policy,
+            response_cache=response_cache, serializer=serializer, metrics=metrics,
+            tracer=tracer, rate_limiter=rate_limiter, concurrency_limiter=concurrency_limiter,
+            token_cache=token_cache, api_key=api_key,
+        )
+
+    def _send(self, method, path, **kwargs):
+        """
+        Send a single request to the cluster, failing over between backends (and hedging
+        GET requests, if configured).
+        """
+
+        kwargs.setdefault("timeout", effective_timeout(self._timeout()))
+
+        if method == "GET" and self.cluster.hedge_after is not None and not kwargs.get("stream"):
+            return self._hedged_send(method, path, **kwargs)
+
+        return self._failover_send(method, path, [], None, **kwargs)
+
+    def _send_to(self, backend, method, path, **kwargs):
+        """
+        Send a request to one backend, recording the outcome with the balancer.  The
+        backend must have been picked from the balancer.
+        """
+
+        start = time.monotonic()
+        try:
+            r = self.session.request(method, backend.server.api_url + path, **kwargs)
+        except (requests.ConnectionError, requests.Timeout):
+            self.balancer.finish(backend, time.monotonic() - start, ok=False)
+            raise
+
+        self.balancer.finish(backend, time.monotonic() - start, ok=r.status_code < 500)
+
+        return r
+
+    # pylint: disable=R0913
+    def _failover_send(self, method, path, tried, error, **kwargs):
+        """
+        Send a request to each backend in turn until one can be reached.
+
+        :param tried: Backends which have already failed to respond.
+        :param error: The error from the last of those, if any.
+        """
+
+        while True:
+            backend = self.balancer.pick(exclude=tried)
+            if backend is None:
+                raise error or requests.ConnectionError("No backends left to try")
+
+            tried.append(backend)
+            try:
+                return self._send_to(backend, method, path, **kwargs)
+            except (requests.ConnectionError, requests.Timeout) as err:
+                if method.upper() not in IDEMPOTENT_METHODS and not _never_sent(err):
+                    raise
+                error = err
+
+    def _hedged_send(self, method, path, **kwargs):
+        """
+        Send a request to one backend and, if it hasn't answered within the cluster's
+        hedge_after seconds, to a second one as well, using the first answer to arrive.
+        """
+
+        first = self.balancer.pick()
+        pool = self._get_hedge_pool()
+        futures = [pool.submit(self._send_to, first, method, path, **kwargs)]
+        tried = [first]
+
+        done, _ = wait(futures, timeout=self.cluster.hedge_after)
+        if not done:
+            second = self.balancer.pick(exclude=tried)
+            if second is not None:
+                tried.append(second)
+                futures.append(pool.submit(self._send_to, second, method, path, **kwargs))
+                with self._hedge_lock:
+                    self.hedged_requests += 1
+
+        error = None
+        pending = set(futures)
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    for other in pending:
+                        other.add_done_callback(_close_response)
+                    return future.result()
+                error = future.exception()
+
+        # Every backend raced so far failed to respond, so fail over to the rest
+        return self._failover_send(method, path, tried, error, **kwargs)
+
+    def _get_hedge_pool(self) -> ThreadPoolExecutor:
+        """
+        Return the thread pool hedged requests are sent from, creating it if need be.
+        """
+
+        with self._hedge_lock:
+            if self._hedge_pool is None:
+                self._hedge_pool = ThreadPoolExecutor(
+                    max_workers=sum(_.pool_maxsize for _ in self.cluster.backends),
+                    thread_name_prefix="fawlty-hedge",
+                )
+
+            return self._hedge_pool
+
+    def check_health(self):
+        """
+        Probe the /health endpoint of every backend, ejecting those which don't answer with
+        a 200 and restoring those which do.
+        """
+
+        for backend in self.balancer.backends:
+            try:
+                r = self.session.get(
+                    backend.server.api_url + HEALTH_PATH, timeout=self.cluster.health_timeout
+                )
+                healthy = r.status_code == 200
+                r.close()
+            except (requests.ConnectionError, requests.Timeout):
+                healthy = False
+
+            self.balancer.mark_health(backend, healthy)
+
+    def start_health_checks(self):
+        """
+        Start checking the health of the backends every health_interval seconds, in a
+        background (daemon) thread.
+        """
+
+        if self._health_thread and self._health_thread.is_alive():
+            return
+
+        self._health_stop.clear()
+        self._health_thread = threading.Thread(
+            target=self._run_health_checks, name="fawlty-health-checks", daemon=True
+        )
+        self._health_thread.start()
+
+    def stop_health_checks(self, timeout=None):
+        """
+        Stop the background health checks.
+
+        :param timeout: How many seconds to wait for the thread to finish.
+        """
+
+        self._health_stop.set()
+        if self._health_thread:
+            self._health_thread.join(timeout)
+
+    def _run_health_checks(self):
+        """
+        The body of the health check thread.
+        """
+
+        while True:
+            self.check_health()
+            if self._health_stop.wait(self.cluster.health_interval):
+                break
+
+    def close(self):
+        """
+        Stop the health checks and hedging threads, and close the session.
+        """
+
+        self.stop_health_checks()
+        self.stop_token_refresher()
+        if self._hedge_pool is not None:
+            self._hedge_pool.shutdown(wait=False)
+        self.session.close()
@@ -2,7 +2,19 @@
 A module to represent the connection information to a Sensu server API
 """
 
+# Built in imports
+import ssl
+from typing import Optional
+
+# 3rd party imports
 from pydantic import BaseModel, computed_field
+from requests.certs import where as default_ca_file
+
+# Our imports
+from fawlty.compression import DEFAULT_ACCEPT_ENCODING, DEFAULT_COMPRESS_LEVEL
+
+# Constants
+DEFAULT_POOL_SIZE = 10
 
 
 class SensuServer(BaseModel):
@@ -14,6 +26,17 @@ class SensuServer(BaseModel):
     port: int = 8080
     use_ssl: bool = False
     ignore_cert: bool = False
+    ca_file: Optional[str] = None
+    pool_connections: int = DEFAULT_POOL_SIZE
+    pool_maxsize: int = DEFAULT_POOL_SIZE
+    pool_block: bool = False
+    keep_alive: bool = True
+    connect_timeout: Optional[float] = None
+    read_timeout: Optional[float] = None
+    accept_encoding: str = DEFAULT_ACCEPT_ENCODING
+    compress_requests_over: Optional[int] = None
+    compress_level: int = DEFAULT_COMPRESS_LEVEL
+    _ssl_context: Optional[ssl.SSLContext] = None
 
     @computed_field
     @property
@@ -24,3 +47,33 @@ class SensuServer(BaseModel):
         :return: The API URL.
         """
         return f"http{'s' if self.use_ssl else ''}://{self.host}:{self.port}"
+
+    def ssl_context(self) -> ssl.SSLContext:
+        """
+        Return an SSL context for connecting to the server.  The context is built once and
+        reused, so the CA bundle is only loaded a single time.
+
+        :return: The SSL context, which skips certificate validation if ignore_cert is set.
+        """
+
+        if self._ssl_context is None:
+            context = ssl.create_default_context(cafile=self.ca_file or default_ca_file())
+            if self.ignore_cert:
+                context.check_hostname = False
+                context.verify_mode = ssl.CERT_NONE
+
+            self._ssl_context = context
+
+        return self._ssl_context
+
+    def timeout(self) -> Optional[tuple]:
+        """
+        Return the default (connect, read) timeout for requests to the server.
+
+        :return: The timeout tuple, or None if no timeouts are configured.
+        """
+
+        if self.connect_timeout is None and self.read_timeout is None:
+            return None
+
+        return (self.connect_timeout, self.read_timeout)
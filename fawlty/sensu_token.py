@@ -36,3 +36,12 @@ class SensuToken(BaseModel):
         :return: True if the sensu token needs to be refreshed, False otherwise.
         """
         return self.expires_at - int(time.time()) < self._refresh_threshold
+
+    def seconds_until_refresh(self, lead_time: float = 0) -> float:
+        """
+        Return the number of seconds until the token should be refreshed.
+
+        :param lead_time: How many seconds before need_refresh() becomes true to refresh.
+        :return: The seconds remaining, which is negative if the refresh is overdue.
+        """
+        return self.expires_at - self._refresh_threshold - lead_time - time.time()
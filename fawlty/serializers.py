@@ -0,0 +1,87 @@
+"""
+A module providing the serializers used to encode request bodies sent to the Sensu server.
+
+A serializer turns either a resource object or plain data (dicts, lists and so on) into
+the bytes of a JSON document.  The default, PydanticSerializer, has pydantic-core write
+resource objects straight to JSON bytes, without building an intermediate dict.
+OrjsonSerializer requires the optional "orjson" dependency.
+"""
+
+# Built in imports
+import json
+from typing import Any
+
+# 3rd party imports
+import pydantic_core
+from pydantic import BaseModel
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+# Our imports
+from fawlty.exceptions import SensuClientError
+
+
+class Serializer:  # pylint: disable=R0903
+    """
+    The interface for request body serializers.
+    """
+
+    def dumps(self, data: Any) -> bytes:
+        """
+        Encode a resource object, or plain data, as JSON.
+
+        :param data: A pydantic model, or data made of dicts, lists, strings and numbers.
+        :return: The UTF-8 encoded JSON document.
+        """
+        raise NotImplementedError(f"{type(self).__name__} must implement dumps.")
+
+
+class JSONSerializer(Serializer):  # pylint: disable=R0903
+    """
+    Encodes with the standard library's json module, dumping models to a dict first.
+    """
+
+    def dumps(self, data: Any) -> bytes:
+        if isinstance(data, BaseModel):
+            data = data.model_dump()
+
+        return json.dumps(data).encode()
+
+
+class PydanticSerializer(Serializer):  # pylint: disable=R0903
+    """
+    Encodes with pydantic-core, which writes models to JSON bytes directly.
+    """
+
+    def dumps(self, data: Any) -> bytes:
+        return pydantic_core.to_json(data)
+
+
+class OrjsonSerializer(Serializer):  # pylint: disable=R0903
+    """
+    Encodes with orjson.  Models are dumped to a dict first, as orjson cannot walk them.
+    """
+
+    def __init__(self):
+        """
+        Instance initialization
+        """
+
+        if orjson is None:
+            raise SensuClientError("OrjsonSerializer requires the orjson package")
+
+    def dumps(self, data: Any) -> bytes:
+        if isinstance(data, BaseModel):
+            data = data.model_dump()
+
+        return orjson.dumps(data)  # pylint: disable=E1101
+
+
+def default_serializer() -> Serializer:
+    """
+    Return the serializer used by clients which are not given one.
+    """
+    return PydanticSerializer()
@@ -0,0 +1,198 @@
+"""
+A module for coalescing identical requests made concurrently, so that only one of them is
+sent to the Sensu server and the others share its result.
+
+The first caller for a key (the leader) does the work.  Callers arriving with the same key
+while it is in flight (the followers) wait for it, and are handed the leader's result, or
+raise the leader's exception.  Once the leader finishes, the key is forgotten, so later
+callers make a fresh request: nothing is cached.
+"""
+
+# Built in imports
+import threading
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+
+# Our imports
+from fawlty.deadline import remaining
+from fawlty.exceptions import SensuTimeoutError
+
+
+class _Call:  # pylint: disable=R0903
+    """
+    A call in flight, and the callers waiting on it.
+    """
+
+    __slots__ = ("done", "result", "error", "followers")
+
+    def __init__(self, done):
+        """
+        Instance initialization
+
+        :param done: The threading.Event or asyncio.Future set when the call finishes.
+        """
+        self.done = done
+        self.result = None
+        self.error = None
+        self.followers = 0
+
+
+def _share(call: _Call, share: Optional[Callable[[Any], Any]]) -> Any:
+    """
+    Return the result of a finished call, for one of the callers sharing it.
+    """
+
+    if call.error is not None:
+        raise call.error
+
+    return share(call.result) if share else call.result
+
+
+class SingleFlight:
+    """
+    Coalesces identical calls made concurrently from several threads.
+    """
+
+    def __init__(self):
+        """
+        Instance initialization
+        """
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+        self.leaders = 0
+        self.saved = 0
+
+    def do(
+        self, key: Hashable, func: Callable[[], Any], share: Callable[[Any], Any] = None
+    ) -> Tuple[Any, bool]:
+        """
+        Call a function, unless a call with the same key is already in flight, in which case
+        wait for that call and share its result.
+
+        Followers wait no longer than any deadline in force.
+
+        :param key: Identifies calls which may be coalesced.
+        :param func: The function to call.
+        :param share: Makes a copy of the result for each caller sharing it, so that no two
+                      callers are handed the same (mutable) objects.  The leader only
+                      copies when it has followers.
+        :return: A tuple of the result, and whether it came from another caller's call.
+        """
+
+        with self._lock:
+            call = self._calls.get(key)
+            if call is None:
+                call = self._calls[key] = _Call(threading.Event())
+                self.leaders += 1
+                leader = True
+            else:
+                call.followers += 1
+                leader = False
+
+        if not leader:
+            left = remaining()
+            if not call.done.wait(None if left is None else max(left, 0)):
+                raise SensuTimeoutError("Deadline exceeded waiting for a coalesced request")
+
+            with self._lock:
+                self.saved += 1
+
+            return _share(call, share), True
+
+        try:
+            call.result = func()
+        except BaseException as err:
+            call.error = err
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+        if call.followers:
+            return _share(call, share), False
+
+        return call.result, False
+
+    def stats(self) -> dict:
+        """
+        Return the number of calls made, and the number saved by coalescing.
+        """
+
+        with self._lock:
+            return {"calls": self.leaders, "saved": self.saved, "in_flight": len(self._calls)}
+
+
+class AsyncSingleFlight:
+    """
+    Coalesces identical calls made concurrently from several tasks on an event loop.
+    """
+
+    def __init__(self):
+        """
+        Instance initialization
+        """
+        self._calls: Dict[Hashable, _Call] = {}
+        self.leaders = 0
+        self.saved = 0
+
+    async def do(
+        self, key: Hashable, func: Callable[[], Awaitable[Any]],
+        share: Callable[[Any], Any] = None
+    ) -> Tuple[Any, bool]:
+        """
+        Await a coroutine function, unless a call with the same key is already in flight, in
+        which case wait for that call and share its result.  See SingleFlight.do.
+
+        If the leader is cancelled, its followers are not: one of them takes over the call.
+        """
+
+        # Imported here, as only asynchronous clients need asyncio
+        import asyncio  # pylint: disable=C0415
+
+        while True:
+            call = self._calls.get(key)
+            if call is None:
+                break
+
+            call.followers += 1
+            try:
+                await asyncio.wait_for(asyncio.shield(call.done), remaining())
+            except asyncio.TimeoutError as err:
+                raise SensuTimeoutError(
+                    "Deadline exceeded waiting for a coalesced request"
+                ) from err
+            except asyncio.CancelledError:
+                if call.done.cancelled():
+                    continue
+                raise
+
+            self.saved += 1
+
+            return _share(call, share), True
+
+        call = self._calls[key] = _Call(asyncio.get_running_loop().create_future())
+        self.leaders += 1
+        try:
+            call.result = await func()
+        except asyncio.CancelledError:
+            call.done.cancel()
+            raise
+        except BaseException as err:
+            call.error = err
+            call.done.set_result(None)
+            raise
+        finally:
+            del self._calls[key]
+
+        call.done.set_result(None)
+
+        if call.followers:
+            return _share(call, share), False
+
+        return call.result, False
+
+    def stats(self) -> dict:
+        """
+        Return the number of calls made, and the number saved by coalescing.
+        """
+        return {"calls": self.leaders, "saved": self.saved, "in_flight": len(self._calls)}
@@ -0,0 +1,164 @@
+"""
+A module for decoding JSON array responses incrementally, one element at a time, so that the
+whole body and the whole decoded list never have to be held in memory together.
+"""
+
+# Built in imports
+import codecs
+import json
+import tempfile
+from typing import Any, BinaryIO, Iterable, Iterator
+
+# Constants
+DEFAULT_CHUNK_SIZE = 64 * 1024
+WHITESPACE = " \t\n\r"
+# The characters which may continue a number, such as 1 continuing as 1.5e-3
+NUMBER_CHARACTERS = "0123456789.eE+-"
+
+
+class _ArrayReader:  # pylint: disable=R0903
+    """
+    Pulls elements of a JSON array out of a stream of byte chunks.
+    """
+
+    def __init__(self, chunks: Iterable[bytes]):
+        """
+        Instance initialization
+
+        :param chunks: The body of the response, as an iterable of byte strings.
+        """
+        self._chunks = iter(chunks)
+        self._decoder = json.JSONDecoder()
+        self._text = codecs.getincrementaldecoder("utf-8")()
+        self._buffer = ""
+        self._pos = 0
+        self._eof = False
+
+    def _read(self, minimum: int = 1) -> bool:
+        """
+        Append more of the stream to the buffer, discarding what has been consumed.
+
+        :param minimum: The number of unconsumed characters to read up to, if possible.
+        :return: False if the stream was already exhausted.
+        """
+
+        if self._eof:
+            return False
+
+        pending = [self._buffer[self._pos:]]
+        available = len(pending[0])
+        while available < minimum or len(pending) == 1:
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                pending.append(self._text.decode(b"", final=True))
+                self._eof = True
+                break
+
+            text = self._text.decode(chunk)
+            pending.append(text)
+            available += len(text)
+
+        self._buffer = "".join(pending)
+        self._pos = 0
+
+        return True
+
+    def _skip_whitespace(self) -> str:
+        """
+        Skip whitespace, returning the next character (or an empty string at the end).
+        """
+
+        while True:
+            while self._pos < len(self._buffer) and self._buffer[self._pos] in WHITESPACE:
+                self._pos += 1
+
+            if self._pos < len(self._buffer):
+                return self._buffer[self._pos]
+
+            if not self._read():
+                return ""
+
+    def _decode_value(self) -> Any:
+        """
+        Decode the value at the current position, reading more of the stream as needed.
+        """
+
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buffer, self._pos)
+            except json.JSONDecodeError:
+                # Incomplete - read at least as much again before retrying, so that a large
+                # element is re-parsed a logarithmic, rather than linear, number of times
+                if not self._read(minimum=2 * (len(self._buffer) - self._pos) + 1):
+                    raise
+                continue
+
+            # A number followed by nothing but the start of its fraction or exponent (or by
+            # nothing at all) may continue in the next chunk
+            if (
+                not self._eof and isinstance(value, (int, float))
+                and all(_ in NUMBER_CHARACTERS for _ in self._buffer[end:])
+            ):
+                self._read(minimum=len(self._buffer) - self._pos + 1)
+                continue
+
+            self._pos = end
+            return value
+
+    def __iter__(self) -> Iterator[Any]:
+        """
+        Yield each element of the array.
+        """
+
+        if self._skip_whitespace() != "[":
+            raise ValueError("Expected a JSON array")
+        self._pos += 1
+
+        if self._skip_whitespace() == "]":
+            return
+
+        while True:
+            yield self._decode_value()
+
+            char = self._skip_whitespace()
+            self._pos += 1
+            if char == "]":
+                return
+            if char != ",":
+                raise ValueError(f"Expected ',' or ']' in JSON array, found {char!r}")
+            self._skip_whitespace()
+
+
+def iter_json_array(chunks: Iterable[bytes]) -> Iterator[Any]:
+    """
+    Decode a JSON array incrementally, yielding each element as soon as it is complete.
+
+    :param chunks: The UTF-8 encoded array, as an iterable of byte strings.
+    :return: A generator of the decoded elements.
+    """
+    return iter(_ArrayReader(chunks))
+
+
+def spool(chunks: Iterable[bytes], threshold: int) -> BinaryIO:
+    """
+    Write a stream of chunks to a temporary file, which is held in memory until it grows
+    past the threshold and on disk after that.
+
+    :param chunks: The body of the response, as an iterable of byte strings.
+    :param threshold: The number of bytes to hold in memory before moving to disk.
+    :return: The file, positioned at its start.
+    """
+
+    spooled = tempfile.SpooledTemporaryFile(max_size=threshold)  # pylint: disable=R1732
+    for chunk in chunks:
+        spooled.write(chunk)
+    spooled.seek(0)
+
+    return spooled
+
+
+def iter_file(fileobj: BinaryIO, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[bytes]:
+    """
+    Read a file in chunks.
+    """
+    return iter(lambda: fileobj.read(chunk_size), b"")
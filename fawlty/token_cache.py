@@ -0,0 +1,212 @@
+"""
+A module providing an on-disk cache of login tokens, shared by every process run by a user.
+
+A client given a FileTokenCache reuses a token cached by an earlier process instead of
+logging in, until the token needs refreshing.  Logins and refreshes are done while holding
+a lock on the token's file, so when several processes find the token needs refreshing, only
+the first refreshes it, and the others pick up the token it stored.  (Sensu issues a new
+refresh token with each refresh, so a second refresh with the old one would fail.)
+
+Tokens are kept in a directory only the user can read, one file per server and username.
+Locking uses fcntl, so on platforms without it tokens are still cached, but logins and
+refreshes are not coordinated.
+"""
+
+# Built in imports
+import hashlib
+import os
+import tempfile
+import time
+from typing import Optional
+
+# 3rd party imports
+from pydantic import ValidationError
+
+# Our imports
+from fawlty.deadline import remaining
+from fawlty.exceptions import SensuTimeoutError
+from fawlty.sensu_token import SensuToken
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover
+    fcntl = None
+
+# Constants
+DIRECTORY_MODE = 0o700
+FILE_MODE = 0o600
+LOCK_POLL_INTERVAL = 0.05
+
+
+def default_directory() -> str:
+    """
+    Return the directory tokens are cached in by default, under the user's cache directory.
+    """
+
+    cache_home = os.environ.get("XDG_CACHE_HOME") or os.path.join(
+        os.path.expanduser("~"), ".cache"
+    )
+
+    return os.path.join(cache_home, "fawlty", "tokens")
+
+
+def cache_key(server_url: str, username: str) -> str:
+    """
+    Return the key a token is cached under.  It is a hash, so file names don't reveal the
+    servers or usernames.
+
+    :param server_url: The API URL of the server the token is for.
+    :param username: The user the token was issued to.
+    """
+    return hashlib.sha256(f"{server_url}\0{username}".encode("utf-8")).hexdigest()
+
+
+class FileLock:
+    """
+    An exclusive lock on a file, held across processes (and threads).  Waiting for it is
+    bounded by any deadline in force.
+    """
+
+    def __init__(self, path: str):
+        """
+        Instance initialization
+
+        :param path: The file to lock, which is created if need be.
+        """
+        self.path = path
+        self._fd = None
+
+    def acquire(self):
+        """
+        Wait for the lock.
+        """
+
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, FILE_MODE)
+        try:
+            if fcntl is not None:
+                self._lock(fd)
+        except BaseException:
+            os.close(fd)
+            raise
+
+        self._fd = fd
+
+    @staticmethod
+    def _lock(fd: int):
+        """
+        Lock an open file, polling for the lock if there's a deadline.
+        """
+
+        left = remaining()
+        if left is None:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            return
+
+        give_up = time.monotonic() + max(left, 0)
+        while True:
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                return
+            except BlockingIOError as err:
+                wait = give_up - time.monotonic()
+                if wait <= 0:
+                    raise SensuTimeoutError(
+                        "Deadline exceeded waiting for the token cache lock"
+                    ) from err
+                time.sleep(min(LOCK_POLL_INTERVAL, wait))
+
+    def release(self):
+        """
+        Release the lock.
+        """
+
+        fd, self._fd = self._fd, None
+        if fd is None:
+            return
+
+        if fcntl is not None:
+            fcntl.flock(fd, fcntl.LOCK_UN)
+        os.close(fd)
+
+    def __enter__(self) -> "FileLock":
+        self.acquire()
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        self.release()
+
+
+class FileTokenCache:
+    """
+    Caches login tokens in files, keyed by server and username.
+    """
+
+    def __init__(self, directory: str = None):
+        """
+        Instance initialization
+
+        :param directory: The directory to keep tokens in (default is fawlty/tokens under
+                          $XDG_CACHE_HOME, or ~/.cache).  It is created if need be, readable
+                          only by the user.
+        """
+        self.directory = directory or default_directory()
+        os.makedirs(self.directory, mode=DIRECTORY_MODE, exist_ok=True)
+        os.chmod(self.directory, DIRECTORY_MODE)
+
+    def path_for(self, server_url: str, username: str) -> str:
+        """
+        Return the file a token is cached in.
+        """
+        return os.path.join(self.directory, cache_key(server_url, username) + ".json")
+
+    def lock(self, server_url: str, username: str) -> FileLock:
+        """
+        Return the lock to hold while logging in, or refreshing a token, so that only one
+        process does so at a time.  Use the result as a context manager.
+        """
+        return FileLock(self.path_for(server_url, username) + ".lock")
+
+    def load(self, server_url: str, username: str) -> Optional[SensuToken]:
+        """
+        Return the cached token, or None if there isn't a usable one.
+
+        :param server_url: The API URL of the server the token is for.
+        :param username: The user the token was issued to.
+        """
+
+        try:
+            with open(self.path_for(server_url, username), "rb") as f:
+                token = SensuToken.model_validate_json(f.read())
+        except (OSError, ValidationError):
+            return None
+
+        return None if token.is_expired() else token
+
+    def store(self, server_url: str, username: str, token: SensuToken):
+        """
+        Cache a token.  The file is replaced in one step, so readers never see half of it.
+
+        :param server_url: The API URL of the server the token is for.
+        :param username: The user the token was issued to.
+        :param token: The token to cache.
+        """
+
+        # mkstemp creates the file readable only by the user
+        fd, temp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(token.model_dump_json())
+            os.replace(temp, self.path_for(server_url, username))
+        except BaseException:
+            os.unlink(temp)
+            raise
+
+    def clear(self, server_url: str, username: str):
+        """
+        Forget the cached token, for example after it has been revoked.
+        """
+
+        try:
+            os.unlink(self.path_for(server_url, username))
+        except FileNotFoundError:
+            pass
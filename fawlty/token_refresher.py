@@ -0,0 +1,110 @@
+"""
+A module providing a background thread which keeps a client's login token fresh.
+"""
+
+# Built in imports
+import threading
+from typing import Callable, Optional
+
+# Our imports
+from fawlty.exceptions import SensuError
+
+# Constants
+DEFAULT_LEAD_TIME = 30
+DEFAULT_RETRY_INTERVAL = 5
+MIN_WAIT = 1
+
+
+class TokenRefresher:
+    """
+    Refreshes a SensuClient's token shortly before it would need refreshing, so that calls
+    on the hot path never have to wait for a refresh round trip.
+    """
+
+    def __init__(
+        self,
+        client,
+        lead_time: float = DEFAULT_LEAD_TIME,
+        retry_interval: float = DEFAULT_RETRY_INTERVAL,
+        on_error: Optional[Callable[[SensuError], None]] = None,
+    ):
+        """
+        Instance initialization
+
+        :param client: The SensuClient whose token should be kept fresh.
+        :param lead_time: How many seconds ahead of the token's refresh threshold to refresh.
+        :param retry_interval: How many seconds to wait before retrying a failed refresh.
+        :param on_error: An optional callable, given any error raised by a refresh.
+        """
+        self.client = client
+        self.lead_time = lead_time
+        self.retry_interval = retry_interval
+        self.on_error = on_error
+        self.last_error = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """
+        Start refreshing in a background (daemon) thread.
+        """
+
+        if self._thread and self._thread.is_alive():
+            return
+
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="fawlty-token-refresher", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self, timeout: Optional[float] = None):
+        """
+        Stop the background thread.
+
+        :param timeout: How many seconds to wait for the thread to finish.
+        """
+
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout)
+
+    @property
+    def running(self) -> bool:
+        """
+        Whether the background thread is running.
+        """
+        return bool(self._thread and self._thread.is_alive())
+
+    def _next_wait(self) -> float:
+        """
+        Return how many seconds to sleep before the next refresh.
+        """
+
+        token = self.client.token
+        if token is None:
+            return self.retry_interval
+
+        # The floor stops a token whose lifetime is shorter than the lead time from being
+        # refreshed in a tight loop
+        return max(token.seconds_until_refresh(self.lead_time), MIN_WAIT)
+
+    def _run(self):
+        """
+        The body of the background thread.
+        """
+
+        while not self._stop.wait(self._next_wait()):
+            token = self.client.token
+            if token is None or token.seconds_until_refresh(self.lead_time) > 0:
+                continue
+
+            try:
+                self.client.single_flight_refresh(stale_token=token)
+                self.last_error = None
+            except SensuError as err:
+                self.last_error = err
+                if self.on_error:
+                    self.on_error(err)
+                if self._stop.wait(self.retry_interval):
+                    break
@@ -0,0 +1,270 @@
+"""
+A module for tracing what the client spends its time on.
+
+A Tracer given to a client records a span around each resource operation, each call to the
+Sensu server, each login and token refresh, and the encoding, decoding and validation of
+bodies.  Spans nest: the current span is held in a context variable, so a span started within
+another (including in the worker threads and tasks the clients start) records it as its
+parent.  Finished spans are handed to an exporter.
+
+A client without a tracer skips all of this: each would-be span costs a single call,
+returning a shared stand in which does nothing.
+"""
+
+# Built in imports
+import contextvars
+import json
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+# Constants
+_CURRENT_SPAN = contextvars.ContextVar("fawlty_span", default=None)
+
+STATUS_OK = "ok"
+STATUS_ERROR = "error"
+
+
+class Span:  # pylint: disable=R0902
+    """
+    A timed operation, with attributes describing it.
+    """
+
+    __slots__ = (
+        "name", "trace_id", "span_id", "parent_id", "attributes", "start_time", "duration",
+        "status", "error", "_started",
+    )
+
+    def __init__(self, name: str, parent: Optional["Span"] = None, attributes: dict = None):
+        """
+        Instance initialization
+
+        :param name: The name of the operation.
+        :param parent: The span this one was started within, if any.
+        :param attributes: Attributes describing the operation.
+        """
+        self.name = name
+        self.trace_id = parent.trace_id if parent else os.urandom(16).hex()
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent.span_id if parent else None
+        self.attributes: Dict[str, Any] = dict(attributes or {})
+        self.start_time = time.time()
+        self.duration = None
+        self.status = STATUS_OK
+        self.error = None
+        self._started = time.perf_counter()
+
+    def set_attribute(self, key: str, value: Any):
+        """
+        Set an attribute on the span.
+        """
+        self.attributes[key] = value
+
+    def finish(self, error: BaseException = None):
+        """
+        Mark the span as finished, and as failed if an error was raised.
+        """
+
+        self.duration = time.perf_counter() - self._started
+        if error is not None:
+            self.status = STATUS_ERROR
+            self.error = f"{type(error).__name__}: {error}"
+
+    def to_dict(self) -> dict:
+        """
+        Return the span as plain data.
+        """
+
+        return {
+            "name": self.name,
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "start_time": self.start_time,
+            "duration": self.duration,
+            "status": self.status,
+            "error": self.error,
+            "attributes": self.attributes,
+        }
+
+
+class _SpanScope:
+    """
+    The context manager returned by Tracer.span.  It makes the span the current one while
+    the block runs, and finishes and exports it afterwards.
+    """
+
+    __slots__ = ("tracer", "span", "token")
+
+    def __init__(self, tracer: "Tracer", span: Span):
+        self.tracer = tracer
+        self.span = span
+        self.token = None
+
+    def __enter__(self) -> Span:
+        self.token = _CURRENT_SPAN.set(self.span)
+        return self.span
+
+    def __exit__(self, exc_type, exc, traceback):
+        _CURRENT_SPAN.reset(self.token)
+        self.span.finish(exc)
+        self.tracer.exporter.export(self.span)
+
+
+class _NoSpan:
+    """
+    A stand in for a span, used when no tracer is installed.  It does nothing.
+    """
+
+    __slots__ = ()
+
+    def __enter__(self) -> "_NoSpan":
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        return None
+
+    def set_attribute(self, key: str, value: Any):
+        """
+        Ignore an attribute.
+        """
+
+
+NO_SPAN = _NoSpan()
+
+
+class SpanExporter:
+    """
+    The base class for exporters, which are handed each span as it finishes.
+    """
+
+    def export(self, span: Span):
+        """
+        Export a finished span.  Exporters are called from whichever thread finished the
+        span, so must be thread safe.
+        """
+        raise NotImplementedError
+
+    def close(self):
+        """
+        Release any resources held by the exporter.
+        """
+
+
+class InMemoryExporter(SpanExporter):
+    """
+    Keeps finished spans in a list, mainly for tests and interactive use.
+    """
+
+    def __init__(self):
+        """
+        Instance initialization
+        """
+        self._lock = threading.Lock()
+        self._spans: List[Span] = []
+
+    def export(self, span: Span):
+        """
+        Keep a finished span.
+        """
+        with self._lock:
+            self._spans.append(span)
+
+    @property
+    def spans(self) -> List[Span]:
+        """
+        The spans finished so far, in the order they finished.
+        """
+        with self._lock:
+            return list(self._spans)
+
+    def clear(self):
+        """
+        Discard the spans kept so far.
+        """
+        with self._lock:
+            self._spans.clear()
+
+
+class JSONLinesExporter(SpanExporter):
+    """
+    Appends each finished span to a file, as a line of JSON.
+    """
+
+    def __init__(self, path: str):
+        """
+        Instance initialization
+
+        :param path: The file to append to.
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self._file = open(path, "a", encoding="utf-8")  # pylint: disable=R1732
+
+    def export(self, span: Span):
+        """
+        Write a finished span to the file.
+        """
+
+        line = json.dumps(span.to_dict(), default=str)
+        with self._lock:
+            self._file.write(line + "\n")
+            self._file.flush()
+
+    def close(self):
+        """
+        Close the file.
+        """
+        with self._lock:
+            self._file.close()
+
+
+class Tracer:  # pylint: disable=R0903
+    """
+    Starts spans and hands them to an exporter as they finish.
+    """
+
+    def __init__(self, exporter: SpanExporter = None):
+        """
+        Instance initialization
+
+        :param exporter: The exporter for finished spans (default is an InMemoryExporter).
+        """
+        self.exporter = exporter or InMemoryExporter()
+
+    def span(self, operation: str, /, **attributes) -> _SpanScope:
+        """
+        Start a span, as a child of the current one.  Use the result as a context manager,
+        which yields the span.
+
+        :param operation: The name of the operation (and so of the span).
+        :param attributes: Attributes describing the operation.
+        """
+        return _SpanScope(
+            self, Span(operation, parent=_CURRENT_SPAN.get(), attributes=attributes)
+        )
+
+
+def current_span() -> Optional[Span]:
+    """
+    Return the span currently in progress, if any.
+    """
+    return _CURRENT_SPAN.get()
+
+
+def start_span(tracer: Optional[Tracer], operation: str, /, **attributes):
+    """
+    Start a span with a tracer, if there is one.  This is how the client code starts spans,
+    so that it needn't check whether tracing is enabled.
+
+    :param tracer: The Tracer, or None.
+    :param operation: The name of the operation (and so of the span).
+    :param attributes: Attributes describing the operation.
+    :return: A context manager yielding the span, or a stand in if there's no tracer.
+    """
+
+    if tracer is None:
+        return NO_SPAN
+
+    return tracer.span(operation, **attributes)
@@ -0,0 +1,69 @@
+"""
+Test cases for the APIKey resource.
+"""
+
+# Built in imports
+
+# 3rd party imports
+import pytest
+from pydantic import ValidationError
+
+# Our imports
+from fawlty.resources.base import ResourceBase
+from fawlty.resources.apikey import APIKey, APIKeyMetadata
+from fawlty.exceptions import SensuResourceError
+
+@pytest.fixture
+def apikey():
+    return APIKey(username="basil")
+
+class TestAPIKeyInitialization:
+    def test_apikey_initialization(self, apikey):
+        assert apikey.username == "basil"
+        assert apikey.key is None
+        assert apikey.created_at is None
+        assert isinstance(apikey, ResourceBase)
+
+    def test_apikey_initialization_without_username(self):
+        with pytest.raises(ValidationError):
+            APIKey()
+
+    def test_apikey_metadata_not_shared(self):
+        APIKey(username="basil").metadata.name = "key"
+        assert APIKey(username="sybil").metadata.name is None
+
+    def test_apikey_from_response(self):
+        data = {
+            "metadata": {"name": "83abef1e-e7d7-4beb-91fc-79ad90084d5b", "created_by": "admin"},
+            "username": "admin",
+            "created_at": 1570744117,
+        }
+        apikey = APIKey.model_validate(data)
+        assert apikey.key == "83abef1e-e7d7-4beb-91fc-79ad90084d5b"
+        assert isinstance(apikey.metadata, APIKeyMetadata)
+
+class TestAPIKeyMethods:
+    def test_apikey_get_url(self):
+        assert APIKey.get_url() == "/api/core/v2/apikeys"
+        assert APIKey.get_url(name="abc") == "/api/core/v2/apikeys/abc"
+
+    def test_apikey_urlify_create(self, apikey):
+        assert apikey.urlify(purpose="create") == "/api/core/v2/apikeys"
+
+    def test_apikey_urlify_non_create(self, apikey):
+        apikey.metadata.name = "abc"
+        assert apikey.urlify() == "/api/core/v2/apikeys/abc"
+
+    def test_apikey_urlify_without_name(self, apikey):
+        with pytest.raises(SensuResourceError):
+            apikey.urlify()
+        with pytest.raises(SensuResourceError):
+            apikey.urlify(purpose="delete")
+
+    def test_apikey_created(self, apikey):
+        apikey.created("/api/core/v2/apikeys/83abef1e-e7d7-4beb-91fc-79ad90084d5b")
+        assert apikey.key == "83abef1e-e7d7-4beb-91fc-79ad90084d5b"
+
+    def test_apikey_created_without_location(self, apikey):
+        apikey.created(None)
+        assert apikey.key is None
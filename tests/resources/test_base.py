@@ -3,6 +3,9 @@ Test cases for the base resource class.
 """
 
 # Built in imports
+import asyncio
+import threading
+import time
 from typing import ClassVar
 
 # 3rd party imports
@@ -13,11 +16,25 @@ from pydantic import BaseModel
 from fawlty.resources.base import ResourceBase, MetadataWithoutNamespace, MetadataWithNamespace
 from fawlty.exceptions import SensuClientError
 from fawlty.sensu_client import SensuClient
+from fawlty.selectors import LabelSelector
+from fawlty.resources.namespace import Namespace
 
 class MockSensuClient:
-    def resource_get(self, cls, get_url):
+    def resource_get(self, cls, get_url, **kwargs):
+        self.get_url = get_url
+        self.get_kwargs = kwargs
         return [cls()]
 
+    def resource_stream(self, cls, get_url, **kwargs):
+        self.stream_url = get_url
+        self.stream_kwargs = kwargs
+        yield cls()
+
+    def resource_iter(self, cls, get_url, **kwargs):
+        self.iter_url = get_url
+        self.iter_kwargs = kwargs
+        yield cls()
+
     def resource_post(self, obj):
         return True
 
@@ -40,12 +57,12 @@ class MockResourceWithNamespace(ResourceBase):
     BASE_URL: ClassVar[str] = "http://example.com/{namespace}/resource"
 
     @classmethod
-    def get_url(cls, namespace: str, name: str = None) -> str:
+    def get_url(cls, namespace: str, name: str = None, params: dict = None) -> str:
         """
         Use the namespaced version of the class method.
         """
         
-        return cls.get_url_with_namespace(namespace=namespace, name=name)
+        return cls.get_url_with_namespace(namespace=namespace, name=name, params=params)
 
     def urlify(self, purpose: str = None) -> str:
         """
@@ -114,6 +131,23 @@ class TestResourceWithNamespace:
         url = MockResourceWithNamespace.get_url_with_namespace(namespace="default", name="test")
         assert url == "http://example.com/default/resource/test"
 
+    def test_get_url_with_params(self):
+        url = MockResourceWithNamespace.get_url_with_namespace(
+            namespace="default", params={"labelSelector": "region == us-west-1"}
+        )
+        assert url == "http://example.com/default/resource?labelSelector=region%20%3D%3D%20us-west-1"
+
+    def test_get_with_selectors(self, mock_client):
+        MockResourceWithNamespace.get(
+            client=mock_client, namespace="default",
+            label_selector=LabelSelector().eq("region", "us-west-1"),
+            field_selector="entity.entity_class == proxy",
+        )
+        assert mock_client.get_url == (
+            "http://example.com/default/resource?labelSelector=region%20%3D%3D%20us-west-1"
+            "&fieldSelector=entity.entity_class%20%3D%3D%20proxy"
+        )
+
     def test_get_with_namespace(self, mock_client):
         resources = MockResourceWithNamespace.get(client=mock_client, namespace="default", name="test")
         assert len(resources) == 1
@@ -129,6 +163,138 @@ class TestResourceWithoutNamespace:
         assert len(resources) == 1
         assert isinstance(resources[0], MockResourceWithoutNamespace)
 
+    def test_get_paged(self, mock_client):
+        MockResourceWithoutNamespace.get(client=mock_client, page_size=10)
+        assert mock_client.get_kwargs == {"page_size": 10}
+
+    def test_get_lazy(self, mock_client):
+        MockResourceWithoutNamespace.get(client=mock_client, lazy=True)
+        assert mock_client.get_kwargs == {"lazy": True}
+
+    def test_iter_get(self, mock_client):
+        resources = list(MockResourceWithoutNamespace.iter_get(client=mock_client, page_size=10))
+        assert len(resources) == 1
+        assert mock_client.iter_url == "http://example.com/resource"
+        assert mock_client.iter_kwargs["page_size"] == 10
+
+    def test_stream_get(self, mock_client):
+        resources = list(MockResourceWithoutNamespace.stream_get(client=mock_client, spool_threshold=10))
+        assert len(resources) == 1
+        assert mock_client.stream_url == "http://example.com/resource"
+        assert mock_client.stream_kwargs["spool_threshold"] == 10
+
+class Thing(ResourceBase):
+    name: str
+
+    BASE_URL: ClassVar[str] = "/api/core/v2/namespaces/{namespace}/things"
+
+    @classmethod
+    def get_url(cls, *args, **kwargs) -> str:
+        return cls.get_url_with_namespace(*args, **kwargs)
+
+
+class UnscopedThing(Thing):
+    ALL_NAMESPACES_URL: ClassVar[str] = "/api/core/v2/things"
+
+
+class FanOutClient:
+    """
+    Answers namespace listings, and a couple of things in each namespace, slowly enough to
+    overlap.
+    """
+
+    def __init__(self, namespaces=("a", "b", "c", "d", "e")):
+        self.namespaces = namespaces
+        self.urls = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.lock = threading.Lock()
+
+    def _things(self, cls, get_url):
+        self.urls.append(get_url)
+        if get_url == Namespace.get_url():
+            return [Namespace(name=_) for _ in self.namespaces]
+        if get_url.startswith(UnscopedThing.ALL_NAMESPACES_URL):
+            return [cls(name=f"{ns}-0") for ns in self.namespaces]
+        ns = get_url.split("/")[5]
+        return [cls(name=f"{ns}-{i}") for i in range(2)]
+
+    def resource_get(self, cls, get_url, **kwargs):
+        with self.lock:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            time.sleep(0.01)
+            return self._things(cls, get_url)
+        finally:
+            with self.lock:
+                self.in_flight -= 1
+
+    def resource_iter(self, cls, get_url, **kwargs):
+        yield from self.resource_get(cls, get_url)
+
+
+class AsyncFanOutClient(FanOutClient):
+
+    async def resource_get(self, cls, get_url, **kwargs):
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(0.01)
+            return self._things(cls, get_url)
+        finally:
+            self.in_flight -= 1
+
+
+class TestAllNamespaces:
+    def test_unscoped_url(self):
+        client = FanOutClient()
+        things = UnscopedThing.get(client, all_namespaces=True, label_selector="x == y")
+        assert len(things) == 5
+        assert client.urls == ["/api/core/v2/things?labelSelector=x%20%3D%3D%20y"]
+
+    def test_fan_out(self):
+        client = FanOutClient()
+        things = Thing.get(client, all_namespaces=True, concurrency=2)
+        assert [_.name for _ in things] == [f"{ns}-{i}" for ns in "abcde" for i in range(2)]
+        assert client.urls[0] == "/api/core/v2/namespaces"
+        assert len(client.urls) == 6
+        assert client.max_in_flight == 2
+
+    def test_fan_out_iter(self):
+        client = FanOutClient()
+        things = list(Thing.iter_get(client, all_namespaces=True, concurrency=3))
+        assert sorted(_.name for _ in things) == [f"{ns}-{i}" for ns in "abcde" for i in range(2)]
+        assert client.max_in_flight == 3
+
+    def test_unscoped_iter(self):
+        client = FanOutClient()
+        things = list(UnscopedThing.iter_get(client, all_namespaces=True))
+        assert len(things) == 5
+        assert client.urls == ["/api/core/v2/things"]
+
+    def test_async_fan_out(self):
+        client = AsyncFanOutClient()
+        things = asyncio.run(Thing.aget(client, all_namespaces=True, concurrency=2))
+        assert [_.name for _ in things] == [f"{ns}-{i}" for ns in "abcde" for i in range(2)]
+        assert client.max_in_flight == 2
+
+    def test_async_unscoped_url(self):
+        client = AsyncFanOutClient()
+        things = asyncio.run(UnscopedThing.aget(client, all_namespaces=True))
+        assert len(things) == 5
+        assert client.urls == ["/api/core/v2/things"]
+
+    def test_with_namespace(self):
+        with pytest.raises(ValueError):
+            Thing.get(FanOutClient(), namespace="a", all_namespaces=True)
+
+    def test_not_namespaced(self):
+        client = FanOutClient()
+        Namespace.get(client, all_namespaces=True)
+        assert client.urls == ["/api/core/v2/namespaces"]
+
+
 class TestMetadataWithoutNamespace:
     def test_metadata_without_namespace(self):
         metadata = MetadataWithoutNamespace(name="test")
@@ -0,0 +1,72 @@
+"""
+Test cases for the lazy loading of the resource modules.
+"""
+
+# Built in imports
+import os
+import subprocess
+import sys
+
+# 3rd party imports
+import pytest
+
+# Our imports
+import fawlty.resources
+from fawlty.resources import RESOURCE_MODULES
+
+
+def run_python(code: str) -> str:
+    """
+    Run some code in a fresh interpreter, returning what it prints.
+    """
+    return subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    ).stdout.strip()
+
+
+class TestResourceRegistry:
+    def test_lists_every_module(self):
+        directory = os.path.dirname(fawlty.resources.__file__)
+        modules = {
+            os.path.splitext(_)[0] for _ in os.listdir(directory)
+            if _.endswith(".py") and _ not in ("__init__.py", "base.py")
+        }
+        assert set(RESOURCE_MODULES) == modules
+
+    def test_attribute_imports_module(self):
+        module = fawlty.resources.silence
+        assert module.__name__ == "fawlty.resources.silence"
+        assert fawlty.resources.silence is module
+
+    def test_unknown_attribute(self):
+        with pytest.raises(AttributeError, match="no attribute 'nothing'"):
+            fawlty.resources.nothing  # pylint: disable=W0104
+
+    def test_dir_lists_modules(self):
+        assert set(RESOURCE_MODULES) <= set(dir(fawlty.resources))
+
+
+class TestLazyImport:
+    def test_package_imports_nothing(self):
+        out = run_python(
+            "import sys, fawlty.resources\n"
+            "print(sorted(_ for _ in sys.modules if _.startswith('fawlty.resources.')))"
+        )
+        assert out == "[]"
+
+    def test_only_used_module_imported(self):
+        out = run_python(
+            "import sys\n"
+            "from fawlty.resources.silence import Silence\n"
+            "print('fawlty.resources.check' in sys.modules, 'bcrypt' in sys.modules,"
+            " Silence.__pydantic_complete__)"
+        )
+        assert out == "False False False"
+
+    def test_model_built_on_first_use(self):
+        out = run_python(
+            "from fawlty.resources.silence import Silence\n"
+            "s = Silence.model_validate({'check': 'check-cpu', 'metadata': {'name': 'x', 'namespace': 'default'}})\n"
+            "print(s.check, Silence.__pydantic_complete__)"
+        )
+        assert out == "check-cpu True"
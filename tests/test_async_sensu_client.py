@@ -0,0 +1,483 @@
+"""
+Tests for the fawlty.async_sensu_client module
+"""
+import asyncio
+import gzip
+import json
+import time
+from typing import ClassVar
+from unittest.mock import patch
+
+import pytest
+
+httpx = pytest.importorskip("httpx")
+
+from fawlty.async_sensu_client import AsyncSensuClient, BlockingSensuClient
+from fawlty.resources.base import ResourceBase
+from fawlty.sensu_server import SensuServer
+from fawlty.sensu_token import SensuToken
+from fawlty.retry import RetryPolicy
+from fawlty.selectors import LabelSelector
+from fawlty.exceptions import SensuAuthError, SensuError, SensuTimeoutError
+from fawlty.deadline import deadline
+from fawlty.metrics import ClientMetrics
+from fawlty.tracing import Tracer
+from fawlty.ratelimit import RateLimiter, AIMDLimiter
+from fawlty.token_cache import FileTokenCache
+from fawlty.lazy import LazyResource
+
+
+class Thing(ResourceBase):
+    name: str
+
+    BASE_URL: ClassVar[str] = "/things"
+
+    @classmethod
+    def get_url(cls, *args, **kwargs) -> str:
+        return cls.get_url_without_namespace(*args, **kwargs)
+
+    def urlify(self, purpose: str = None) -> str:
+        return self.BASE_URL if purpose == "create" else f"{self.BASE_URL}/{self.name}"
+
+
+class FakeBackend:
+    """
+    A tiny in-memory stand in for the Sensu API
+    """
+
+    def __init__(self, things=3):
+        self.things = [{"name": f"thing{i}"} for i in range(things)]
+        self.requests = []
+
+    def __call__(self, request):
+        self.requests.append(request)
+        path = request.url.path
+        if path == "/auth":
+            return httpx.Response(200, json=self._token("token"))
+        if path == "/auth/token":
+            return httpx.Response(200, json=self._token("refreshed"))
+        if path == "/things" and request.method == "GET":
+            limit = request.url.params.get("limit")
+            if limit is None:
+                return httpx.Response(200, json=self.things)
+            start = int(request.url.params.get("continue", 0))
+            end = start + int(limit)
+            headers = {"Sensu-Continue": str(end)} if end < len(self.things) else {}
+            return httpx.Response(200, json=self.things[start:end], headers=headers)
+        if path == "/things" and request.method == "POST":
+            content = request.content
+            if request.headers.get("Content-Encoding") == "gzip":
+                content = gzip.decompress(content)
+            self.things.append(json.loads(content))
+            return httpx.Response(201)
+        if path.startswith("/things/"):
+            return httpx.Response(204)
+        return httpx.Response(404, text="Not Found")
+
+    @staticmethod
+    def _token(access):
+        return {"access_token": access, "refresh_token": "refresh", "expires_at": int(time.time()) + 600}
+
+
+def make_client(backend):
+    return AsyncSensuClient(
+        server=SensuServer(host="localhost"), transport=httpx.MockTransport(backend)
+    )
+
+
+class TestAsyncSensuClient:
+
+    def test_login_and_get(self):
+        backend = FakeBackend()
+
+        async def run():
+            async with make_client(backend) as client:
+                await client.login("user", "pass")
+                return client, await Thing.aget(client)
+
+        client, things = asyncio.run(run())
+        assert [_.name for _ in things] == ["thing0", "thing1", "thing2"]
+        assert things[0]._sensu_client is client
+        assert backend.requests[-1].headers["Authorization"] == "Bearer token"
+
+    @pytest.mark.parametrize("server_options, client_options, expected", [
+        ({}, {}, None),
+        ({}, {"timeout": 7}, 7),
+        ({"connect_timeout": 1.5, "read_timeout": 10}, {}, (1.5, 10)),
+    ])
+    def test_timeout(self, server_options, client_options, expected):
+        backend = FakeBackend()
+
+        async def run():
+            server = SensuServer(host="localhost", **server_options)
+            async with AsyncSensuClient(
+                server=server, transport=httpx.MockTransport(backend), **client_options
+            ) as client:
+                await client.login("user", "pass")
+                await Thing.aget(client)
+                return client
+
+        client = asyncio.run(run())
+        timeout = expected if isinstance(expected, tuple) else (expected, expected)
+        assert (client.session.timeout.connect, client.session.timeout.read) == timeout
+        for request in backend.requests:
+            sent = request.extensions["timeout"]
+            assert (sent["connect"], sent["read"]) == timeout
+
+    def test_login_failure(self):
+        async def run():
+            async with make_client(lambda request: httpx.Response(401)) as client:
+                await client.login("user", "pass")
+
+        with pytest.raises(SensuAuthError):
+            asyncio.run(run())
+
+    def test_refresh(self):
+        backend = FakeBackend()
+
+        async def run():
+            async with make_client(backend) as client:
+                client.token = SensuToken(access_token="old", refresh_token="r", expires_at=int(time.time()) + 10)
+                await Thing.aget(client)
+                return client
+
+        client = asyncio.run(run())
+        assert client.token.access_token == "refreshed"
+        assert backend.requests[-1].headers["Authorization"] == "Bearer refreshed"
+
+    def test_token_cache(self, tmp_path):
+        backend = FakeBackend()
+        cache = FileTokenCache(str(tmp_path))
+
+        async def run():
+            server = SensuServer(host="localhost")
+            async with AsyncSensuClient(
+                server=server, transport=httpx.MockTransport(backend), token_cache=cache
+            ) as client:
+                await client.login("user", "pass")
+            async with AsyncSensuClient(
+                server=server, transport=httpx.MockTransport(backend), token_cache=cache
+            ) as client:
+                await client.login("user", "pass")
+                assert [_.url.path for _ in backend.requests] == ["/auth"]
+                # Another process refreshed the token
+                client.token = SensuToken(access_token="old", refresh_token="r", expires_at=int(time.time()) + 10)
+                await client.refresh_token()
+                assert client.token.access_token == "token"
+                # Nobody else has
+                client.token = SensuToken(access_token="old", refresh_token="r", expires_at=int(time.time()) + 10)
+                cache.clear(server.api_url, "user")
+                await client.refresh_token()
+                return client
+
+        client = asyncio.run(run())
+        assert [_.url.path for _ in backend.requests] == ["/auth", "/auth/token"]
+        assert cache.load(client.server.api_url, "user").access_token == "refreshed"
+
+    def test_api_key(self):
+        backend = FakeBackend()
+
+        async def run():
+            async with AsyncSensuClient(
+                server=SensuServer(host="localhost"), transport=httpx.MockTransport(backend),
+                api_key="abc",
+            ) as client:
+                return await Thing.aget(client)
+
+        assert len(asyncio.run(run())) == 3
+        assert [_.url.path for _ in backend.requests] == ["/things"]
+        assert backend.requests[0].headers["Authorization"] == "Key abc"
+
+    def test_single_flight_refresh(self):
+        backend = FakeBackend()
+
+        async def run():
+            async with make_client(backend) as client:
+                client.token = SensuToken(access_token="old", refresh_token="r", expires_at=int(time.time()) + 10)
+                await asyncio.gather(*(Thing.aget(client) for _ in range(20)))
+
+        asyncio.run(run())
+        assert len([_ for _ in backend.requests if _.url.path == "/auth/token"]) == 1
+
+    def test_token_refresher(self):
+        backend = FakeBackend()
+
+        async def run():
+            async with make_client(backend) as client:
+                client.token = SensuToken(access_token="old", refresh_token="r", expires_at=int(time.time()) + 80)
+                task = client.start_token_refresher(lead_time=30)
+                for _ in range(100):
+                    if client.token.access_token != "old":
+                        break
+                    await asyncio.sleep(0.01)
+                await client.stop_token_refresher()
+                assert task.cancelled()
+                return client.token
+
+        with patch("fawlty.async_sensu_client.MIN_WAIT", 0.01):
+            assert asyncio.run(run()).access_token == "refreshed"
+
+    def test_get_failure(self):
+        async def run():
+            async with make_client(FakeBackend()) as client:
+                await client.login("user", "pass")
+                await client.resource_get(Thing, "/missing")
+
+        with pytest.raises(SensuError):
+            asyncio.run(run())
+
+    def test_retry(self):
+        backend = FakeBackend()
+        responses = iter([httpx.Response(503), httpx.Response(502)])
+
+        def flaky(request):
+            if request.url.path == "/things":
+                return next(responses, None) or backend(request)
+            return backend(request)
+
+        policy = RetryPolicy(max_attempts=3, backoff_factor=0)
+
+        async def run():
+            async with AsyncSensuClient(
+                server=SensuServer(host="localhost"), transport=httpx.MockTransport(flaky),
+                retry_policy=policy,
+            ) as client:
+                await client.login("user", "pass")
+                return await Thing.aget(client)
+
+        assert len(asyncio.run(run())) == 3
+        assert policy.stats()["retries"] == 2
+
+    @pytest.mark.parametrize("prefetch", [True, False])
+    def test_aiter_pages(self, prefetch):
+        backend = FakeBackend(things=5)
+
+        async def run():
+            async with make_client(backend) as client:
+                await client.login("user", "pass")
+                return [_.name async for _ in Thing.aiter(client, page_size=2, prefetch=prefetch)]
+
+        assert asyncio.run(run()) == [f"thing{i}" for i in range(5)]
+        assert len([_ for _ in backend.requests if _.url.path == "/things"]) == 3
+
+    def test_concurrent_writes(self):
+        backend = FakeBackend(things=0)
+
+        async def run():
+            async with make_client(backend) as client:
+                await client.login("user", "pass")
+                things = [Thing(name=f"new{i}") for i in range(50)]
+                for thing in things:
+                    thing.set_client(client)
+                results = await asyncio.gather(*(_.acreate() for _ in things))
+                await things[0].aupdate()
+                await things[0].adelete()
+                return results
+
+        assert all(asyncio.run(run()))
+        assert len(backend.things) == 50
+
+    def test_selectors_with_pages(self):
+        backend = FakeBackend(things=5)
+
+        async def run():
+            async with make_client(backend) as client:
+                await client.login("user", "pass")
+                return [_ async for _ in Thing.aiter(client, page_size=2, label_selector=LabelSelector().eq("a", "b"))]
+
+        assert len(asyncio.run(run())) == 5
+        for request in backend.requests[1:]:
+            assert request.url.params["labelSelector"] == "a == b"
+            assert request.url.params["limit"] == "2"
+
+    def test_deadline(self):
+        async def slow(request):
+            await asyncio.sleep(1)
+            return httpx.Response(200, json=[])
+
+        async def run():
+            async with make_client(FakeBackend()) as client:
+                await client.login("user", "pass")
+                client.session._transport = httpx.MockTransport(slow)
+                with deadline(0.05):
+                    await Thing.aget(client)
+
+        start = time.monotonic()
+        with pytest.raises(SensuTimeoutError):
+            asyncio.run(run())
+        assert time.monotonic() - start < 0.5
+
+    def test_metrics(self):
+        backend = FakeBackend()
+
+        async def run():
+            async with make_client(backend) as client:
+                client.metrics = ClientMetrics()
+                await client.login("user", "pass")
+                await Thing.aget(client)
+                await client.resource_post(Thing(name="new"))
+                return client.metrics.snapshot()
+
+        snapshot = asyncio.run(run())
+        assert [(_["method"], _["endpoint"], _["resource"]) for _ in snapshot["calls"]] == [
+            ("GET", "/things", "Thing"), ("POST", "/things", "Thing")
+        ]
+        assert snapshot["calls"][1]["bytes_out"] == len(b'{"name":"new"}')
+        assert snapshot["validate"]["Thing"]["count"] == 1
+
+    def test_tracing(self):
+        tracer = Tracer()
+
+        async def run():
+            async with make_client(FakeBackend()) as client:
+                client.tracer = tracer
+                await client.login("user", "pass")
+                await Thing.aget(client)
+
+        asyncio.run(run())
+        spans = {_.name: _ for _ in tracer.exporter.spans}
+        assert set(spans) == {
+            "fawlty.login", "fawlty.get", "fawlty.call", "fawlty.attempt", "fawlty.decode",
+            "fawlty.validate",
+        }
+        assert spans["fawlty.call"].parent_id == spans["fawlty.get"].span_id
+        assert spans["fawlty.get"].attributes["count"] == 3
+
+    def test_coalescing(self):
+        backend = FakeBackend()
+
+        async def slow(request):
+            await asyncio.sleep(0.05)
+            return backend(request)
+
+        async def run():
+            async with make_client(slow) as client:
+                await client.login("user", "pass")
+                return await asyncio.gather(*(Thing.aget(client) for _ in range(4)))
+
+        results = asyncio.run(run())
+        assert [len(_) for _ in results] == [3] * 4
+        assert len({id(_[0]) for _ in results}) == 4
+        assert [_.url.path for _ in backend.requests] == ["/auth", "/things"]
+
+    def test_coalescing_lazy(self):
+        backend = FakeBackend()
+
+        async def slow(request):
+            await asyncio.sleep(0.05)
+            return backend(request)
+
+        async def run():
+            async with make_client(slow) as client:
+                await client.login("user", "pass")
+                return await asyncio.gather(
+                    *(client.resource_get(Thing, "/things", lazy=True) for _ in range(3))
+                )
+
+        models = [_[0].materialize() for _ in asyncio.run(run())]
+        models[0].name = "changed"
+        assert [_.name for _ in models[1:]] == ["thing0", "thing0"]
+        assert [_.url.path for _ in backend.requests] == ["/auth", "/things"]
+
+    def test_concurrency_limited(self):
+        backend = FakeBackend()
+        in_flight = [0, 0]
+
+        async def slow(request):
+            in_flight[0] += 1
+            in_flight[1] = max(in_flight)
+            await asyncio.sleep(0.01)
+            in_flight[0] -= 1
+            return backend(request)
+
+        async def run():
+            async with make_client(slow) as client:
+                client.concurrency_limiter = AIMDLimiter(initial_limit=3, max_limit=3)
+                client.rate_limiter = RateLimiter(rate=1000)
+                await client.login("user", "pass")
+                things = [Thing(name=f"t{i}") for i in range(12)]
+                for thing in things:
+                    thing.set_client(client)
+                await asyncio.gather(*(_.adelete() for _ in things))
+                return client.concurrency_limiter.stats()
+
+        stats = asyncio.run(run())
+        assert in_flight[1] == 3
+        assert stats["in_flight"] == 0
+
+    def test_compression(self):
+        backend = FakeBackend(things=0)
+
+        async def run():
+            server = SensuServer(host="localhost", compress_requests_over=10)
+            transport = httpx.MockTransport(backend)
+            async with AsyncSensuClient(server=server, transport=transport) as client:
+                await client.login("user", "pass")
+                thing = Thing(name="x" * 100)
+                thing.set_client(client)
+                await thing.acreate()
+
+        asyncio.run(run())
+        assert backend.requests[-1].headers["Content-Encoding"] == "gzip"
+        assert backend.requests[-1].headers["Accept-Encoding"] == "gzip, deflate"
+        assert backend.things == [{"name": "x" * 100}]
+
+
+class TestBlockingSensuClient:
+
+    def test_tracing_crosses_threads(self):
+        tracer = Tracer()
+        with BlockingSensuClient(
+            server=SensuServer(host="localhost"), transport=httpx.MockTransport(FakeBackend()),
+            tracer=tracer,
+        ) as client:
+            client.login("user", "pass")
+            with tracer.span("job") as job:
+                Thing.get(client)
+
+        spans = {_.name: _ for _ in tracer.exporter.spans}
+        assert spans["fawlty.get"].parent_id == job.span_id
+        assert spans["fawlty.call"].parent_id == spans["fawlty.get"].span_id
+
+    def test_deadline_crosses_threads(self):
+        backend = FakeBackend()
+        with BlockingSensuClient(
+            server=SensuServer(host="localhost"), transport=httpx.MockTransport(backend)
+        ) as client:
+            client.login("user", "pass")
+            with deadline(0):
+                with pytest.raises(SensuTimeoutError):
+                    Thing.get(client)
+
+    def test_sync_facade(self):
+        backend = FakeBackend(things=5)
+
+        with BlockingSensuClient(
+            server=SensuServer(host="localhost"), transport=httpx.MockTransport(backend)
+        ) as client:
+            assert client.login("user", "pass") is True
+            assert client.token.access_token == "token"
+
+            things = Thing.get(client)
+            assert len(things) == 5
+            assert things[0]._sensu_client is client
+            assert things[0].delete() is True
+
+            assert len(list(Thing.iter_get(client, page_size=2))) == 5
+
+            new = Thing(name="new")
+            new.set_client(client)
+            assert new.create() is True
+            assert new.update() is True
+
+    def test_lazy(self):
+        with BlockingSensuClient(
+            server=SensuServer(host="localhost"), transport=httpx.MockTransport(FakeBackend())
+        ) as client:
+            client.login("user", "pass")
+            for things in (Thing.get(client, lazy=True), Thing.get(client, page_size=2, lazy=True)):
+                assert [_.name for _ in things] == ["thing0", "thing1", "thing2"]
+                assert isinstance(things[0], LazyResource)
+                thing = things[0].materialize()
+                assert thing._sensu_client is client
+                assert thing.delete() is True
@@ -0,0 +1,78 @@
+"""
+Tests for the fawlty.balancer module
+"""
+from unittest.mock import patch
+
+import pytest
+
+from fawlty.balancer import Balancer
+from fawlty.sensu_server import SensuServer
+
+
+@pytest.fixture
+def servers():
+    return [SensuServer(host=f"backend{i}") for i in range(3)]
+
+
+class TestBalancer:
+
+    def test_unknown_strategy(self, servers):
+        with pytest.raises(ValueError):
+            Balancer(servers, "random")
+
+    def test_least_outstanding(self, servers):
+        balancer = Balancer(servers)
+        picked = [balancer.pick() for _ in range(3)]
+        assert len(set(picked)) == 3
+        balancer.finish(picked[1], 0.1, ok=True)
+        assert balancer.pick() is picked[1]
+
+    def test_latency(self, servers):
+        balancer = Balancer(servers, "latency")
+        for backend, latency in zip(balancer.backends, (0.5, 0.1, 0.25)):
+            balancer.pick(exclude=[_ for _ in balancer.backends if _ is not backend])
+            balancer.finish(backend, latency, ok=True)
+        assert balancer.pick() is balancer.backends[1]
+        assert balancer.pick() is balancer.backends[1]
+        assert balancer.pick() is balancer.backends[2]
+
+    def test_latency_ewma(self, servers):
+        balancer = Balancer(servers[:1])
+        backend = balancer.pick()
+        balancer.finish(backend, 1.0, ok=True)
+        balancer.pick()
+        balancer.finish(backend, 0.0, ok=True)
+        assert backend.latency == pytest.approx(0.7)
+
+    def test_ejection(self, servers):
+        balancer = Balancer(servers[:2], failure_threshold=2, eject_seconds=30)
+        bad = balancer.backends[0]
+        for _ in range(2):
+            balancer.pick(exclude=[balancer.backends[1]])
+            balancer.finish(bad, 0.1, ok=False)
+        assert not balancer.stats()[0]["available"]
+        assert all(balancer.pick() is balancer.backends[1] for _ in range(5))
+
+        with patch("fawlty.balancer.time.monotonic", return_value=bad.ejected_until + 1):
+            assert bad.available(bad.ejected_until + 1)
+
+    def test_success_resets_failures(self, servers):
+        balancer = Balancer(servers[:1], failure_threshold=2)
+        backend = balancer.backends[0]
+        for ok in (False, True, False):
+            balancer.pick()
+            balancer.finish(backend, 0.1, ok=ok)
+        assert backend.available(0)
+
+    def test_health(self, servers):
+        balancer = Balancer(servers[:2])
+        balancer.mark_health(balancer.backends[0], False)
+        assert all(balancer.pick() is balancer.backends[1] for _ in range(3))
+        balancer.mark_health(balancer.backends[0], True)
+        assert balancer.pick() is balancer.backends[0]
+
+    def test_all_out(self, servers):
+        balancer = Balancer(servers[:1])
+        balancer.mark_health(balancer.backends[0], False)
+        assert balancer.pick() is balancer.backends[0]
+        assert balancer.pick(exclude=balancer.backends) is None
@@ -0,0 +1,110 @@
+"""
+Tests for the fawlty.bulk module
+"""
+import threading
+import time
+
+import pytest
+
+from fawlty.bulk import bulk_apply, BulkProgress
+from fawlty.exceptions import SensuResourceError
+
+
+class FakeClient:
+    def __init__(self, fail=(), delay=0.0):
+        self.fail = set(fail)
+        self.delay = delay
+        self.calls = []
+        self.lock = threading.Lock()
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    def _call(self, op, obj):
+        with self.lock:
+            self.calls.append((op, obj))
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            time.sleep(self.delay)
+            if obj in self.fail:
+                raise SensuResourceError(f"failed {obj}")
+            return True
+        finally:
+            with self.lock:
+                self.in_flight -= 1
+
+    def resource_post(self, obj):
+        return self._call("create", obj)
+
+    def resource_put(self, obj):
+        return self._call("update", obj)
+
+    def resource_delete(self, obj):
+        return self._call("delete", obj)
+
+
+class TestBulkApply:
+
+    @pytest.mark.parametrize("op", ["create", "update", "delete"])
+    def test_operations(self, op):
+        client = FakeClient()
+        result = bulk_apply(client, range(20), op=op, concurrency=4)
+        assert len(result.succeeded) == 20
+        assert [_.obj for _ in result.results] == list(range(20))
+        assert {_[0] for _ in client.calls} == {op}
+
+    def test_failures_reported(self):
+        client = FakeClient(fail={3, 7})
+        result = bulk_apply(client, range(10), concurrency=3)
+        assert [_.obj for _ in result.failed] == [3, 7]
+        assert isinstance(result.failed[0].error, SensuResourceError)
+        assert len(result.succeeded) == 8
+        assert not result.cancelled
+
+    def test_concurrency_bounded(self):
+        client = FakeClient(delay=0.01)
+        bulk_apply(client, range(30), concurrency=3)
+        assert client.max_in_flight <= 3
+
+    def test_lazy_input(self):
+        consumed = []
+
+        def objs():
+            for i in range(100):
+                consumed.append(i)
+                yield i
+
+        cancel = threading.Event()
+
+        def progress(report):
+            cancel.set()
+
+        client = FakeClient(delay=0.01)
+        result = bulk_apply(
+            client, objs(), concurrency=2, max_pending=4, progress=progress,
+            progress_interval=0, cancel=cancel
+        )
+        assert result.cancelled
+        assert len(consumed) < 100
+        assert len(result.results) < 100
+
+    def test_stop_on_error(self):
+        client = FakeClient(fail={0}, delay=0.01)
+        result = bulk_apply(client, range(50), concurrency=1, max_pending=1, stop_on_error=True)
+        assert result.cancelled
+        assert len(result.results) < 50
+
+    def test_progress(self):
+        reports = []
+        result = bulk_apply(FakeClient(fail={1}), range(5), progress=reports.append)
+        assert isinstance(reports[-1], BulkProgress)
+        assert reports[-1].completed == 5
+        assert reports[-1].failed == 1
+        assert reports[-1].submitted == 5
+        assert result.throughput > 0
+
+    def test_bad_arguments(self):
+        with pytest.raises(ValueError):
+            bulk_apply(FakeClient(), [], op="upsert")
+        with pytest.raises(ValueError):
+            bulk_apply(FakeClient(), [], concurrency=0)
@@ -0,0 +1,84 @@
+"""
+Tests for the fawlty.cache module
+"""
+import time
+from unittest.mock import patch
+
+import pytest
+
+from fawlty.cache import ResponseCache, FRESH, STALE, EXPIRED
+
+
+@pytest.fixture
+def cache():
+    return ResponseCache(max_entries=3, max_bytes=100, ttl=10, stale_while_revalidate=5)
+
+
+class TestResponseCache:
+
+    def test_miss(self, cache):
+        assert cache.lookup(("cls", "/a")) == (None, EXPIRED)
+        assert cache.stats()["misses"] == 1
+
+    def test_fresh(self, cache):
+        cache.store(("cls", "/a"), "etag", b"0123456789")
+        entry, state = cache.lookup(("cls", "/a"))
+        assert state == FRESH
+        assert entry.body == b"0123456789"
+        assert entry.size == 10
+        assert entry.etag == "etag"
+        assert cache.stats()["hits"] == 1
+
+    def test_stale_and_expired(self, cache):
+        cache.store(("cls", "/a"), "etag", b"0123456789")
+        now = time.monotonic()
+        with patch("fawlty.cache.time.monotonic", return_value=now + 12):
+            assert cache.lookup(("cls", "/a"))[1] == STALE
+        with patch("fawlty.cache.time.monotonic", return_value=now + 20):
+            assert cache.lookup(("cls", "/a"))[1] == EXPIRED
+        assert cache.stats()["stale_hits"] == 1
+
+    def test_revalidated(self, cache):
+        cache.store(("cls", "/a"), "etag", b"0123456789")
+        entry, _ = cache.lookup(("cls", "/a"))
+        assert cache.begin_revalidation(entry)
+        assert not cache.begin_revalidation(entry)
+        with patch("fawlty.cache.time.monotonic", return_value=time.monotonic() + 20):
+            cache.revalidated(("cls", "/a"), entry)
+            assert cache.lookup(("cls", "/a"))[1] == FRESH
+        assert not entry.revalidating
+        assert cache.stats()["revalidations"] == 1
+
+    def test_lru_entries(self, cache):
+        for name in "abc":
+            cache.store(("cls", f"/{name}"), None, b"x" * 1)
+        cache.lookup(("cls", "/a"))
+        cache.store(("cls", "/d"), None, b"x" * 1)
+        assert cache.lookup(("cls", "/b"))[0] is None
+        assert cache.lookup(("cls", "/a"))[0] is not None
+        assert cache.stats()["evictions"] == 1
+
+    def test_lru_bytes(self, cache):
+        cache.store(("cls", "/a"), None, b"x" * 60)
+        cache.store(("cls", "/b"), None, b"x" * 60)
+        assert len(cache) == 1
+        assert cache.bytes_used == 60
+
+    def test_too_large(self, cache):
+        cache.store(("cls", "/a"), None, b"x" * 1000)
+        assert len(cache) == 0
+
+    def test_replace(self, cache):
+        cache.store(("cls", "/a"), None, b"x" * 30)
+        cache.store(("cls", "/a"), None, b"x" * 40)
+        assert cache.bytes_used == 40
+
+    def test_invalidate(self, cache):
+        cache.store(("cls", "/things"), None, b"x" * 1)
+        cache.store(("cls", "/things/a"), None, b"x" * 1)
+        cache.store(("cls", "/others"), None, b"x" * 1)
+        cache.invalidate("/things")
+        assert len(cache) == 1
+        cache.clear()
+        assert len(cache) == 0
+        assert cache.bytes_used == 0
@@ -0,0 +1,192 @@
+"""
+Tests for the fawlty.changefeed module
+"""
+import copy
+import json
+import threading
+
+import pytest
+
+from fawlty.changefeed import (
+    ChangeFeed, ADDED, CHANGED, REMOVED, event_key, metadata_key, fingerprint,
+)
+from fawlty.lazy import LazyResource
+from fawlty.resources.entity import Entity
+from fawlty.resources.event import Event
+from fawlty.resources.namespace import Namespace
+from fawlty.tracing import Tracer
+
+
+def make_event(entity, check, timestamp=1, sequence=1, status=0, namespace="default"):
+    return {
+        "id": f"{entity}-{check}",
+        "timestamp": timestamp,
+        "sequence": sequence,
+        "metadata": {"namespace": namespace},
+        "check": {
+            "metadata": {"namespace": namespace, "name": check},
+            "executed": 0, "history": [], "is_silenced": False, "issued": 0, "last_ok": 0,
+            "occurrences": 1, "occurrences_watermark": 1, "state": "passing",
+            "status": status, "total_state_change": 0,
+        },
+        "entity": {
+            "metadata": {"namespace": namespace, "name": entity},
+            "deregister": False, "entity_class": "agent", "last_seen": timestamp,
+            "sensu_agent_version": "6.0.0", "subscriptions": [],
+        },
+    }
+
+
+class FakeClient:
+    """
+    Lists whatever is in its collection.
+    """
+
+    def __init__(self, collection):
+        self.collection = collection
+        self.urls = []
+        self.tracer = None
+
+    def resource_get(self, cls, get_url, lazy=False, **kwargs):
+        self.urls.append(get_url)
+        assert lazy
+        return [LazyResource(cls, _, client=self) for _ in copy.deepcopy(self.collection)]
+
+
+@pytest.fixture
+def events():
+    return [make_event("web1", "cpu"), make_event("web2", "cpu"), make_event("web1", "disk")]
+
+
+class TestKeys:
+
+    def test_event_key(self, events):
+        assert event_key(events[0]) == "default/web1/cpu"
+
+    def test_metadata_key(self):
+        assert metadata_key({"metadata": {"namespace": "default", "name": "web1"}}) == "default/web1"
+        assert metadata_key({"name": "default"}) == ""
+        assert metadata_key({"metadata": {"name": "admin"}}) == "admin"
+
+    def test_fingerprint(self):
+        assert fingerprint({"a": 1, "b": 2}) == fingerprint({"b": 2, "a": 1})
+        assert fingerprint([1, 2, 0]) != fingerprint([1, 2, 2])
+        assert 0 <= fingerprint("x") < 2 ** 64
+
+
+class TestChangeFeed:
+
+    def test_first_poll(self, events):
+        client = FakeClient(events)
+        changes = ChangeFeed(client, Event, materialize=False).poll()
+        assert [(_.kind, _.key) for _ in changes] == [
+            (ADDED, "default/web1/cpu"), (ADDED, "default/web2/cpu"), (ADDED, "default/web1/disk")
+        ]
+        assert client.urls == ["/api/core/v2/events"]
+
+    def test_namespace(self, events):
+        client = FakeClient(events)
+        ChangeFeed(client, Event, "default").poll()
+        assert client.urls == ["/api/core/v2/namespaces/default/events"]
+
+    def test_changes(self, events):
+        client = FakeClient(events)
+        feed = ChangeFeed(client, Event)
+        feed.poll()
+        assert feed.poll() == []
+
+        client.collection = [
+            make_event("web1", "cpu", timestamp=2, sequence=2, status=2),
+            make_event("web1", "disk"),
+            make_event("web3", "cpu"),
+        ]
+        changes = feed.poll()
+        assert [(_.kind, _.key) for _ in changes] == [
+            (CHANGED, "default/web1/cpu"), (ADDED, "default/web3/cpu"), (REMOVED, "default/web2/cpu")
+        ]
+        assert isinstance(changes[0].obj, Event)
+        assert changes[0].obj.check.status == 2
+        assert changes[0].obj._sensu_client is client
+        assert changes[2].obj is None
+
+    def test_other_fields_ignored(self, events):
+        client = FakeClient(events)
+        feed = ChangeFeed(client, Event)
+        feed.poll()
+        events[0]["check"]["output"] = "new output"
+        assert feed.poll() == []
+
+    def test_entity_last_seen_ignored(self):
+        entity = {
+            "metadata": {"namespace": "default", "name": "web1"}, "entity_class": "agent",
+            "last_seen": 1, "sensu_agent_version": "6.0.0", "subscriptions": [],
+            "deregistration": None,
+        }
+        client = FakeClient([entity])
+        feed = ChangeFeed(client, Entity, materialize=False)
+        assert feed.poll()[0].key == "default/web1"
+        entity["last_seen"] = 2
+        assert feed.poll() == []
+        entity["subscriptions"] = ["linux"]
+        assert [_.kind for _ in feed.poll()] == [CHANGED]
+
+    def test_custom_key_and_fields(self):
+        client = FakeClient([{"name": "default"}])
+        feed = ChangeFeed(client, Namespace, key=lambda _: _["name"], fields=lambda _: None)
+        change, = feed.poll()
+        assert (change.kind, change.key, change.obj.name) == (ADDED, "default", "default")
+
+    def test_adapts_interval(self, events):
+        client = FakeClient(events)
+        feed = ChangeFeed(client, Event, interval=8, min_interval=2, max_interval=12, busy=2)
+        feed.poll()
+        assert feed.interval == 4
+        feed.poll()
+        assert feed.interval == 6
+        feed.poll()
+        feed.poll()
+        assert feed.interval == 12
+        client.collection = [make_event("web1", "cpu", timestamp=2)] + events[1:]
+        feed.poll()
+        assert feed.interval == 12
+
+    def test_checkpoint(self, events, tmp_path):
+        path = str(tmp_path / "events.json")
+        client = FakeClient(events)
+        ChangeFeed(client, Event, checkpoint=path).poll()
+        with open(path, encoding="utf-8") as f:
+            assert len(json.load(f)["fingerprints"]) == 3
+
+        client.collection = events[:2]
+        changes = ChangeFeed(client, Event, checkpoint=path).poll()
+        assert [(_.kind, _.key) for _ in changes] == [(REMOVED, "default/web1/disk")]
+
+    def test_checkpoint_for_other_collection(self, events, tmp_path):
+        path = str(tmp_path / "events.json")
+        ChangeFeed(FakeClient(events), Event, checkpoint=path).poll()
+        feed = ChangeFeed(FakeClient(events), Event, "default", checkpoint=path)
+        assert feed.fingerprints == {}
+
+    def test_corrupt_checkpoint(self, events, tmp_path):
+        path = tmp_path / "events.json"
+        path.write_text("{not json")
+        assert len(ChangeFeed(FakeClient(events), Event, checkpoint=str(path)).poll()) == 3
+
+    def test_follow(self, events):
+        stop = threading.Event()
+        feed = ChangeFeed(FakeClient(events), Event, interval=0, min_interval=0, max_interval=0)
+        keys = []
+        for change in feed.follow(stop):
+            keys.append(change.key)
+            if len(keys) == 3:
+                stop.set()
+        assert len(keys) == 3
+        assert feed.polls == 1
+
+    def test_span(self, events):
+        client = FakeClient(events)
+        client.tracer = Tracer()
+        ChangeFeed(client, Event).poll()
+        span = client.tracer.exporter.spans[-1]
+        assert span.name == "fawlty.poll"
+        assert span.attributes["changes"] == 3
@@ -0,0 +1,31 @@
+"""
+Tests for the fawlty.compression module
+"""
+import gzip
+import os
+
+from fawlty.compression import compress_body
+
+
+def test_disabled():
+    body = b"x" * 1000
+    assert compress_body(body, None) == (body, None)
+
+
+def test_below_threshold():
+    assert compress_body(b"x" * 10, 100) == (b"x" * 10, None)
+
+
+def test_compressed():
+    body, encoding = compress_body("x" * 1000, 100)
+    assert encoding == "gzip"
+    assert gzip.decompress(body) == b"x" * 1000
+
+
+def test_incompressible():
+    body = os.urandom(1000)
+    assert compress_body(body, 100) == (body, None)
+
+
+def test_not_a_body():
+    assert compress_body(None, 0) == (None, None)
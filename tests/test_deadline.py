@@ -0,0 +1,55 @@
+"""
+Tests for the fawlty.deadline module
+"""
+
+import pytest
+
+from fawlty.deadline import (
+    deadline, request_timeout, remaining, check_deadline, within_deadline,
+    effective_timeout
+)
+from fawlty.exceptions import SensuTimeoutError, SensuConnectionError
+
+
+def test_no_deadline():
+    assert remaining() is None
+    assert within_deadline(5) == 5
+    assert effective_timeout((1, 2)) == (1, 2)
+    check_deadline()
+
+
+def test_deadline():
+    with deadline(10):
+        assert 9 < remaining() <= 10
+        assert effective_timeout(None) == pytest.approx(10, abs=0.1)
+        assert effective_timeout(3) == 3
+        assert effective_timeout((None, 30))[0] == pytest.approx(10, abs=0.1)
+        assert effective_timeout((None, 30))[1] == pytest.approx(10, abs=0.1)
+        assert within_deadline(5) == 5
+        assert within_deadline(20) is None
+    assert remaining() is None
+
+
+def test_nested_cannot_extend():
+    with deadline(1):
+        with deadline(100):
+            assert remaining() <= 1
+        with deadline(0.5):
+            assert remaining() <= 0.5
+
+
+def test_expired():
+    with deadline(0):
+        with pytest.raises(SensuTimeoutError):
+            check_deadline()
+        with pytest.raises(SensuConnectionError):
+            effective_timeout(5)
+
+
+def test_request_timeout():
+    with request_timeout(2):
+        assert effective_timeout(30) == 2
+        assert effective_timeout(30, timeout=1) == 1
+        with deadline(1):
+            assert effective_timeout(30) <= 1
+    assert effective_timeout(30) == 30
@@ -0,0 +1,91 @@
+"""
+Tests for the fawlty.fanout module
+"""
+import asyncio
+import threading
+import time
+
+import pytest
+
+from fawlty.fanout import fan_out, afan_out
+from fawlty.deadline import deadline, remaining
+
+
+class Tracker:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.started = []
+
+    def __call__(self, item):
+        with self.lock:
+            self.started.append(item)
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        time.sleep(0.05 if item == 0 else 0.01)
+        with self.lock:
+            self.in_flight -= 1
+        if item == "boom":
+            raise RuntimeError("boom")
+        return item * 2
+
+
+class TestFanOut:
+
+    def test_results(self):
+        tracker = Tracker()
+        results = list(fan_out(tracker, range(10), concurrency=3))
+        assert sorted(results) == [(i, i * 2) for i in range(10)]
+        assert tracker.max_in_flight == 3
+
+    def test_completion_order(self):
+        results = [item for item, _ in fan_out(Tracker(), range(3), concurrency=3)]
+        assert results[-1] == 0
+
+    def test_error(self):
+        tracker = Tracker()
+        with pytest.raises(RuntimeError):
+            list(fan_out(tracker, ["boom"] + list(range(1, 20)), concurrency=2))
+        assert len(tracker.started) < 20
+
+    def test_close_early(self):
+        tracker = Tracker()
+        results = fan_out(tracker, range(1, 20), concurrency=2)
+        next(results)
+        results.close()
+        assert len(tracker.started) < 20
+
+    def test_carries_deadline(self):
+        with deadline(5):
+            results = list(fan_out(lambda _: remaining(), range(2)))
+        assert all(_[1] is not None for _ in results)
+
+    def test_bad_concurrency(self):
+        with pytest.raises(ValueError):
+            list(fan_out(Tracker(), range(2), concurrency=0))
+
+
+class TestAsyncFanOut:
+
+    def test_results_in_order(self):
+        in_flight = []
+        peak = []
+
+        async def double(item):
+            in_flight.append(item)
+            peak.append(len(in_flight))
+            await asyncio.sleep(0.02 if item == 0 else 0.01)
+            in_flight.remove(item)
+            return item * 2
+
+        results = asyncio.run(afan_out(double, range(6), concurrency=2))
+        assert results == [i * 2 for i in range(6)]
+        assert max(peak) == 2
+
+    def test_error(self):
+        async def fail(item):
+            raise RuntimeError(item)
+
+        with pytest.raises(RuntimeError):
+            asyncio.run(afan_out(fail, range(3)))
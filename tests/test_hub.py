@@ -0,0 +1,293 @@
+"""
+Tests for the fawlty.hub module
+"""
+import threading
+import time
+
+import pytest
+
+from fawlty.changefeed import ADDED, CHANGED, REMOVED, Change
+from fawlty.exceptions import SensuError
+from fawlty.hub import SubscriptionHub, DROP, BLOCK, COALESCE
+from fawlty.resources.entity import Entity
+from fawlty.resources.event import Event
+from tests.test_changefeed import FakeClient, make_event
+
+
+def labelled(event, **labels):
+    event["entity"]["metadata"]["labels"] = labels
+    return event
+
+
+class ClassClient(FakeClient):
+    """
+    Lists a collection of its own for each resource class.
+    """
+
+    def resource_get(self, cls, get_url, lazy=False, **kwargs):
+        self.collection = self.collections[cls]
+        return super().resource_get(cls, get_url, lazy=lazy, **kwargs)
+
+
+ENTITY = {
+    "metadata": {"namespace": "default", "name": "web1"}, "entity_class": "agent",
+    "last_seen": 1, "sensu_agent_version": "6.0.0", "subscriptions": [], "deregistration": None,
+}
+
+
+@pytest.fixture
+def events():
+    return [
+        labelled(make_event("web1", "cpu"), team="web"),
+        labelled(make_event("db1", "cpu", namespace="prod"), team="db"),
+        make_event("web1", "disk", status=2),
+    ]
+
+
+def drain(subscription):
+    changes = []
+    while True:
+        change = subscription.get(timeout=0)
+        if change is None:
+            return changes
+        changes.append(change)
+
+
+def keys(changes):
+    return [(_.kind, _.key) for _ in changes]
+
+
+class TestSubscriptionHub:
+
+    def test_one_poll_for_many_subscribers(self, events):
+        client = FakeClient(events)
+        hub = SubscriptionHub(client)
+        first = hub.subscribe(Event)
+        second = hub.subscribe(Event)
+        assert hub.poll() == 3
+        assert client.urls == ["/api/core/v2/events"]
+        assert len(drain(first)) == 3
+        assert len(drain(second)) == 3
+        assert len(hub.feeds) == 1
+
+    def test_own_objects(self, events):
+        hub = SubscriptionHub(FakeClient(events))
+        first = hub.subscribe(Event)
+        second = hub.subscribe(Event)
+        hub.poll()
+        mine = drain(first)[0].obj
+        mine.entity.metadata.labels["team"] = "changed"
+        assert isinstance(mine, Event)
+        late = hub.subscribe(Event)
+        for subscription in (second, late):
+            obj = drain(subscription)[0].obj
+            assert obj is not mine
+            assert obj.entity.metadata.labels == {"team": "web"}
+
+    def test_filters(self, events):
+        hub = SubscriptionHub(FakeClient(events))
+        prod = hub.subscribe(Event, "prod")
+        web = hub.subscribe(Event, labels={"team": "web"})
+        failing = hub.subscribe(Event, predicate=lambda _: _.check.status != 0)
+        hub.poll()
+        assert keys(drain(prod)) == [(ADDED, "prod/db1/cpu")]
+        assert keys(drain(web)) == [(ADDED, "default/web1/cpu")]
+        assert keys(drain(failing)) == [(ADDED, "default/web1/disk")]
+
+    def test_removals(self, events):
+        client = FakeClient(events)
+        hub = SubscriptionHub(client)
+        everything = hub.subscribe(Event)
+        failing = hub.subscribe(Event, predicate=lambda _: _.check.status != 0)
+        hub.poll()
+        drain(everything)
+        drain(failing)
+
+        client.collection = [events[1], make_event("web1", "disk", timestamp=2)]
+        hub.poll()
+        # The disk check recovered, so it no longer matches the failing subscription
+        assert keys(drain(failing)) == [(REMOVED, "default/web1/disk")]
+        assert keys(drain(everything)) == [
+            (CHANGED, "default/web1/disk"), (REMOVED, "default/web1/cpu")
+        ]
+
+    def test_late_subscriber(self, events):
+        client = FakeClient(events)
+        hub = SubscriptionHub(client)
+        first = hub.subscribe(Event)
+        hub.poll()
+        client.collection = events[1:]
+        hub.poll()
+        failing = hub.subscribe(Event, predicate=lambda _: _.check.status != 0)
+        everything = hub.subscribe(Event)
+        assert keys(drain(failing)) == [(ADDED, "default/web1/disk")]
+        assert keys(drain(everything)) == [(ADDED, "prod/db1/cpu"), (ADDED, "default/web1/disk")]
+        assert len(drain(first)) == 4
+
+        client.collection = events[1:2]
+        hub.poll()
+        assert keys(drain(failing)) == [(REMOVED, "default/web1/disk")]
+        assert keys(drain(everything)) == [(REMOVED, "default/web1/disk")]
+
+    def test_late_subscriber_never_blocks(self, events):
+        hub = SubscriptionHub(FakeClient(events))
+        hub.subscribe(Event)
+        hub.poll()
+        subscription = hub.subscribe(Event, policy=BLOCK, maxsize=2)
+        assert subscription.stats()["pending"] == 2
+        assert subscription.stats()["dropped"] == 1
+
+    def test_checkpoint_per_class(self, events, tmp_path):
+        client = ClassClient(events)
+        client.collections = {Event: events, Entity: [ENTITY]}
+        hub = SubscriptionHub(client, checkpoint=str(tmp_path / "hub.json"))
+        hub.subscribe(Event)
+        hub.subscribe(Entity)
+        hub.poll()
+        assert sorted(_.name for _ in tmp_path.iterdir()) == ["hub.entity.json", "hub.event.json"]
+
+        restarted = SubscriptionHub(client, checkpoint=str(tmp_path / "hub.json"))
+        restarted.subscribe(Event)
+        restarted.subscribe(Entity)
+        assert restarted.poll() == 0
+
+    def test_unsubscribe(self, events):
+        hub = SubscriptionHub(FakeClient(events))
+        subscription = hub.subscribe(Event)
+        subscription.close()
+        assert not hub.feeds
+        assert hub.poll() == 0
+        assert subscription.get() is None
+
+    def test_poll_after_unsubscribe(self, events):
+        hub = SubscriptionHub(FakeClient(events))
+        hub.subscribe(Event).close()
+        assert hub.poll(Event) == 0
+
+    def test_bad_options(self, events):
+        hub = SubscriptionHub(FakeClient(events))
+        with pytest.raises(ValueError):
+            hub.subscribe(Event, policy="shout")
+        with pytest.raises(ValueError):
+            hub.subscribe(Event, maxsize=0)
+
+
+class TestPolicies:
+
+    def test_drop(self, events):
+        hub = SubscriptionHub(FakeClient(events))
+        subscription = hub.subscribe(Event, policy=DROP, maxsize=2)
+        hub.poll()
+        assert len(drain(subscription)) == 2
+        assert subscription.stats() == {
+            "delivered": 2, "dropped": 1, "coalesced": 0, "pending": 0
+        }
+
+    def test_coalesce(self, events):
+        client = FakeClient(events)
+        hub = SubscriptionHub(client)
+        subscription = hub.subscribe(Event, policy=COALESCE)
+        hub.poll()
+        client.collection = [make_event("web1", "cpu", timestamp=2)] + events[1:]
+        hub.poll()
+        client.collection = events[1:]
+        hub.poll()
+        # web1/cpu was added and removed before it was read, so it is never seen
+        assert keys(drain(subscription)) == [(ADDED, "prod/db1/cpu"), (ADDED, "default/web1/disk")]
+        assert subscription.stats()["coalesced"] == 2
+
+    def test_coalesce_keeps_latest(self, events):
+        client = FakeClient(events)
+        hub = SubscriptionHub(client)
+        subscription = hub.subscribe(Event, policy=COALESCE)
+        hub.poll()
+        drain(subscription)
+        for timestamp in (2, 3):
+            client.collection = [make_event("web1", "cpu", timestamp=timestamp)] + events[1:]
+            hub.poll()
+        change, = drain(subscription)
+        assert (change.kind, change.obj.timestamp) == (CHANGED, 3)
+
+    def test_block(self, events):
+        hub = SubscriptionHub(FakeClient(events))
+        subscription = hub.subscribe(Event, policy=BLOCK, maxsize=1)
+        poller = threading.Thread(target=hub.poll)
+        poller.start()
+        received = [subscription.get(timeout=5) for _ in range(3)]
+        poller.join(5)
+        assert not poller.is_alive()
+        assert all(isinstance(_, Change) for _ in received)
+        assert subscription.stats()["dropped"] == 0
+
+    def test_block_released_by_stop(self, events):
+        hub = SubscriptionHub(FakeClient(events))
+        subscription = hub.subscribe(Event, policy=BLOCK, maxsize=1)
+        poller = threading.Thread(target=hub.poll)
+        poller.start()
+        hub.stop()
+        poller.join(5)
+        assert not poller.is_alive()
+        assert subscription.stats()["dropped"] == 2
+
+
+class TestBackground:
+
+    def test_start_stop(self, events):
+        hub = SubscriptionHub(FakeClient(events), interval=0, min_interval=0)
+        subscription = hub.subscribe(Event)
+        hub.start()
+        received = [subscription.get(timeout=5) for _ in range(3)]
+        hub.close()
+        assert all(_ is not None for _ in received)
+        assert list(subscription) == []
+        assert hub._thread.name == "fawlty-hub"
+        assert not hub._thread.is_alive()
+
+    def test_error(self, events):
+        class FailingClient(FakeClient):
+            def resource_get(self, cls, get_url, lazy=False, **kwargs):
+                raise SensuError("down")
+
+        errors = []
+        hub = SubscriptionHub(FailingClient(events), retry_interval=0.01, on_error=errors.append)
+        hub.subscribe(Event)
+        hub.start()
+        deadline = time.monotonic() + 5
+        while len(errors) < 2 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        hub.stop(5)
+        assert len(errors) >= 2
+        assert isinstance(hub.last_error, SensuError)
+
+    def test_survives_unsubscribe(self, events):
+        client = ClassClient(events)
+        client.collections = {Event: events, Entity: [ENTITY]}
+        hub = SubscriptionHub(client, interval=0.01, min_interval=0.01, max_interval=0.01)
+        subscription = hub.subscribe(Event)
+        hub.subscribe(Entity)
+        hub.start()
+        subscription.close()
+        polled = len(client.urls)
+        deadline = time.monotonic() + 5
+        while len(client.urls) < polled + 5 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert hub.running
+        assert client.urls[-1] == "/api/core/v2/entities"
+        hub.stop(5)
+        assert not hub.running
+
+    def test_unexpected_error(self, events):
+        class BrokenClient(FakeClient):
+            def resource_get(self, cls, get_url, lazy=False, **kwargs):
+                raise RuntimeError("bug")
+
+        errors = []
+        hub = SubscriptionHub(BrokenClient(events), retry_interval=0.01, on_error=errors.append)
+        hub.subscribe(Event)
+        hub.start()
+        deadline = time.monotonic() + 5
+        while len(errors) < 2 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert hub.running
+        hub.stop(5)
+        assert isinstance(hub.last_error, RuntimeError)
@@ -0,0 +1,80 @@
+"""
+Tests for the fawlty.lazy module
+"""
+import pytest
+from pydantic import ValidationError
+
+from fawlty.lazy import LazyResource
+from fawlty.resources.apikey import APIKey
+from fawlty.resources.event import Event, EventCheck
+from fawlty.exceptions import SensuResourceError
+
+
+@pytest.fixture
+def event_data():
+    return {
+        "id": "abc",
+        "timestamp": 10,
+        "metadata": {"namespace": "default"},
+        "check": {
+            "metadata": {"namespace": "default", "name": "check"},
+            "executed": 0, "history": [{"status": 0, "executed": 0}], "is_silenced": False,
+            "issued": 0, "last_ok": 0, "occurrences": 0, "occurrences_watermark": 0,
+            "state": "passing", "status": 2, "total_state_change": 0,
+        },
+        "entity": {"metadata": {"namespace": "default", "name": "web1"}, "last_seen": "not a number"},
+    }
+
+
+def test_fields(event_data):
+    view = LazyResource(Event, event_data)
+    assert view.id == "abc"
+    assert view.sequence is None
+    assert view.check.status == 2
+    assert view.check.metadata.name == "check"
+    assert view.check.history[0].status == 0
+    assert view.check is view.check
+    assert isinstance(view.check, LazyResource)
+    assert view.BASE_URL == Event.BASE_URL
+
+
+def test_property():
+    view = LazyResource(APIKey, {"metadata": {"name": "abc"}, "username": "basil"})
+    assert view.key == "abc"
+    assert view.username == "basil"
+
+
+def test_validates_on_access(event_data):
+    view = LazyResource(Event, event_data)
+    assert view.entity.metadata.name == "web1"
+    with pytest.raises(ValidationError):
+        view.entity.last_seen
+    with pytest.raises(SensuResourceError):
+        view.entity.entity_class
+
+
+def test_unknown_attribute(event_data):
+    view = LazyResource(Event, event_data)
+    with pytest.raises(AttributeError):
+        view.nonsense
+    with pytest.raises(AttributeError):
+        view.urlify
+
+
+def test_read_only(event_data):
+    view = LazyResource(Event, event_data)
+    with pytest.raises(AttributeError):
+        view.id = "new"
+
+
+def test_materialize(event_data):
+    del event_data["entity"]
+    client = object()
+    view = LazyResource(Event, event_data, client=client)
+    event = view.materialize()
+    assert isinstance(event, Event)
+    assert isinstance(event.check, EventCheck)
+    assert event._sensu_client is client
+    assert view.materialize() is event
+    assert view.check.materialize().model_dump() == event.check.model_dump()
+    assert view.model_dump() == event.model_dump()
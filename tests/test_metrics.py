@@ -0,0 +1,171 @@
+"""
+Tests for the fawlty.metrics module
+"""
+import threading
+
+import pytest
+
+from fawlty.metrics import ClientMetrics, Histogram, endpoint_template
+
+
+class Check:
+    pass
+
+
+class TestHistogram:
+
+    def test_empty(self):
+        histogram = Histogram()
+        assert histogram.percentile(0.5) is None
+        assert histogram.summary()["count"] == 0
+
+    @pytest.mark.parametrize("value", [0, 1, 127, 128, 129, 1000, 65535, 10 ** 9])
+    def test_buckets_contain_value(self, value):
+        index = Histogram._index(value)
+        assert value <= Histogram._upper_bound(index)
+        if index:
+            assert Histogram._upper_bound(index - 1) < value
+
+    def test_percentiles(self):
+        histogram = Histogram()
+        for i in range(1, 1001):
+            histogram.record(i / 1000)
+
+        assert histogram.percentile(0.5) == pytest.approx(0.5, rel=0.01)
+        assert histogram.percentile(0.99) == pytest.approx(0.99, rel=0.01)
+        assert histogram.percentile(0.999) == pytest.approx(0.999, rel=0.01)
+        assert histogram.percentile(1.0) == 1.0
+        assert histogram.percentile(0.0) == pytest.approx(0.001, rel=0.01)
+
+        summary = histogram.summary()
+        assert summary["count"] == 1000
+        assert summary["sum"] == pytest.approx(500.5)
+        assert (summary["min"], summary["max"]) == (0.001, 1.0)
+
+    def test_tail(self):
+        histogram = Histogram()
+        for _ in range(990):
+            histogram.record(0.01)
+        for _ in range(10):
+            histogram.record(2.0)
+
+        assert histogram.percentile(0.5) == pytest.approx(0.01, rel=0.01)
+        assert histogram.percentile(0.999) == 2.0
+
+
+class TestEndpointTemplate:
+
+    @pytest.mark.parametrize("path,template", [
+        ("/api/core/v2/namespaces/default/checks", "/api/core/v2/namespaces/{namespace}/checks"),
+        (
+            "/api/core/v2/namespaces/default/checks/check-cpu",
+            "/api/core/v2/namespaces/{namespace}/checks/{name}",
+        ),
+        (
+            "/api/core/v2/namespaces/prod/events/host1/check-cpu?limit=10",
+            "/api/core/v2/namespaces/{namespace}/events/{name}/{name}",
+        ),
+        ("/api/core/v2/namespaces", "/api/core/v2/namespaces"),
+        ("/api/core/v2/namespaces/default", "/api/core/v2/namespaces/{namespace}"),
+        ("/api/core/v2/users/bob", "/api/core/v2/users/{name}"),
+        ("/auth/token", "/auth/token"),
+    ])
+    def test_template(self, path, template):
+        assert endpoint_template(path) == template
+
+
+class TestClientMetrics:
+
+    def test_record_call(self):
+        metrics = ClientMetrics()
+        metrics.record_call(
+            "get", "/api/core/v2/namespaces/a/checks", Check, status=200, elapsed=0.1,
+            bytes_in=100,
+        )
+        metrics.record_call(
+            "GET", "/api/core/v2/namespaces/b/checks", Check, status=503, elapsed=0.3,
+            attempts=3, bytes_in=10,
+        )
+        metrics.record_call("POST", "/auth/token", None, status=None, elapsed=1.0, bytes_out=5)
+
+        calls = metrics.snapshot()["calls"]
+        assert len(calls) == 2
+        checks = calls[0]
+        assert checks["method"] == "GET"
+        assert checks["endpoint"] == "/api/core/v2/namespaces/{namespace}/checks"
+        assert checks["resource"] == "Check"
+        assert checks["requests"] == 2
+        assert checks["statuses"] == {"200": 1, "503": 1}
+        assert checks["retries"] == 2
+        assert checks["bytes_in"] == 110
+        assert checks["latency"]["count"] == 2
+        assert calls[1]["statuses"] == {"error": 1}
+        assert calls[1]["resource"] == ""
+        assert calls[1]["bytes_out"] == 5
+
+    def test_record_coalesced(self):
+        metrics = ClientMetrics()
+        metrics.record_coalesced("GET", "/api/core/v2/namespaces/a/checks/c", Check)
+        metrics.record_coalesced("GET", "/api/core/v2/namespaces/b/checks/d", Check)
+
+        call, = metrics.snapshot()["calls"]
+        assert (call["requests"], call["coalesced"]) == (0, 2)
+        assert "fawlty_coalesced_requests_total{" in metrics.to_prometheus()
+
+    def test_record_decode(self):
+        metrics = ClientMetrics()
+        metrics.record_decode(Check, 0.01, 0.02)
+        metrics.record_decode(Check, 0.01)
+
+        snapshot = metrics.snapshot()
+        assert snapshot["decode"]["Check"]["count"] == 2
+        assert snapshot["validate"]["Check"]["count"] == 1
+
+    def test_reset(self):
+        metrics = ClientMetrics()
+        metrics.record_call("GET", "/health", None, status=200, elapsed=0.1)
+        metrics.record_decode(Check, 0.01, 0.02)
+        metrics.reset()
+        assert metrics.snapshot() == {"calls": [], "decode": {}, "validate": {}}
+
+    def test_prometheus(self):
+        metrics = ClientMetrics(prefix="sensu")
+        metrics.record_call(
+            "GET", "/api/core/v2/namespaces/a/checks", Check, status=200, elapsed=0.25,
+            attempts=2, bytes_out=0, bytes_in=42,
+        )
+        metrics.record_decode(Check, 0.5, 0.125)
+
+        text = metrics.to_prometheus()
+        labels = 'method="GET",endpoint="/api/core/v2/namespaces/{namespace}/checks",resource="Check"'
+        assert "# TYPE sensu_requests_total counter" in text
+        assert f'sensu_requests_total{{{labels},status="200"}} 1' in text
+        assert f"sensu_retries_total{{{labels}}} 1" in text
+        assert f"sensu_response_bytes_total{{{labels}}} 42" in text
+        assert "# TYPE sensu_request_duration_seconds summary" in text
+        assert f'sensu_request_duration_seconds{{{labels},quantile="0.99"}} 0.25' in text
+        assert f"sensu_request_duration_seconds_sum{{{labels}}} 0.25" in text
+        assert f"sensu_request_duration_seconds_count{{{labels}}} 1" in text
+        assert 'sensu_decode_duration_seconds_sum{resource="Check"} 0.5' in text
+        assert 'sensu_validate_duration_seconds{resource="Check",quantile="0.5"} 0.125' in text
+        assert text.endswith("\n")
+
+    def test_prometheus_escaping(self):
+        metrics = ClientMetrics()
+        metrics.record_call("GET", '/odd"path\\', None, status=200, elapsed=0.1)
+        assert 'endpoint="/odd\\"path\\\\"' in metrics.to_prometheus()
+
+    def test_threads(self):
+        metrics = ClientMetrics()
+
+        def work():
+            for _ in range(1000):
+                metrics.record_call("GET", "/health", None, status=200, elapsed=0.001)
+
+        threads = [threading.Thread(target=work) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert metrics.snapshot()["calls"][0]["requests"] == 4000
@@ -0,0 +1,67 @@
+"""
+Tests for the fawlty.pagination module
+"""
+import pytest
+
+from fawlty.pagination import (
+    PageSizer, AdaptivePageSizer, get_page_sizer, DEFAULT_PAGE_SIZE
+)
+
+
+class TestPageSizer:
+
+    def test_fixed_size(self):
+        sizer = PageSizer(size=50)
+        sizer.observe(10.0, 50, 50)
+        assert sizer.next_size() == 50
+
+    def test_invalid_size(self):
+        with pytest.raises(ValueError):
+            PageSizer(size=0)
+
+
+class TestAdaptivePageSizer:
+
+    def test_grows_when_fast(self):
+        sizer = AdaptivePageSizer(size=100, target_latency=1.0, max_size=1000)
+        sizer.observe(0.25, 100, 100)
+        assert sizer.next_size() == 200
+
+    def test_shrinks_when_slow(self):
+        sizer = AdaptivePageSizer(size=100, target_latency=1.0, min_size=10)
+        sizer.observe(4.0, 100, 100)
+        assert sizer.next_size() == 50
+
+    def test_respects_bounds(self):
+        sizer = AdaptivePageSizer(size=100, target_latency=1.0, min_size=80, max_size=150)
+        sizer.observe(0.1, 100, 100)
+        assert sizer.next_size() == 150
+        sizer.observe(100.0, 150, 150)
+        assert sizer.next_size() == 80
+
+    def test_ignores_short_pages(self):
+        sizer = AdaptivePageSizer(size=100, target_latency=1.0)
+        sizer.observe(0.1, 5, 100)
+        assert sizer.next_size() == 100
+
+    def test_invalid_bounds(self):
+        with pytest.raises(ValueError):
+            AdaptivePageSizer(min_size=100, max_size=10)
+
+
+class TestGetPageSizer:
+
+    def test_int(self):
+        assert get_page_sizer(25).next_size() == 25
+
+    def test_sizer_passthrough(self):
+        sizer = AdaptivePageSizer()
+        assert get_page_sizer(sizer) is sizer
+
+    def test_default(self):
+        assert get_page_sizer(None).next_size() == DEFAULT_PAGE_SIZE
+        assert get_page_sizer(None, default=10).next_size() == 10
+
+    def test_default_sizer(self):
+        sizer = AdaptivePageSizer()
+        assert get_page_sizer(None, default=sizer) is sizer
@@ -0,0 +1,197 @@
+"""
+Tests for the fawlty.ratelimit module
+"""
+import asyncio
+import threading
+import time
+
+import pytest
+
+from fawlty.deadline import deadline
+from fawlty.exceptions import SensuTimeoutError
+from fawlty.ratelimit import TokenBucket, RateLimiter, AIMDLimiter, namespace_of
+
+
+@pytest.mark.parametrize("path,namespace", [
+    ("/api/core/v2/namespaces/default/checks", "default"),
+    ("/api/core/v2/namespaces/prod/checks/check-cpu?x=1", "prod"),
+    ("/api/core/v2/namespaces/default", None),
+    ("/api/core/v2/namespaces", None),
+    ("/api/core/v2/clusterroles", None),
+    ("/auth/token", None),
+])
+def test_namespace_of(path, namespace):
+    assert namespace_of(path) == namespace
+
+
+class TestTokenBucket:
+
+    def test_burst_then_rate(self):
+        bucket = TokenBucket(rate=10, burst=2)
+        assert bucket.reserve() == 0
+        assert bucket.reserve() == 0
+        assert bucket.reserve() == pytest.approx(0.1, abs=0.01)
+        assert bucket.reserve() == pytest.approx(0.2, abs=0.01)
+
+    def test_max_wait(self):
+        bucket = TokenBucket(rate=1)
+        assert bucket.reserve() == 0
+        assert bucket.reserve(max_wait=0.5) is None
+        # The refused reservation took nothing
+        assert bucket.reserve() == pytest.approx(1, abs=0.01)
+
+    def test_refund(self):
+        bucket = TokenBucket(rate=1)
+        bucket.reserve()
+        bucket.refund()
+        assert bucket.reserve() == 0
+
+    def test_invalid_rate(self):
+        with pytest.raises(ValueError):
+            TokenBucket(rate=0)
+
+
+class TestRateLimiter:
+
+    def test_overall(self):
+        limiter = RateLimiter(rate=50, burst=1)
+        start = time.monotonic()
+        for _ in range(6):
+            limiter.acquire("/api/core/v2/clusterroles")
+        assert time.monotonic() - start == pytest.approx(0.1, abs=0.05)
+        assert limiter.stats()["throttled"] == 5
+
+    def test_per_namespace(self):
+        limiter = RateLimiter(per_namespace=1, namespaces={"fast": 1000})
+        assert limiter.reserve("/api/core/v2/namespaces/a/checks") == 0
+        assert limiter.reserve("/api/core/v2/namespaces/b/checks") == 0
+        assert limiter.reserve("/api/core/v2/namespaces/a/checks") > 0.9
+        assert limiter.reserve("/api/core/v2/namespaces/fast/checks") == 0
+        assert limiter.reserve("/api/core/v2/namespaces/fast/checks") == 0
+        # Requests outside a namespace are not limited without an overall rate
+        assert limiter.reserve("/auth/token") == 0
+
+    def test_waits_for_every_bucket(self):
+        limiter = RateLimiter(rate=1, per_namespace=100)
+        assert limiter.reserve("/api/core/v2/namespaces/a/checks") == 0
+        assert limiter.reserve("/api/core/v2/namespaces/b/checks") > 0.9
+
+    def test_deadline(self):
+        limiter = RateLimiter(rate=1, per_namespace=1)
+        limiter.reserve("/api/core/v2/namespaces/a/checks")
+        with deadline(0.1):
+            with pytest.raises(SensuTimeoutError):
+                limiter.acquire("/api/core/v2/namespaces/b/checks")
+        # The overall token was refunded when the namespace's bucket refused
+        assert limiter.overall.reserve() == pytest.approx(1, abs=0.05)
+
+    def test_async(self):
+        limiter = RateLimiter(rate=50, burst=1)
+
+        async def run():
+            start = time.monotonic()
+            await asyncio.gather(*(limiter.aacquire("/x") for _ in range(6)))
+            return time.monotonic() - start
+
+        assert asyncio.run(run()) == pytest.approx(0.1, abs=0.05)
+
+
+class TestAIMDLimiter:
+
+    def test_additive_increase(self):
+        limiter = AIMDLimiter(initial_limit=4, max_limit=6)
+        for _ in range(40):
+            limiter.acquire()
+            limiter.release(0.01, 200)
+        assert limiter.limit == 6
+
+    def test_multiplicative_decrease(self):
+        limiter = AIMDLimiter(initial_limit=16, min_limit=2)
+        limiter.acquire()
+        limiter.release(0.01, 503)
+        assert limiter.limit == 8
+        # Further overloads within the same round trip are not counted again
+        limiter.acquire()
+        limiter.release(0.01, 429)
+        assert limiter.limit == 8
+        time.sleep(0.03)
+        limiter.acquire()
+        limiter.release(0.01, None)
+        assert limiter.limit == 4
+        assert limiter.stats()["decreases"] == 2
+
+    def test_min_limit(self):
+        limiter = AIMDLimiter(initial_limit=2, min_limit=2)
+        limiter.acquire()
+        limiter.release(0.01, 500)
+        assert limiter.limit == 2
+
+    def test_slow_responses(self):
+        limiter = AIMDLimiter(initial_limit=10)
+        for _ in range(5):
+            limiter.acquire()
+            limiter.release(0.02, 200)
+        assert limiter.limit == 10
+        limiter.acquire()
+        limiter.release(0.5, 200)
+        assert limiter.limit == 5
+        assert limiter.stats()["baseline_latency"] == pytest.approx(0.02, abs=0.01)
+
+    def test_max_latency(self):
+        limiter = AIMDLimiter(initial_limit=10, max_latency=0.1)
+        limiter.acquire()
+        limiter.release(0.2, 200)
+        assert limiter.limit == 5
+
+    def test_blocks_at_limit(self):
+        limiter = AIMDLimiter(initial_limit=2)
+        limiter.acquire()
+        limiter.acquire()
+        acquired = threading.Event()
+
+        def third():
+            limiter.acquire()
+            acquired.set()
+
+        thread = threading.Thread(target=third)
+        thread.start()
+        assert not acquired.wait(0.05)
+        limiter.release(0.01, 200)
+        assert acquired.wait(1)
+        thread.join()
+        assert limiter.stats()["in_flight"] == 2
+
+    def test_deadline(self):
+        limiter = AIMDLimiter(initial_limit=1)
+        limiter.acquire()
+        with deadline(0.05):
+            with pytest.raises(SensuTimeoutError):
+                limiter.acquire()
+
+    def test_async(self):
+        limiter = AIMDLimiter(initial_limit=3, max_limit=3)
+        peak = []
+
+        async def request():
+            await limiter.aacquire()
+            peak.append(limiter.in_flight)
+            await asyncio.sleep(0.01)
+            limiter.release(0.01, 200)
+
+        async def run():
+            await asyncio.gather(*(request() for _ in range(12)))
+
+        asyncio.run(run())
+        assert max(peak) == 3
+        assert limiter.in_flight == 0
+
+    def test_async_deadline(self):
+        limiter = AIMDLimiter(initial_limit=1)
+        limiter.acquire()
+
+        async def run():
+            with deadline(0.05):
+                await limiter.aacquire()
+
+        with pytest.raises(SensuTimeoutError):
+            asyncio.run(run())
@@ -0,0 +1,79 @@
+"""
+Tests for the fawlty.retry module
+"""
+import time
+from email.utils import formatdate
+
+import pytest
+
+from fawlty.retry import RetryPolicy, parse_retry_after
+
+
+@pytest.fixture
+def policy():
+    return RetryPolicy(max_attempts=3, backoff_factor=1.0, jitter=False)
+
+
+class TestNextDelay:
+
+    def test_retry_status(self, policy):
+        assert policy.next_delay("GET", 1, time.monotonic(), status=503) == 1.0
+        assert policy.next_delay("GET", 2, time.monotonic(), status=503) == 2.0
+
+    def test_max_attempts(self, policy):
+        assert policy.next_delay("GET", 3, time.monotonic(), status=503) is None
+
+    def test_success_not_retried(self, policy):
+        assert policy.next_delay("GET", 1, time.monotonic(), status=200) is None
+        assert policy.next_delay("GET", 1, time.monotonic(), status=404) is None
+
+    def test_non_idempotent(self, policy):
+        assert policy.next_delay("POST", 1, time.monotonic(), status=503) is None
+        assert policy.next_delay("POST", 1, time.monotonic(), error=True) is None
+
+    def test_429_any_method(self, policy):
+        assert policy.next_delay("POST", 1, time.monotonic(), status=429) == 1.0
+
+    def test_connection_error(self, policy):
+        assert policy.next_delay("PUT", 1, time.monotonic(), error=True) == 1.0
+
+    def test_retry_after(self, policy):
+        headers = {"Retry-After": "7"}
+        assert policy.next_delay("GET", 1, time.monotonic(), status=503, headers=headers) == 7.0
+
+    def test_retry_after_ignored(self):
+        policy = RetryPolicy(backoff_factor=1.0, jitter=False, respect_retry_after=False)
+        headers = {"Retry-After": "7"}
+        assert policy.next_delay("GET", 1, time.monotonic(), status=503, headers=headers) == 1.0
+
+    def test_total_timeout(self):
+        policy = RetryPolicy(backoff_factor=1.0, jitter=False, total_timeout=5)
+        assert policy.next_delay("GET", 1, time.monotonic(), status=503) == 1.0
+        assert policy.next_delay("GET", 1, time.monotonic() - 4.5, status=503) is None
+
+    def test_jitter(self):
+        policy = RetryPolicy(backoff_factor=1.0, max_backoff=3.0)
+        for attempt in range(1, 10):
+            assert 0 <= policy.backoff(attempt) <= 3.0
+
+    def test_stats(self, policy):
+        policy.next_delay("GET", 1, time.monotonic(), status=503)
+        policy.next_delay("GET", 1, time.monotonic(), error=True)
+        policy.next_delay("GET", 1, time.monotonic(), status=200)
+        assert policy.stats() == {
+            "retries": 2, "by_reason": {"status_503": 1, "connection_error": 1}
+        }
+
+
+class TestParseRetryAfter:
+
+    def test_seconds(self):
+        assert parse_retry_after("3") == 3.0
+
+    def test_date(self):
+        value = formatdate(time.time() + 30, usegmt=True)
+        assert 25 < parse_retry_after(value) <= 30
+
+    def test_invalid(self):
+        assert parse_retry_after(None) is None
+        assert parse_retry_after("soon") is None
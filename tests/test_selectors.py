@@ -0,0 +1,56 @@
+"""
+Tests for the fawlty.selectors module
+"""
+import pytest
+
+from fawlty.selectors import LabelSelector, FieldSelector, selector_params
+
+
+def test_operators():
+    selector = (
+        LabelSelector()
+        .eq("region", "us-west-1")
+        .ne("tier", "db")
+        .in_("app", ["web", "api"])
+        .notin("env", ["dev"])
+        .matches("owner", "ops")
+    )
+    assert str(selector) == (
+        "region == us-west-1 && tier != db && app in [web, api] && env notin [dev] "
+        "&& owner matches ops"
+    )
+
+
+def test_immutable():
+    base = FieldSelector().eq("entity.entity_class", "proxy")
+    base.eq("entity.name", "web1")
+    assert str(base) == "entity.entity_class == proxy"
+
+
+def test_quoting():
+    assert str(LabelSelector().eq("team", "site reliability")) == 'team == "site reliability"'
+    with pytest.raises(ValueError):
+        LabelSelector().eq("team", 'a "quoted" value')
+
+
+def test_combine():
+    combined = LabelSelector().eq("a", "1") & LabelSelector().eq("b", "2")
+    assert combined == LabelSelector("a == 1", "b == 2")
+    with pytest.raises(TypeError):
+        LabelSelector().eq("a", "1") & FieldSelector().eq("b", "2")
+
+
+def test_invalid():
+    with pytest.raises(ValueError):
+        LabelSelector().in_("app", [])
+    with pytest.raises(ValueError):
+        LabelSelector().eq("", "value")
+
+
+def test_selector_params():
+    assert selector_params() == {}
+    assert selector_params(LabelSelector(), None) == {}
+    assert selector_params(LabelSelector().eq("a", "1"), "entity.name == web1") == {
+        "labelSelector": "a == 1",
+        "fieldSelector": "entity.name == web1",
+    }
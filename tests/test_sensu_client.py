@@ -1,21 +1,40 @@
 """
 Tests for the fawlty.sensu_client module
 """
+import gzip
+import io
+import json
 import time
 from unittest.mock import patch, MagicMock
 
+import socket
+import threading
+
 import pytest
+import requests
+import urllib3
 #with patch("fawlty.sensu_client.ValidationError", new_callable=MagicMock) as ValidationError:
 #    from pydantic import ValidationError as RealValidationError
 
-from fawlty.sensu_client import SensuClient, ValidationError
+from fawlty.sensu_client import SensuClient, SensuHTTPAdapter, ValidationError, list_adapter
 from fawlty.sensu_token import SensuToken
 from fawlty.sensu_server import SensuServer
+from fawlty.retry import RetryPolicy
+from fawlty.cache import ResponseCache
+from fawlty.lazy import LazyResource
+from fawlty.metrics import ClientMetrics
+from fawlty.ratelimit import RateLimiter, AIMDLimiter
+from fawlty.token_cache import FileTokenCache
+from fawlty.deadline import deadline, request_timeout, remaining
+from fawlty.resources.namespace import Namespace
+from fawlty.resources.check import Check
+from fawlty.resources.apikey import APIKey
 
 from fawlty.exceptions import (
     SensuConnectionError, SensuNeedRefresh,
     SensuAuthError, SensuNeedLogin,
-    SensuResourceError, SensuError
+    SensuResourceError, SensuError,
+    SensuResourceMissingError, SensuResourceExistsError, SensuTimeoutError
 )
 
 @pytest.fixture
@@ -48,6 +67,38 @@ class TestCallFilter:
             sensu_client.call_filter()
 
 
+class TestConfigureSession:
+
+    def test_no_server(self):
+        client = SensuClient()
+        assert not isinstance(client.session.get_adapter("http://localhost"), SensuHTTPAdapter)
+
+    def test_pool_settings(self):
+        server = SensuServer(host="localhost", pool_connections=4, pool_maxsize=32, pool_block=True)
+        client = SensuClient(server=server)
+        adapter = client.session.get_adapter(server.api_url)
+        assert isinstance(adapter, SensuHTTPAdapter)
+        assert adapter.poolmanager.connection_pool_kw["maxsize"] == 32
+        assert adapter.poolmanager.connection_pool_kw["block"] is True
+        assert adapter.poolmanager.connection_pool_kw["ssl_context"] is server.ssl_context()
+        assert (socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1) in adapter.socket_options
+        assert client.session.verify is True
+
+    def test_ignore_cert(self):
+        client = SensuClient(server=SensuServer(host="localhost", use_ssl=True, ignore_cert=True))
+        assert client.session.verify is False
+
+    def test_no_keep_alive(self, sensu_client):
+        sensu_client.server = SensuServer(host="localhost", keep_alive=False)
+        assert sensu_client.session.headers["Connection"] == "close"
+        sensu_client.server = SensuServer(host="localhost")
+        assert "Connection" not in sensu_client.session.headers
+
+    def test_accept_encoding(self):
+        client = SensuClient(server=SensuServer(host="localhost", accept_encoding="identity"))
+        assert client.session.headers["Accept-Encoding"] == "identity"
+
+
 class TestMakeCall:
 
     @patch("fawlty.sensu_client.requests.Session.request")
@@ -57,6 +108,46 @@ class TestMakeCall:
         response = sensu_client._make_call("GET", "/test")
         assert response.status_code == 200
 
+    @patch("fawlty.sensu_client.requests.Session.request")
+    def test_serializes_body(self, mock_request, sensu_client):
+        sensu_client._make_call("POST", "/test", fields=Namespace(name="a"))
+        assert json.loads(mock_request.call_args.kwargs["data"]) == {"name": "a"}
+
+        sensu_client._make_call("POST", "/test", fields={"a": 1})
+        assert json.loads(mock_request.call_args.kwargs["data"]) == {"a": 1}
+
+        sensu_client._make_call("POST", "/test", fields="raw")
+        assert mock_request.call_args.kwargs["data"] == "raw"
+
+    @patch("fawlty.sensu_client.requests.Session.request")
+    def test_custom_serializer(self, mock_request, sensu_client):
+        sensu_client.serializer = MagicMock(dumps=MagicMock(return_value=b"{}"))
+        sensu_client._make_call("POST", "/test", fields={"a": 1})
+        sensu_client.serializer.dumps.assert_called_once_with({"a": 1})
+        assert mock_request.call_args.kwargs["data"] == b"{}"
+
+    @patch("fawlty.sensu_client.requests.Session.request")
+    def test_compresses_large_body(self, mock_request, sensu_client):
+        sensu_client.server = SensuServer(host="localhost", compress_requests_over=100)
+        sensu_client._make_call("POST", "/test", fields={"a": "b" * 200}, headers={"X": "y"})
+        kwargs = mock_request.call_args.kwargs
+        assert kwargs["headers"] == {"X": "y", "Content-Encoding": "gzip"}
+        assert json.loads(gzip.decompress(kwargs["data"])) == {"a": "b" * 200}
+
+        sensu_client._make_call("POST", "/test", fields={"a": "b"})
+        assert mock_request.call_args.kwargs["headers"] is None
+        assert json.loads(mock_request.call_args.kwargs["data"]) == {"a": "b"}
+
+    @patch("fawlty.sensu_client.requests.Session.request")
+    def test_timeout(self, mock_request, sensu_client):
+        sensu_client.server = SensuServer(host="localhost", connect_timeout=1, read_timeout=5)
+        sensu_client._make_call("GET", "/test")
+        assert mock_request.call_args.kwargs["timeout"] == (1, 5)
+
+        sensu_client.timeout = 2
+        sensu_client._make_call("GET", "/test")
+        assert mock_request.call_args.kwargs["timeout"] == 2
+
     @patch("fawlty.sensu_client.requests.Session.request")
     def test_need_refresh(self, mock_request, sensu_client):
         sensu_client.token = MagicMock(is_expired=lambda: False, need_refresh=lambda: True)
@@ -68,15 +159,373 @@ class TestMakeCall:
         sensu_client.refresh_token.assert_called_once()
 
 
+class TestRetries:
+
+    @pytest.fixture
+    def policy(self):
+        return RetryPolicy(max_attempts=3, backoff_factor=0.5, jitter=False)
+
+    @patch("fawlty.sensu_client.time.sleep")
+    @patch("fawlty.sensu_client.requests.Session.request")
+    def test_retries_status(self, mock_request, mock_sleep, sensu_client, policy):
+        sensu_client.retry_policy = policy
+        mock_request.side_effect = [
+            MagicMock(status_code=503, headers={}),
+            MagicMock(status_code=429, headers={"Retry-After": "2"}),
+            MagicMock(status_code=200, headers={}),
+        ]
+        assert sensu_client._make_call("GET", "/test").status_code == 200
+        assert [_.args[0] for _ in mock_sleep.call_args_list] == [0.5, 2.0]
+        assert policy.stats()["retries"] == 2
+
+    @patch("fawlty.sensu_client.time.sleep")
+    @patch("fawlty.sensu_client.requests.Session.request")
+    def test_gives_up(self, mock_request, mock_sleep, sensu_client, policy):
+        mock_request.return_value = MagicMock(status_code=503, headers={})
+        r = sensu_client._make_call("GET", "/test", retry_policy=policy)
+        assert r.status_code == 503
+        assert mock_request.call_count == 3
+
+    @patch("fawlty.sensu_client.time.sleep")
+    @patch("fawlty.sensu_client.requests.Session.request")
+    def test_connection_error(self, mock_request, mock_sleep, sensu_client, policy):
+        sensu_client.retry_policy = policy
+        mock_request.side_effect = requests.ConnectionError("boom")
+        with pytest.raises(SensuConnectionError):
+            sensu_client._make_call("GET", "/test")
+        assert mock_request.call_count == 3
+
+    @patch("fawlty.sensu_client.requests.Session.request")
+    def test_no_policy(self, mock_request, sensu_client):
+        mock_request.return_value = MagicMock(status_code=503, headers={})
+        assert sensu_client._make_call("GET", "/test").status_code == 503
+        mock_request.side_effect = requests.ConnectionError("boom")
+        with pytest.raises(SensuConnectionError):
+            sensu_client._make_call("GET", "/test")
+
+    def test_policy_resolution(self, sensu_client, policy):
+        class_policy = RetryPolicy()
+        op_policy = RetryPolicy()
+
+        class Resource:
+            RETRY_POLICY = class_policy
+            RETRY_POLICIES = {"create": op_policy}
+
+        sensu_client.retry_policy = policy
+        assert sensu_client._retry_policy_for(Resource, "create") is op_policy
+        assert sensu_client._retry_policy_for(Resource, "get") is class_policy
+        assert sensu_client._retry_policy_for(MagicMock, "get") is policy
+
+    @patch("fawlty.sensu_client.SensuClient._make_call")
+    def test_resource_get_uses_class_policy(self, mock_make_call, sensu_client, policy):
+        class Resource(Namespace):
+            RETRY_POLICIES = {"get": policy}
+
+        mock_make_call.return_value = MagicMock(status_code=200, content=b"[]")
+        sensu_client.resource_get(Resource, "/test")
+        assert mock_make_call.call_args.kwargs["retry_policy"] is policy
+
+
+class TestDeadlines:
+
+    @patch("fawlty.sensu_client.requests.Session.request")
+    def test_per_call_timeout(self, mock_request, sensu_client):
+        sensu_client.timeout = 30
+        sensu_client._make_call("GET", "/test", timeout=2)
+        assert mock_request.call_args.kwargs["timeout"] == 2
+        with request_timeout(3):
+            sensu_client._make_call("GET", "/test")
+        assert mock_request.call_args.kwargs["timeout"] == 3
+
+    @patch("fawlty.sensu_client.requests.Session.request")
+    def test_deadline_limits_timeout(self, mock_request, sensu_client):
+        sensu_client.timeout = 30
+        with deadline(1):
+            sensu_client._make_call("GET", "/test")
+        assert mock_request.call_args.kwargs["timeout"] <= 1
+
+    @patch("fawlty.sensu_client.requests.Session.request")
+    def test_expired(self, mock_request, sensu_client):
+        with deadline(0):
+            with pytest.raises(SensuTimeoutError):
+                sensu_client._make_call("GET", "/test")
+        mock_request.assert_not_called()
+
+    @patch("fawlty.sensu_client.requests.Session.request")
+    def test_timeout_error(self, mock_request, sensu_client):
+        mock_request.side_effect = requests.ReadTimeout("slow")
+        with pytest.raises(SensuTimeoutError):
+            sensu_client._make_call("GET", "/test")
+
+    @patch("fawlty.sensu_client.time.sleep")
+    @patch("fawlty.sensu_client.requests.Session.request")
+    def test_no_retry_past_deadline(self, mock_request, mock_sleep, sensu_client):
+        sensu_client.retry_policy = RetryPolicy(max_attempts=5, backoff_factor=10, jitter=False)
+        mock_request.return_value = MagicMock(status_code=503, headers={})
+        with deadline(5):
+            assert sensu_client._make_call("GET", "/test").status_code == 503
+        assert mock_request.call_count == 1
+
+    def test_refresh_bounded(self, sensu_client):
+        sensu_client._refresh_lock.acquire()
+        try:
+            with deadline(0.05):
+                with pytest.raises(SensuTimeoutError):
+                    sensu_client.single_flight_refresh()
+        finally:
+            sensu_client._refresh_lock.release()
+
+    @patch("fawlty.sensu_client.SensuClient._make_call")
+    def test_prefetch_sees_deadline(self, mock_make_call, sensu_client):
+        seen = []
+
+        def page(*args, **kwargs):
+            seen.append(remaining())
+            headers = {"Sensu-Continue": "next"} if len(seen) < 3 else {}
+            return MagicMock(status_code=200, content=b'[{"name": "a"}]', headers=headers)
+
+        mock_make_call.side_effect = page
+        with deadline(10):
+            assert len(list(sensu_client.resource_iter(Namespace, "/ns", page_size=1))) == 3
+        assert all(_ is not None for _ in seen)
+
+
+class TestMetrics:
+
+    @patch("fawlty.sensu_client.time.sleep")
+    @patch("fawlty.sensu_client.requests.Session.request")
+    def test_records_calls(self, mock_request, mock_sleep, sensu_client):
+        sensu_client.metrics = ClientMetrics()
+        sensu_client.retry_policy = RetryPolicy(max_attempts=2, jitter=False)
+        content = json.dumps([{"name": "ns1"}, {"name": "ns2"}]).encode()
+        mock_request.side_effect = [
+            MagicMock(status_code=503, headers={}),
+            MagicMock(status_code=200, headers={}, content=content),
+        ]
+
+        resources = sensu_client.resource_get(Namespace, "/api/core/v2/namespaces")
+        assert len(resources) == 2
+
+        snapshot = sensu_client.metrics.snapshot()
+        call, = snapshot["calls"]
+        assert call["endpoint"] == "/api/core/v2/namespaces"
+        assert call["resource"] == "Namespace"
+        assert call["statuses"] == {"200": 1}
+        assert call["retries"] == 1
+        assert call["bytes_in"] == len(content)
+        assert snapshot["decode"]["Namespace"]["count"] == 1
+        assert snapshot["validate"]["Namespace"]["count"] == 1
+
+    @patch("fawlty.sensu_client.requests.Session.request")
+    def test_records_failures(self, mock_request, sensu_client):
+        sensu_client.metrics = ClientMetrics()
+        mock_request.side_effect = requests.ConnectionError("refused")
+        with pytest.raises(SensuConnectionError):
+            sensu_client._make_call("POST", "/test", fields={"a": 1}, resource=Namespace)
+
+        call, = sensu_client.metrics.snapshot()["calls"]
+        assert call["statuses"] == {"error": 1}
+        assert call["bytes_out"] == len(b'{"a":1}')
+
+    @patch("fawlty.sensu_client.SensuClient._make_call")
+    def test_lazy_records_decode_only(self, mock_make_call, sensu_client):
+        sensu_client.metrics = ClientMetrics()
+        mock_make_call.return_value = MagicMock(status_code=200, content=b'[{"name": "a"}]')
+        resources = sensu_client.resource_get(Namespace, "/test", lazy=True)
+        assert resources[0].name == "a"
+
+        snapshot = sensu_client.metrics.snapshot()
+        assert snapshot["decode"]["Namespace"]["count"] == 1
+        assert snapshot["validate"] == {}
+
+    @patch("fawlty.sensu_client.SensuClient._make_call")
+    def test_resource_passed(self, mock_make_call, sensu_client):
+        mock_make_call.side_effect = TestResourceIter._pages(1, 1)
+        list(sensu_client.resource_iter(Namespace, "/test", page_size=1))
+        assert all(_.kwargs["resource"] is Namespace for _ in mock_make_call.call_args_list)
+
+
+class TestCoalescing:
+
+    @patch("fawlty.sensu_client.requests.Session.request")
+    def test_concurrent_gets(self, mock_request, sensu_client):
+        sensu_client.metrics = ClientMetrics()
+        release = threading.Event()
+
+        def respond(*args, **kwargs):
+            release.wait(1)
+            return MagicMock(status_code=200, content=b'[{"name": "ns1"}]', headers={})
+
+        mock_request.side_effect = respond
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(Namespace.get(sensu_client, name="ns1")))
+            for _ in range(4)
+        ]
+        for thread in threads:
+            thread.start()
+        time.sleep(0.1)
+        release.set()
+        for thread in threads:
+            thread.join()
+
+        assert mock_request.call_count == 1
+        assert [_[0].name for _ in results] == ["ns1"] * 4
+        assert len({id(_[0]) for _ in results}) == 4
+        assert sensu_client.single_flight.stats()["saved"] == 3
+        call, = sensu_client.metrics.snapshot()["calls"]
+        assert (call["requests"], call["coalesced"]) == (1, 3)
+
+    @pytest.mark.parametrize("lazy", [False, True])
+    @patch("fawlty.sensu_client.requests.Session.request")
+    def test_nested_copies_isolated(self, mock_request, sensu_client, lazy):
+        release = threading.Event()
+
+        def respond(*args, **kwargs):
+            release.wait(1)
+            return MagicMock(status_code=200, content=CHECK_JSON, headers={})
+
+        def get():
+            resources = sensu_client.resource_get(Check, "/checks", lazy=lazy)
+            results.append([_.materialize() for _ in resources] if lazy else resources)
+
+        mock_request.side_effect = respond
+        results = []
+        threads = [threading.Thread(target=get) for _ in range(3)]
+        for thread in threads:
+            thread.start()
+        time.sleep(0.1)
+        release.set()
+        for thread in threads:
+            thread.join()
+
+        assert mock_request.call_count == 1
+        results[0][0].metadata.labels["team"] = "changed"
+        assert [_[0].metadata.labels["team"] for _ in results[1:]] == ["web", "web"]
+
+    @patch("fawlty.sensu_client.SensuClient._make_call")
+    def test_disabled(self, mock_make_call, sensu_client):
+        sensu_client.single_flight = None
+        mock_make_call.return_value = MagicMock(status_code=200, content=b'[{"name": "ns1"}]')
+        assert sensu_client.resource_get(Namespace, "/test")[0].name == "ns1"
+
+
+class TestLimiters:
+
+    @patch("fawlty.sensu_client.requests.Session.request")
+    def test_rate_limited(self, mock_request, sensu_client):
+        sensu_client.rate_limiter = RateLimiter(per_namespace=50, namespace_burst=1)
+        mock_request.return_value = MagicMock(status_code=200)
+        start = time.monotonic()
+        for _ in range(3):
+            sensu_client._make_call("GET", "/api/core/v2/namespaces/a/checks")
+        sensu_client._make_call("GET", "/api/core/v2/namespaces/b/checks")
+        assert time.monotonic() - start == pytest.approx(0.04, abs=0.03)
+        assert sensu_client.rate_limiter.stats()["throttled"] == 2
+
+    @patch("fawlty.sensu_client.requests.Session.request")
+    def test_concurrency_adapts(self, mock_request, sensu_client):
+        limiter = AIMDLimiter(initial_limit=8)
+        sensu_client.concurrency_limiter = limiter
+        mock_request.return_value = MagicMock(status_code=503, headers={})
+        sensu_client._make_call("GET", "/test")
+        assert limiter.stats() == {
+            "limit": 4, "in_flight": 0, "decreases": 1, "baseline_latency": None
+        }
+
+    @patch("fawlty.sensu_client.requests.Session.request")
+    def test_concurrency_released_on_error(self, mock_request, sensu_client):
+        sensu_client.concurrency_limiter = AIMDLimiter(initial_limit=8)
+        mock_request.side_effect = requests.ConnectionError("refused")
+        with pytest.raises(SensuConnectionError):
+            sensu_client._make_call("GET", "/test")
+        assert sensu_client.concurrency_limiter.in_flight == 0
+
+    @patch("fawlty.sensu_client.requests.Session.request")
+    def test_bulk_respects_limit(self, mock_request, sensu_client):
+        sensu_client.concurrency_limiter = AIMDLimiter(initial_limit=2, max_limit=2)
+        lock = threading.Lock()
+        in_flight = [0, 0]
+
+        def respond(*args, **kwargs):
+            with lock:
+                in_flight[0] += 1
+                in_flight[1] = max(in_flight)
+            time.sleep(0.01)
+            with lock:
+                in_flight[0] -= 1
+            return MagicMock(status_code=204)
+
+        mock_request.side_effect = respond
+        objs = [MagicMock(urlify=lambda i=i: f"/obj{i}") for i in range(12)]
+        result = sensu_client.bulk_apply(objs, op="delete", concurrency=6)
+        assert len(result.succeeded) == 12
+        assert in_flight[1] == 2
+
+
+class TestSingleFlightRefresh:
+
+    def test_only_one_refresh(self, sensu_client):
+        calls = []
+
+        def refresh():
+            calls.append(1)
+            time.sleep(0.05)
+            sensu_client.token = SensuToken(access_token="new", refresh_token="r", expires_at=int(time.time()) + 1000)
+            return True
+
+        sensu_client.refresh_token = refresh
+        stale = sensu_client.token
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(sensu_client.single_flight_refresh(stale)))
+            for _ in range(16)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert len(calls) == 1
+        assert results.count(True) == 1
+        assert sensu_client.token.access_token == "new"
+
+    def test_call_passes_stale_token(self, sensu_client):
+        stale = SensuToken(access_token="old", refresh_token="r", expires_at=int(time.time()) + 10)
+        fresh = SensuToken(access_token="new", refresh_token="r", expires_at=int(time.time()) + 1000)
+        sensu_client.token = stale
+
+        def call_filter():
+            # Another thread refreshes between reading the token and checking it
+            sensu_client.token = fresh
+            raise SensuNeedRefresh()
+
+        sensu_client.call_filter = call_filter
+        sensu_client.refresh_token = MagicMock()
+        with patch.object(sensu_client, "_throttled_send", return_value=MagicMock(status_code=200)):
+            sensu_client._make_call("GET", "/api/core/v2/namespaces")
+        sensu_client.refresh_token.assert_not_called()
+        assert sensu_client.token is fresh
+
+    @patch("fawlty.sensu_client.TokenRefresher")
+    def test_token_refresher(self, mock_refresher, sensu_client):
+        refresher = sensu_client.start_token_refresher(lead_time=10)
+        mock_refresher.assert_called_once_with(sensu_client, lead_time=10)
+        refresher.start.assert_called_once()
+        sensu_client.stop_token_refresher()
+        refresher.stop.assert_called_once()
+        assert sensu_client.token_refresher is None
+
+
 class TestLogin:
 
-    @patch("fawlty.sensu_client.requests.Session.get")
+    @patch("fawlty.sensu_client.requests.Session.request")
     def test_success(self, mock_get, sensu_client):
         mock_get.return_value = MagicMock(status_code=200, json=lambda: {"access_token": "token", "refresh_token": "refresh", "expires_at": int(time.time()) + 100})
         assert sensu_client.login("user", "pass") is True
         assert sensu_client.token.access_token == "token"
 
-    @patch("fawlty.sensu_client.requests.Session.get")
+    @patch("fawlty.sensu_client.requests.Session.request")
     def test_failure(self, mock_get, sensu_client):
         mock_get.return_value = MagicMock(status_code=401)
         with pytest.raises(SensuAuthError):
@@ -100,13 +549,136 @@ class TestRefreshToken:
             sensu_client.refresh_token()
 
 
+class TestTokenCache:
+
+    @pytest.fixture
+    def cached_client(self, tmp_path):
+        client = SensuClient(
+            server=SensuServer(host="localhost"), token_cache=FileTokenCache(str(tmp_path))
+        )
+        return client
+
+    @staticmethod
+    def token_json(access, expires_in=600):
+        return lambda: {"access_token": access, "refresh_token": f"{access}-refresh", "expires_at": int(time.time()) + expires_in}
+
+    @patch("fawlty.sensu_client.requests.Session.request")
+    def test_login_stores_token(self, mock_request, cached_client):
+        mock_request.return_value = MagicMock(status_code=200, json=self.token_json("token"))
+        assert cached_client.login("user", "pass") is True
+        cached = cached_client.token_cache.load(cached_client.server.api_url, "user")
+        assert cached == cached_client.token
+
+    @patch("fawlty.sensu_client.requests.Session.request")
+    def test_login_reuses_token(self, mock_request, cached_client):
+        token = SensuToken(**self.token_json("cached")())
+        cached_client.token_cache.store(cached_client.server.api_url, "user", token)
+        assert cached_client.login("user", "pass") is True
+        mock_request.assert_not_called()
+        assert cached_client.token == token
+        assert cached_client.session.headers["Authorization"] == "Bearer cached"
+
+    @patch("fawlty.sensu_client.requests.Session.request")
+    def test_login_replaces_stale_token(self, mock_request, cached_client):
+        stale = SensuToken(**self.token_json("stale", expires_in=30)())
+        cached_client.token_cache.store(cached_client.server.api_url, "user", stale)
+        mock_request.return_value = MagicMock(status_code=200, json=self.token_json("token"))
+        cached_client.login("user", "pass")
+        mock_request.assert_called_once()
+        assert cached_client.token_cache.load(cached_client.server.api_url, "user").access_token == "token"
+
+    @patch("fawlty.sensu_client.SensuClient._make_call")
+    def test_refresh_stores_token(self, mock_make_call, cached_client):
+        cached_client._token_user = "user"
+        cached_client.token = SensuToken(**self.token_json("old", expires_in=30)())
+        mock_make_call.return_value = MagicMock(status_code=200, json=self.token_json("new"))
+        assert cached_client.refresh_token() is True
+        assert cached_client.token.access_token == "new"
+        assert cached_client.token_cache.load(cached_client.server.api_url, "user").access_token == "new"
+
+    @patch("fawlty.sensu_client.SensuClient._make_call")
+    def test_refresh_uses_other_process_token(self, mock_make_call, cached_client):
+        cached_client._token_user = "user"
+        cached_client.token = SensuToken(**self.token_json("old", expires_in=30)())
+        other = SensuToken(**self.token_json("other")())
+        cached_client.token_cache.store(cached_client.server.api_url, "user", other)
+        assert cached_client.refresh_token() is True
+        mock_make_call.assert_not_called()
+        assert cached_client.token == other
+        assert cached_client.session.headers["Authorization"] == "Bearer other"
+
+
+class TestAPIKeyAuth:
+
+    def test_init(self):
+        client = SensuClient(server=SensuServer(host="localhost"), api_key="abc")
+        assert client.api_key == "abc"
+        assert client.session.headers["Authorization"] == "Key abc"
+        client.call_filter()
+
+    def test_use_api_key(self, sensu_client):
+        sensu_client.use_api_key("abc")
+        assert sensu_client.token is None
+        assert sensu_client.session.headers["Authorization"] == "Key abc"
+
+    @patch("fawlty.sensu_client.requests.Session.request")
+    def test_no_refresh(self, mock_request, sensu_client):
+        mock_request.return_value = MagicMock(status_code=200)
+        sensu_client.use_api_key("abc")
+        with patch.object(sensu_client, "single_flight_refresh") as refresh:
+            sensu_client._make_call("GET", "/api/core/v2/namespaces")
+        refresh.assert_not_called()
+        mock_request.assert_called_once()
+
+    @patch("fawlty.sensu_client.requests.Session.request")
+    def test_login_replaces_key(self, mock_request):
+        client = SensuClient(server=SensuServer(host="localhost"), api_key="abc")
+        mock_request.return_value = MagicMock(status_code=200, json=lambda: {"access_token": "token", "refresh_token": "refresh", "expires_at": int(time.time()) + 100})
+        client.login("user", "pass")
+        assert client.api_key is None
+        assert client.session.headers["Authorization"] == "Bearer token"
+
+    @patch("fawlty.sensu_client.SensuClient._make_call")
+    def test_bulk_create_keys(self, mock_make_call, sensu_client):
+        keys = iter(["k1", "k2", "k3"])
+        mock_make_call.side_effect = lambda **kwargs: MagicMock(
+            status_code=201, headers={"Location": f"/api/core/v2/apikeys/{next(keys)}"}
+        )
+        objs = [APIKey(username=f"user{i}") for i in range(3)]
+        result = sensu_client.bulk_apply(objs, op="create", concurrency=1)
+        assert len(result.succeeded) == 3
+        assert [_.key for _ in objs] == ["k1", "k2", "k3"]
+        assert mock_make_call.call_args.kwargs["path"] == "/api/core/v2/apikeys"
+
+
 class TestResourceGet:
 
     @patch("fawlty.sensu_client.SensuClient._make_call")
     def test_success(self, mock_make_call, sensu_client):
-        mock_make_call.return_value = MagicMock(status_code=200, json=lambda: [{}])
-        resources = sensu_client.resource_get(MagicMock, "/test")
+        mock_make_call.return_value = MagicMock(status_code=200, content=b'[{"name": "a"}]')
+        resources = sensu_client.resource_get(Namespace, "/test")
         assert len(resources) == 1
+        assert resources[0].name == "a"
+        assert resources[0]._sensu_client is sensu_client
+
+    @patch("fawlty.sensu_client.SensuClient._make_call")
+    def test_lazy(self, mock_make_call, sensu_client):
+        sensu_client.response_cache = ResponseCache()
+        mock_make_call.return_value = MagicMock(status_code=200, content=b'[{"name": "a"}]')
+        resources = sensu_client.resource_get(Namespace, "/test", lazy=True)
+        assert isinstance(resources[0], LazyResource)
+        assert resources[0].name == "a"
+        assert resources[0].materialize()._sensu_client is sensu_client
+        assert len(sensu_client.response_cache) == 0
+
+    def test_adapter_cached(self):
+        assert list_adapter(Namespace) is list_adapter(Namespace)
+
+    @patch("fawlty.sensu_client.SensuClient._make_call")
+    def test_invalid_body(self, mock_make_call, sensu_client):
+        mock_make_call.return_value = MagicMock(status_code=200, content=b'[{"name": 1}]')
+        with pytest.raises(ValidationError):
+            sensu_client.resource_get(Namespace, "/test")
 
     @patch("fawlty.sensu_client.SensuClient._make_call")
     def test_failure(self, mock_make_call, sensu_client):
@@ -115,6 +687,203 @@ class TestResourceGet:
             sensu_client.resource_get(MagicMock, "/test")
 
 
+CHECK_JSON = (
+    b'[{"command": "echo", "subscriptions": ["linux"],'
+    b' "metadata": {"name": "c", "namespace": "default", "labels": {"team": "web"}}}]'
+)
+
+
+class TestResponseCache:
+
+    @pytest.fixture
+    def cached_client(self, sensu_client):
+        sensu_client.response_cache = ResponseCache(ttl=60)
+        return sensu_client
+
+    @staticmethod
+    def _response(status=200, etag="v1"):
+        return MagicMock(
+            status_code=status, json=lambda: [{"name": "a"}], headers={"ETag": etag},
+            content=b'[{"name": "a"}]'
+        )
+
+    @patch("fawlty.sensu_client.SensuClient._make_call")
+    def test_fresh_hit(self, mock_make_call, cached_client):
+        mock_make_call.return_value = self._response()
+        first = cached_client.resource_get(Namespace, "/ns")
+        second = cached_client.resource_get(Namespace, "/ns")
+        assert mock_make_call.call_count == 1
+        assert second[0].name == "a"
+        assert second[0] is not first[0]
+        assert second[0]._sensu_client is cached_client
+        assert cached_client.response_cache.bytes_used == len(b'[{"name": "a"}]')
+
+    @patch("fawlty.sensu_client.SensuClient._make_call")
+    def test_copies_isolated(self, mock_make_call, cached_client):
+        mock_make_call.return_value = self._response()
+        cached_client.resource_get(Namespace, "/ns")[0].name = "changed"
+        assert cached_client.resource_get(Namespace, "/ns")[0].name == "a"
+
+    @patch("fawlty.sensu_client.SensuClient._make_call")
+    def test_nested_copies_isolated(self, mock_make_call, cached_client):
+        mock_make_call.return_value = MagicMock(
+            status_code=200, headers={"ETag": "v1"}, content=CHECK_JSON
+        )
+        first = cached_client.resource_get(Check, "/checks")[0]
+        first.metadata.labels["team"] = "changed"
+        first.subscriptions.append("windows")
+        second = cached_client.resource_get(Check, "/checks")[0]
+        assert mock_make_call.call_count == 1
+        assert second.metadata.labels == {"team": "web"}
+        assert second.subscriptions == ["linux"]
+        assert second._sensu_client is cached_client
+
+    @patch("fawlty.sensu_client.SensuClient._make_call")
+    def test_not_modified(self, mock_make_call, cached_client):
+        cached_client.response_cache.ttl = 0
+        mock_make_call.side_effect = [self._response(), MagicMock(status_code=304)]
+        cached_client.resource_get(Namespace, "/ns")
+        resources = cached_client.resource_get(Namespace, "/ns")
+        assert resources[0].name == "a"
+        assert mock_make_call.call_args.kwargs["headers"] == {"If-None-Match": "v1"}
+        assert cached_client.response_cache.stats()["revalidations"] == 1
+
+    @patch("fawlty.sensu_client.SensuClient._make_call")
+    def test_stale_while_revalidate(self, mock_make_call, cached_client):
+        cached_client.response_cache.ttl = 0
+        cached_client.response_cache.stale_while_revalidate = 60
+        revalidated = threading.Event()
+        responses = iter([self._response(), MagicMock(status_code=304)])
+
+        def make_call(*args, **kwargs):
+            response = next(responses)
+            if response.status_code == 304:
+                revalidated.set()
+            return response
+
+        mock_make_call.side_effect = make_call
+        cached_client.resource_get(Namespace, "/ns")
+        assert cached_client.resource_get(Namespace, "/ns")[0].name == "a"
+        assert revalidated.wait(2)
+        assert cached_client.response_cache.stats()["stale_hits"] == 1
+
+    @patch("fawlty.sensu_client.SensuClient._make_call")
+    def test_write_invalidates(self, mock_make_call, cached_client):
+        mock_make_call.return_value = self._response()
+        namespace = cached_client.resource_get(Namespace, "/api/core/v2/namespaces")[0]
+        mock_make_call.return_value = MagicMock(status_code=204)
+        cached_client.resource_delete(namespace)
+        assert len(cached_client.response_cache) == 0
+
+    @patch("fawlty.sensu_client.SensuClient._make_call")
+    def test_write_invalidates_all_namespaces(self, mock_make_call, cached_client):
+        mock_make_call.return_value = MagicMock(
+            status_code=200, headers={"ETag": "v1"}, content=CHECK_JSON
+        )
+        check = cached_client.resource_get(Check, "/api/core/v2/checks")[0]
+        cached_client.resource_get(Check, "/api/core/v2/namespaces/default/checks")
+        mock_make_call.return_value = self._response()
+        cached_client.resource_get(Namespace, "/api/core/v2/namespaces")
+        mock_make_call.return_value = MagicMock(status_code=204)
+        cached_client.resource_delete(check)
+        assert len(cached_client.response_cache) == 1
+
+
+class TestResourceStream:
+
+    @staticmethod
+    def _response(body, status=200):
+        r = MagicMock(status_code=status, text="Error")
+        r.iter_content = lambda chunk_size: (body[i:i + 4] for i in range(0, len(body), 4))
+        return r
+
+    @pytest.mark.parametrize("spool_threshold", [None, 10])
+    @patch("fawlty.sensu_client.SensuClient._make_call")
+    def test_stream(self, mock_make_call, sensu_client, spool_threshold):
+        r = self._response(b'[{"name": "a"}, {"name": "b"}]')
+        mock_make_call.return_value = r
+        resources = list(sensu_client.resource_stream(Namespace, "/ns", spool_threshold=spool_threshold))
+        assert [_.name for _ in resources] == ["a", "b"]
+        assert resources[0]._sensu_client is sensu_client
+        assert mock_make_call.call_args.kwargs["stream"] is True
+        r.close.assert_called()
+
+    @patch("fawlty.sensu_client.SensuClient._make_call")
+    def test_gzip_response(self, mock_make_call, sensu_client):
+        body = json.dumps([{"name": f"ns{_}"} for _ in range(1000)]).encode()
+        r = requests.Response()
+        r.status_code = 200
+        r.raw = urllib3.HTTPResponse(
+            body=io.BytesIO(gzip.compress(body)), headers={"Content-Encoding": "gzip"},
+            preload_content=False,
+        )
+        mock_make_call.return_value = r
+        resources = list(sensu_client.resource_stream(Namespace, "/ns", chunk_size=256))
+        assert len(resources) == 1000
+        assert resources[-1].name == "ns999"
+
+    @patch("fawlty.sensu_client.SensuClient._make_call")
+    def test_failure(self, mock_make_call, sensu_client):
+        mock_make_call.return_value = self._response(b"", status=500)
+        with pytest.raises(SensuError):
+            list(sensu_client.resource_stream(Namespace, "/ns"))
+
+
+class TestResourceIter:
+
+    @staticmethod
+    def _pages(*sizes):
+        responses = []
+        for i, page in enumerate(sizes):
+            headers = {"Sensu-Continue": f"token{i}"} if i < len(sizes) - 1 else {}
+            content = json.dumps([{"name": f"ns{_}"} for _ in range(page)]).encode()
+            responses.append(MagicMock(status_code=200, content=content, headers=headers))
+        return responses
+
+    @pytest.mark.parametrize("prefetch", [True, False])
+    @patch("fawlty.sensu_client.SensuClient._make_call")
+    def test_follows_continue(self, mock_make_call, sensu_client, prefetch):
+        mock_make_call.side_effect = self._pages(2, 2, 1)
+        resources = list(sensu_client.resource_iter(Namespace, "/test", page_size=2, prefetch=prefetch))
+        assert len(resources) == 5
+        assert mock_make_call.call_count == 3
+        params = [c.kwargs["params"] for c in mock_make_call.call_args_list]
+        assert params[0] == {"limit": 2}
+        assert params[1] == {"limit": 2, "continue": "token0"}
+        assert params[2] == {"limit": 2, "continue": "token1"}
+
+    @patch("fawlty.sensu_client.SensuClient._make_call")
+    def test_extra_params(self, mock_make_call, sensu_client):
+        mock_make_call.side_effect = self._pages(1)
+        list(sensu_client.resource_iter(Namespace, "/test", page_size=5, params={"a": "b"}))
+        assert mock_make_call.call_args.kwargs["params"] == {"a": "b", "limit": 5}
+
+    @patch("fawlty.sensu_client.SensuClient._make_call")
+    def test_empty_page_stops(self, mock_make_call, sensu_client):
+        mock_make_call.side_effect = self._pages(0, 1)
+        assert not list(sensu_client.resource_iter(Namespace, "/test", page_size=2))
+        assert mock_make_call.call_count == 1
+
+    @patch("fawlty.sensu_client.SensuClient._make_call")
+    def test_failure(self, mock_make_call, sensu_client):
+        mock_make_call.return_value = MagicMock(status_code=500, text="Error")
+        with pytest.raises(SensuError):
+            list(sensu_client.resource_iter(Namespace, "/test"))
+
+    @patch("fawlty.sensu_client.SensuClient._make_call")
+    def test_lazy(self, mock_make_call, sensu_client):
+        mock_make_call.side_effect = self._pages(1, 1)
+        resources = sensu_client.resource_get(Namespace, "/test", page_size=1, lazy=True)
+        assert [_.name for _ in resources] == ["ns0", "ns0"]
+        assert all(isinstance(_, LazyResource) for _ in resources)
+
+    @patch("fawlty.sensu_client.SensuClient._make_call")
+    def test_resource_get_paged(self, mock_make_call, sensu_client):
+        mock_make_call.side_effect = self._pages(1, 1)
+        resources = sensu_client.resource_get(Namespace, "/test", page_size=1)
+        assert len(resources) == 2
+
+
 class TestResourcePost:
 
     @patch("fawlty.sensu_client.SensuClient._make_call")
@@ -132,6 +901,19 @@ class TestResourcePost:
         with pytest.raises(SensuResourceError):
             sensu_client.resource_post(obj)
 
+    @pytest.mark.parametrize("status, error", [
+        (409, SensuResourceExistsError),
+        (404, SensuResourceMissingError),
+        (500, SensuResourceError),
+    ])
+    @patch("fawlty.sensu_client.SensuClient._make_call")
+    def test_failure(self, mock_make_call, sensu_client, status, error):
+        mock_make_call.return_value = MagicMock(status_code=status, text="Oops")
+        obj = MagicMock()
+        obj.model_dump = MagicMock(return_value={})
+        with pytest.raises(error):
+            sensu_client.resource_post(obj)
+
 
 class TestResourcePut:
 
@@ -157,4 +939,24 @@ class TestResourceDelete:
     def test_success(self, mock_make_call, sensu_client):
         mock_make_call.return_value = MagicMock(status_code=204)
         obj = MagicMock()
-        assert sensu_client.resource_delete(obj) is True
\ No newline at end of file
+        assert sensu_client.resource_delete(obj) is True
+
+    @patch("fawlty.sensu_client.SensuClient._make_call")
+    def test_failure(self, mock_make_call, sensu_client):
+        mock_make_call.return_value = MagicMock(status_code=404, text="Not Found")
+        with pytest.raises(SensuResourceMissingError):
+            sensu_client.resource_delete(MagicMock())
+
+
+class TestBulkApply:
+
+    @patch("fawlty.sensu_client.SensuClient._make_call")
+    def test_bulk_apply(self, mock_make_call, sensu_client):
+        mock_make_call.side_effect = lambda **kwargs: MagicMock(
+            status_code=500 if kwargs["path"] == "/fail" else 204, text="Error"
+        )
+        objs = [MagicMock(urlify=lambda path=path: path) for path in ["/a", "/fail", "/b"]]
+        result = sensu_client.bulk_apply(objs, op="delete", concurrency=2)
+        assert len(result.succeeded) == 2
+        assert result.failed[0].obj is objs[1]
+        assert isinstance(result.failed[0].error, SensuResourceError)
\ No newline at end of file
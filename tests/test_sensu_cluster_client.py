@@ -0,0 +1,160 @@
+"""
+Tests for the fawlty.sensu_cluster_client module
+"""
+import threading
+import time
+from unittest.mock import patch, MagicMock
+
+import pytest
+import requests
+from pydantic import ValidationError
+from urllib3.exceptions import MaxRetryError, NewConnectionError
+
+from fawlty.sensu_cluster import SensuCluster
+from fawlty.sensu_cluster_client import SensuClusterClient, _never_sent
+from fawlty.sensu_server import SensuServer
+from fawlty.sensu_token import SensuToken
+from fawlty.exceptions import SensuConnectionError
+
+
+def make_client(**kwargs):
+    cluster = SensuCluster(backends=[SensuServer(host=f"backend{i}") for i in range(3)], **kwargs)
+    client = SensuClusterClient(cluster)
+    client.token = SensuToken(access_token="token", refresh_token="refresh", expires_at=int(time.time()) + 100)
+    return client
+
+
+class FakeCluster:
+    """
+    Stands in for Session.request, answering by backend host
+    """
+
+    def __init__(self, down=(), slow=(), delay=0.5):
+        self.down = down
+        self.slow = slow
+        self.delay = delay
+        self.hosts = []
+
+    def __call__(self, method, url, **kwargs):
+        host = url.split("//")[1].split(":")[0]
+        self.hosts.append(host)
+        if host in self.down:
+            raise requests.ConnectionError("Connection refused")
+        if host in self.slow:
+            time.sleep(self.delay)
+        return MagicMock(status_code=200, host=host)
+
+
+def test_cluster_needs_backends():
+    with pytest.raises(ValidationError):
+        SensuCluster(backends=[])
+
+
+class TestFailover:
+
+    def test_spreads_load(self):
+        client = make_client()
+        fake = FakeCluster()
+        with patch("fawlty.sensu_cluster_client.requests.Session.request", side_effect=fake):
+            for _ in range(60):
+                client._make_call("GET", "/test")
+        assert sorted(set(fake.hosts)) == ["backend0", "backend1", "backend2"]
+
+    def test_fails_over(self):
+        client = make_client(failure_threshold=1)
+        fake = FakeCluster(down=("backend0", "backend1"))
+        # Ties are broken at random, so fix the order: the dead backends are picked first
+        with patch("fawlty.sensu_cluster_client.requests.Session.request", side_effect=fake), \
+                patch("fawlty.balancer.random.random", return_value=0.0):
+            for _ in range(5):
+                assert client._make_call("GET", "/test").host == "backend2"
+        # The dead backends are ejected after their first failure
+        assert fake.hosts.count("backend0") == 1
+        assert fake.hosts.count("backend1") == 1
+
+    def test_all_down(self):
+        client = make_client()
+        fake = FakeCluster(down=("backend0", "backend1", "backend2"))
+        with patch("fawlty.sensu_cluster_client.requests.Session.request", side_effect=fake):
+            with pytest.raises(SensuConnectionError):
+                client._make_call("GET", "/test")
+        assert len(fake.hosts) == 3
+
+    def test_post_not_resent(self):
+        client = make_client()
+        fake = FakeCluster(down=("backend0", "backend1", "backend2"))
+        with patch("fawlty.sensu_cluster_client.requests.Session.request", side_effect=fake):
+            with pytest.raises(SensuConnectionError):
+                client._make_call("POST", "/test", fields={})
+        assert len(fake.hosts) == 1
+
+    def test_never_sent(self):
+        refused = NewConnectionError(None, "refused")
+        assert _never_sent(requests.ConnectionError(MaxRetryError(None, "/", refused)))
+        assert _never_sent(requests.ConnectTimeout())
+        assert not _never_sent(requests.ConnectionError("Connection reset"))
+
+    def test_login(self):
+        client = make_client()
+        response = MagicMock(status_code=200, json=lambda: {"access_token": "a", "refresh_token": "r", "expires_at": int(time.time()) + 100})
+        fake = FakeCluster(down=("backend0",))
+        with patch("fawlty.sensu_cluster_client.requests.Session.request", side_effect=lambda *a, **k: fake(*a, **k) and response):
+            client.balancer.mark_health(client.balancer.backends[1], False)
+            client.balancer.mark_health(client.balancer.backends[2], False)
+            assert client.login("user", "pass")
+        assert client.token.access_token == "a"
+
+
+class TestHedging:
+
+    def test_hedges_slow_backend(self):
+        client = make_client(hedge_after=0.05)
+        fake = FakeCluster(slow=("backend0",), delay=0.5)
+        client.balancer.backends[0].latency = 0.0
+        for backend in client.balancer.backends[1:]:
+            backend.latency = 1.0
+        client.balancer.strategy = "latency"
+        with patch("fawlty.sensu_cluster_client.requests.Session.request", side_effect=fake):
+            start = time.monotonic()
+            r = client._make_call("GET", "/test")
+            assert time.monotonic() - start < 0.4
+        assert r.host != "backend0"
+        assert client.hedged_requests == 1
+        client.close()
+
+    def test_no_hedge_when_fast(self):
+        client = make_client(hedge_after=1)
+        fake = FakeCluster()
+        with patch("fawlty.sensu_cluster_client.requests.Session.request", side_effect=fake):
+            client._make_call("GET", "/test")
+        assert client.hedged_requests == 0
+        assert len(fake.hosts) == 1
+        client.close()
+
+
+class TestHealthChecks:
+
+    def test_check_health(self):
+        client = make_client()
+
+        def get(url, **kwargs):
+            return MagicMock(status_code=503 if "backend1" in url else 200)
+
+        with patch("fawlty.sensu_cluster_client.requests.Session.get", side_effect=get):
+            client.check_health()
+        assert [_["healthy"] for _ in client.balancer.stats()] == [True, False, True]
+
+    def test_background(self):
+        client = make_client(health_interval=0.01)
+        probed = threading.Event()
+
+        def get(url, **kwargs):
+            probed.set()
+            raise requests.ConnectionError("down")
+
+        with patch("fawlty.sensu_cluster_client.requests.Session.get", side_effect=get):
+            client.start_health_checks()
+            assert probed.wait(2)
+            client.stop_health_checks(timeout=2)
+        assert not client._health_thread.is_alive()
+        assert not any(_["healthy"] for _ in client.balancer.stats())
@@ -2,6 +2,8 @@
 This module contains tests for the fawlty.sensu_server module
 """
 
+import ssl
+
 from fawlty.sensu_server import SensuServer
 
 def test_sensu_server_default_values():
@@ -11,6 +13,8 @@ def test_sensu_server_default_values():
     assert not server.use_ssl
     assert not server.ignore_cert
     assert server.api_url == "http://localhost:8080"
+    assert server.accept_encoding == "gzip, deflate"
+    assert server.compress_requests_over is None
 
 def test_sensu_server_custom_values():
     server = SensuServer(host="example.com", port=443, use_ssl=True, ignore_cert=True)
@@ -18,4 +22,22 @@ def test_sensu_server_custom_values():
     assert server.port == 443
     assert server.use_ssl
     assert server.ignore_cert
-    assert server.api_url == "https://example.com:443"
\ No newline at end of file
+    assert server.api_url == "https://example.com:443"
+
+def test_sensu_server_ssl_context():
+    server = SensuServer(host="example.com", use_ssl=True)
+    context = server.ssl_context()
+    assert context.verify_mode == ssl.CERT_REQUIRED
+    assert context.check_hostname
+    assert server.ssl_context() is context
+
+def test_sensu_server_ssl_context_ignore_cert():
+    server = SensuServer(host="example.com", use_ssl=True, ignore_cert=True)
+    context = server.ssl_context()
+    assert context.verify_mode == ssl.CERT_NONE
+    assert not context.check_hostname
+
+def test_sensu_server_timeout():
+    assert SensuServer(host="localhost").timeout() is None
+    server = SensuServer(host="localhost", connect_timeout=1.5, read_timeout=10)
+    assert server.timeout() == (1.5, 10)
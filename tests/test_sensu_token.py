@@ -32,4 +32,13 @@ class TestSensuToken:
 
         # Token that does not need refresh
         token_no_refresh = SensuToken(access_token="no_refresh", expires_at=int(time.time()) + 100, refresh_token="refresh")
-        assert token_no_refresh.need_refresh() is False
\ No newline at end of file
+        assert token_no_refresh.need_refresh() is False
+
+    def test_seconds_until_refresh(self):
+        """
+        Test cases for seconds_until_refresh method
+        """
+        token = SensuToken(access_token="token", expires_at=int(time.time()) + 100, refresh_token="refresh")
+        assert 39 <= token.seconds_until_refresh() <= 40
+        assert 9 <= token.seconds_until_refresh(lead_time=30) <= 10
+        assert token.seconds_until_refresh(lead_time=60) < 0
@@ -0,0 +1,53 @@
+"""
+Tests for the fawlty.serializers module
+"""
+import json
+
+import pytest
+
+from fawlty.resources.check import Check
+from fawlty.serializers import (
+    Serializer, JSONSerializer, PydanticSerializer, OrjsonSerializer, default_serializer
+)
+
+
+@pytest.fixture
+def check():
+    return Check(
+        command="echo é" * 100,
+        subscriptions=["linux"],
+        metadata={"name": "check", "namespace": "default"},
+        output_metric_thresholds=[
+            {"name": f"metric{i}", "thresholds": [{"max": "10", "status": 2}]} for i in range(10)
+        ],
+    )
+
+
+SERIALIZERS = [JSONSerializer, PydanticSerializer]
+try:
+    OrjsonSerializer()
+    SERIALIZERS.append(OrjsonSerializer)
+except Exception:  # orjson not installed
+    pass
+
+
+@pytest.mark.parametrize("serializer", SERIALIZERS)
+class TestSerializers:
+
+    def test_model(self, serializer, check):
+        body = serializer().dumps(check)
+        assert isinstance(body, bytes)
+        assert json.loads(body) == check.model_dump()
+
+    def test_plain_data(self, serializer):
+        data = {"refresh_token": "abc", "list": [1, 2.5, None, True]}
+        assert json.loads(serializer().dumps(data)) == data
+
+
+def test_default():
+    assert isinstance(default_serializer(), PydanticSerializer)
+
+
+def test_base_not_implemented():
+    with pytest.raises(NotImplementedError):
+        Serializer().dumps({})
@@ -0,0 +1,187 @@
+"""
+Tests for the fawlty.singleflight module
+"""
+import asyncio
+import threading
+import time
+
+import pytest
+
+from fawlty.deadline import deadline
+from fawlty.exceptions import SensuTimeoutError
+from fawlty.singleflight import SingleFlight, AsyncSingleFlight
+
+
+def run_threads(count, target):
+    results = [None] * count
+
+    def work(i):
+        try:
+            results[i] = target()
+        except Exception as err:  # pylint: disable=W0703
+            results[i] = err
+
+    threads = [threading.Thread(target=work, args=(i,)) for i in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    return results
+
+
+class TestSingleFlight:
+
+    def test_coalesces(self):
+        flight = SingleFlight()
+        calls = []
+        release = threading.Event()
+
+        def fetch():
+            calls.append(1)
+            release.wait(1)
+            return ["result"]
+
+        def call():
+            return flight.do("key", fetch, share=list)
+
+        timer = threading.Timer(0.1, release.set)
+        timer.start()
+        results = run_threads(5, call)
+        timer.join()
+
+        assert len(calls) == 1
+        assert sorted(_[1] for _ in results) == [False, True, True, True, True]
+        assert all(_[0] == ["result"] for _ in results)
+        # Every caller was handed its own copy
+        assert len({id(_[0]) for _ in results}) == 5
+        assert flight.stats() == {"calls": 1, "saved": 4, "in_flight": 0}
+
+    def test_alone_not_copied(self):
+        flight = SingleFlight()
+        result = ["result"]
+        assert flight.do("key", lambda: result, share=list) == (result, False)
+        assert flight.do("key", lambda: result, share=list)[0] is result
+        assert flight.stats()["calls"] == 2
+
+    def test_different_keys(self):
+        flight = SingleFlight()
+        barrier = threading.Barrier(3, timeout=1)
+
+        def fetch():
+            barrier.wait()
+            return 1
+
+        results = run_threads(3, lambda: flight.do(threading.get_ident(), fetch))
+        assert results == [(1, False)] * 3
+
+    def test_error_shared(self):
+        flight = SingleFlight()
+        release = threading.Event()
+
+        def fetch():
+            release.wait(1)
+            raise ValueError("failed")
+
+        timer = threading.Timer(0.1, release.set)
+        timer.start()
+        results = run_threads(3, lambda: flight.do("key", fetch))
+        timer.join()
+
+        assert all(isinstance(_, ValueError) for _ in results)
+        assert flight.stats()["in_flight"] == 0
+
+    def test_follower_deadline(self):
+        flight = SingleFlight()
+        started = threading.Event()
+        release = threading.Event()
+
+        def fetch():
+            started.set()
+            release.wait(1)
+            return 1
+
+        leader = threading.Thread(target=flight.do, args=("key", fetch))
+        leader.start()
+        started.wait(1)
+        try:
+            with deadline(0.05):
+                with pytest.raises(SensuTimeoutError):
+                    flight.do("key", fetch)
+        finally:
+            release.set()
+            leader.join()
+
+
+class TestAsyncSingleFlight:
+
+    def test_coalesces(self):
+        flight = AsyncSingleFlight()
+        calls = []
+
+        async def fetch():
+            calls.append(1)
+            await asyncio.sleep(0.05)
+            return ["result"]
+
+        async def run():
+            return await asyncio.gather(*(flight.do("key", fetch, share=list) for _ in range(5)))
+
+        results = asyncio.run(run())
+        assert len(calls) == 1
+        assert sorted(_[1] for _ in results) == [False, True, True, True, True]
+        assert len({id(_[0]) for _ in results}) == 5
+        assert flight.stats() == {"calls": 1, "saved": 4, "in_flight": 0}
+
+    def test_error_shared(self):
+        flight = AsyncSingleFlight()
+
+        async def fetch():
+            await asyncio.sleep(0.01)
+            raise ValueError("failed")
+
+        async def run():
+            return await asyncio.gather(
+                *(flight.do("key", fetch) for _ in range(3)), return_exceptions=True
+            )
+
+        assert all(isinstance(_, ValueError) for _ in asyncio.run(run()))
+
+    def test_leader_cancelled(self):
+        flight = AsyncSingleFlight()
+        calls = []
+
+        async def fetch():
+            calls.append(1)
+            await asyncio.sleep(0.05)
+            return len(calls)
+
+        async def run():
+            leader = asyncio.ensure_future(flight.do("key", fetch))
+            await asyncio.sleep(0)
+            follower = asyncio.ensure_future(flight.do("key", fetch))
+            await asyncio.sleep(0)
+            leader.cancel()
+            return await follower
+
+        # The follower takes over, and makes the call itself
+        assert asyncio.run(run()) == (2, False)
+        assert len(calls) == 2
+
+    def test_follower_deadline(self):
+        flight = AsyncSingleFlight()
+
+        async def fetch():
+            await asyncio.sleep(0.2)
+
+        async def run():
+            leader = asyncio.ensure_future(flight.do("key", fetch))
+            await asyncio.sleep(0)
+            with deadline(0.02):
+                with pytest.raises(SensuTimeoutError):
+                    await flight.do("key", fetch)
+            await leader
+
+        start = time.monotonic()
+        asyncio.run(run())
+        assert time.monotonic() - start < 1
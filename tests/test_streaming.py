@@ -0,0 +1,62 @@
+"""
+Tests for the fawlty.streaming module
+"""
+import io
+import json
+
+import pytest
+
+from fawlty.streaming import iter_json_array, spool, iter_file
+
+
+DATA = [{"id": i, "output": "é" * i, "values": [1.5, None, True]} for i in range(50)] + [12345, "x", [], {}]
+
+
+def chunked(raw, size):
+    return (raw[i:i + size] for i in range(0, len(raw), size))
+
+
+class TestIterJsonArray:
+
+    @pytest.mark.parametrize("size", [1, 3, 7, 64, 100000])
+    def test_chunk_sizes(self, size):
+        raw = json.dumps(DATA).encode()
+        assert list(iter_json_array(chunked(raw, size))) == DATA
+
+    def test_numbers_split(self):
+        numbers = [1.5, -2.25e-3, 6e+20, 1E5, 10, -7, 0.125]
+        raw = b"[1.5, -2.25e-3, 6e+20, 1E5, 10, -7, 0.125]"
+        for split in range(1, len(raw)):
+            assert list(iter_json_array([raw[:split], raw[split:]])) == numbers
+
+    def test_whitespace(self):
+        raw = json.dumps(DATA, indent=4).encode()
+        assert list(iter_json_array(chunked(raw, 5))) == DATA
+
+    def test_empty(self):
+        assert list(iter_json_array([b" [ ", b" ] "])) == []
+
+    def test_incremental(self):
+        def chunks():
+            yield b'[{"a": 1},'
+            raise AssertionError("Read too far")
+
+        assert next(iter_json_array(chunks())) == {"a": 1}
+
+    @pytest.mark.parametrize("raw", [b"{}", b"[1,", b"[1 2]", b'[{"a": ]', b""])
+    def test_invalid(self, raw):
+        with pytest.raises(ValueError):
+            list(iter_json_array([raw]))
+
+
+class TestSpool:
+
+    def test_in_memory(self):
+        spooled = spool([b"abc", b"def"], threshold=100)
+        assert not spooled._rolled
+        assert b"".join(iter_file(spooled, 2)) == b"abcdef"
+
+    def test_rolls_to_disk(self):
+        spooled = spool([b"x" * 60, b"y" * 60], threshold=100)
+        assert spooled._rolled
+        assert b"".join(iter_file(spooled)) == b"x" * 60 + b"y" * 60
@@ -0,0 +1,108 @@
+"""
+Tests for the fawlty.token_cache module
+"""
+import multiprocessing
+import os
+import stat
+import time
+
+import pytest
+
+from fawlty.token_cache import FileTokenCache, FileLock, cache_key, default_directory
+from fawlty.sensu_token import SensuToken
+from fawlty.deadline import deadline
+from fawlty.exceptions import SensuTimeoutError
+
+URL = "https://sensu.example.com:8080"
+
+
+def make_token(access="token", expires_in=600):
+    return SensuToken(access_token=access, refresh_token="refresh", expires_at=int(time.time()) + expires_in)
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return FileTokenCache(str(tmp_path / "tokens"))
+
+
+def hold_lock(path, locked, release):
+    with FileLock(path):
+        locked.set()
+        release.wait(5)
+
+
+class TestCacheKey:
+
+    def test_stable(self):
+        assert cache_key(URL, "basil") == cache_key(URL, "basil")
+        assert len(cache_key(URL, "basil")) == 64
+
+    def test_distinct(self):
+        assert cache_key(URL, "basil") != cache_key(URL, "sybil")
+        assert cache_key(URL, "basil") != cache_key("https://other:8080", "basil")
+
+    def test_default_directory(self, monkeypatch):
+        monkeypatch.setenv("XDG_CACHE_HOME", "/tmp/cache")
+        assert default_directory() == "/tmp/cache/fawlty/tokens"
+
+
+class TestFileTokenCache:
+
+    def test_round_trip(self, cache):
+        cache.store(URL, "basil", make_token())
+        assert cache.load(URL, "basil") == make_token()
+        assert cache.load(URL, "sybil") is None
+
+    def test_permissions(self, cache):
+        cache.store(URL, "basil", make_token())
+        assert stat.S_IMODE(os.stat(cache.directory).st_mode) == 0o700
+        assert stat.S_IMODE(os.stat(cache.path_for(URL, "basil")).st_mode) == 0o600
+        assert os.listdir(cache.directory) == [os.path.basename(cache.path_for(URL, "basil"))]
+
+    def test_expired(self, cache):
+        cache.store(URL, "basil", make_token(expires_in=-10))
+        assert cache.load(URL, "basil") is None
+
+    def test_corrupt(self, cache):
+        with open(cache.path_for(URL, "basil"), "w", encoding="utf-8") as f:
+            f.write("{not json")
+        assert cache.load(URL, "basil") is None
+
+    def test_clear(self, cache):
+        cache.store(URL, "basil", make_token())
+        cache.clear(URL, "basil")
+        cache.clear(URL, "basil")
+        assert cache.load(URL, "basil") is None
+
+
+class TestFileLock:
+
+    def test_excludes_other_processes(self, cache):
+        ctx = multiprocessing.get_context("spawn")
+        locked, release = ctx.Event(), ctx.Event()
+        path = cache.lock(URL, "basil").path
+        process = ctx.Process(target=hold_lock, args=(path, locked, release))
+        process.start()
+        try:
+            assert locked.wait(10)
+            with deadline(0.2):
+                with pytest.raises(SensuTimeoutError):
+                    cache.lock(URL, "basil").acquire()
+        finally:
+            release.set()
+            process.join(10)
+
+        with deadline(5), cache.lock(URL, "basil"):
+            pass
+
+    def test_excludes_threads(self, cache):
+        with cache.lock(URL, "basil"):
+            with deadline(0.1):
+                with pytest.raises(SensuTimeoutError):
+                    cache.lock(URL, "basil").acquire()
+
+    def test_release_twice(self, cache):
+        lock = cache.lock(URL, "basil")
+        lock.acquire()
+        lock.release()
+        lock.release()
@@ -0,0 +1,63 @@
+"""
+Tests for the fawlty.token_refresher module
+"""
+import threading
+import time
+from unittest.mock import patch
+
+from fawlty.token_refresher import TokenRefresher
+from fawlty.sensu_token import SensuToken
+from fawlty.exceptions import SensuAuthError
+
+
+class FakeClient:
+    def __init__(self, expires_in, fail=False):
+        self.token = SensuToken(access_token="t0", refresh_token="r", expires_at=int(time.time()) + expires_in)
+        self.fail = fail
+        self.refreshes = 0
+        self.refreshed = threading.Event()
+
+    def single_flight_refresh(self, stale_token=None):
+        self.refreshes += 1
+        self.refreshed.set()
+        if self.fail:
+            raise SensuAuthError("nope")
+        self.token = SensuToken(access_token=f"t{self.refreshes}", refresh_token="r", expires_at=int(time.time()) + 3600)
+        return True
+
+
+@patch("fawlty.token_refresher.MIN_WAIT", 0.01)
+class TestTokenRefresher:
+
+    def test_refreshes_ahead_of_time(self):
+        # Needs refreshing within the lead time, but not yet by need_refresh()
+        client = FakeClient(expires_in=80)
+        assert not client.token.need_refresh()
+
+        refresher = TokenRefresher(client, lead_time=30)
+        refresher.start()
+        assert refresher.running
+        assert client.refreshed.wait(2)
+        refresher.stop()
+
+        assert not refresher.running
+        assert client.refreshes == 1
+        assert client.token.access_token == "t1"
+
+    def test_not_due(self):
+        client = FakeClient(expires_in=3600)
+        refresher = TokenRefresher(client, lead_time=30)
+        refresher.start()
+        time.sleep(0.05)
+        refresher.stop()
+        assert client.refreshes == 0
+
+    def test_error(self):
+        errors = []
+        client = FakeClient(expires_in=0, fail=True)
+        refresher = TokenRefresher(client, retry_interval=10, on_error=errors.append)
+        refresher.start()
+        assert client.refreshed.wait(2)
+        refresher.stop()
+        assert isinstance(refresher.last_error, SensuAuthError)
+        assert errors == [refresher.last_error]
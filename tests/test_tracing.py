@@ -0,0 +1,189 @@
+"""
+Tests for the fawlty.tracing module
+"""
+import json
+import threading
+import time
+from unittest.mock import patch, MagicMock
+
+import pytest
+
+from fawlty.resources.namespace import Namespace
+from fawlty.sensu_client import SensuClient
+from fawlty.sensu_server import SensuServer
+from fawlty.sensu_token import SensuToken
+from fawlty.tracing import (
+    Tracer, InMemoryExporter, JSONLinesExporter, SpanExporter, start_span, current_span,
+    NO_SPAN, STATUS_ERROR, STATUS_OK
+)
+
+
+@pytest.fixture
+def tracer():
+    return Tracer(InMemoryExporter())
+
+
+@pytest.fixture
+def sensu_client(tracer):
+    client = SensuClient(server=SensuServer(host="localhost"), tracer=tracer)
+    client.token = SensuToken(access_token="token", refresh_token="refresh", expires_at=int(time.time()) + 100)
+    return client
+
+
+def by_name(spans):
+    return {_.name: _ for _ in spans}
+
+
+class TestTracer:
+
+    def test_nesting(self, tracer):
+        with tracer.span("outer", a=1) as outer:
+            assert current_span() is outer
+            with tracer.span("inner") as inner:
+                inner.set_attribute("b", 2)
+        assert current_span() is None
+
+        spans = tracer.exporter.spans
+        assert [_.name for _ in spans] == ["inner", "outer"]
+        assert inner.parent_id == outer.span_id
+        assert inner.trace_id == outer.trace_id
+        assert outer.parent_id is None
+        assert outer.attributes == {"a": 1}
+        assert inner.attributes == {"b": 2}
+        assert outer.duration >= inner.duration >= 0
+        assert outer.status == STATUS_OK
+
+    def test_error(self, tracer):
+        with pytest.raises(ValueError):
+            with tracer.span("failing"):
+                raise ValueError("bad")
+
+        span, = tracer.exporter.spans
+        assert span.status == STATUS_ERROR
+        assert span.error == "ValueError: bad"
+
+    def test_threads_are_separate(self, tracer):
+        seen = []
+        with tracer.span("outer"):
+            thread = threading.Thread(target=lambda: seen.append(current_span()))
+            thread.start()
+            thread.join()
+        assert seen == [None]
+
+    def test_no_tracer(self):
+        with start_span(None, "anything", a=1) as span:
+            span.set_attribute("b", 2)
+        assert span is NO_SPAN
+
+    def test_clear(self, tracer):
+        with tracer.span("one"):
+            pass
+        tracer.exporter.clear()
+        assert tracer.exporter.spans == []
+
+    def test_base_exporter(self):
+        with pytest.raises(NotImplementedError):
+            SpanExporter().export(None)
+
+
+class TestJSONLinesExporter:
+
+    def test_export(self, tmp_path):
+        path = tmp_path / "spans.jsonl"
+        exporter = JSONLinesExporter(str(path))
+        tracer = Tracer(exporter)
+        with tracer.span("outer", resource=Namespace):
+            with tracer.span("inner", size=10):
+                pass
+        exporter.close()
+
+        lines = [json.loads(_) for _ in path.read_text().splitlines()]
+        assert [_["name"] for _ in lines] == ["inner", "outer"]
+        assert lines[0]["parent_id"] == lines[1]["span_id"]
+        assert lines[0]["attributes"] == {"size": 10}
+        assert "Namespace" in lines[1]["attributes"]["resource"]
+        assert lines[1]["status"] == "ok"
+
+
+class TestClientSpans:
+
+    @patch("fawlty.sensu_client.requests.Session.request")
+    def test_get(self, mock_request, sensu_client, tracer):
+        content = b'[{"name": "ns1"}, {"name": "ns2"}]'
+        mock_request.return_value = MagicMock(status_code=200, content=content, headers={})
+
+        assert len(Namespace.get(sensu_client)) == 2
+
+        spans = by_name(tracer.exporter.spans)
+        assert set(spans) == {
+            "fawlty.get", "fawlty.call", "fawlty.attempt", "fawlty.decode", "fawlty.validate"
+        }
+        get = spans["fawlty.get"]
+        assert get.attributes["resource"] == "Namespace"
+        assert get.attributes["count"] == 2
+        assert spans["fawlty.call"].parent_id == get.span_id
+        assert spans["fawlty.call"].attributes["method"] == "GET"
+        assert spans["fawlty.attempt"].parent_id == spans["fawlty.call"].span_id
+        assert spans["fawlty.attempt"].attributes == {"attempt": 1, "status_code": 200}
+        assert spans["fawlty.decode"].attributes["bytes"] == len(content)
+        assert spans["fawlty.decode"].parent_id == get.span_id
+        assert spans["fawlty.validate"].attributes["count"] == 2
+
+    @patch("fawlty.sensu_client.requests.Session.request")
+    def test_create(self, mock_request, sensu_client, tracer):
+        mock_request.return_value = MagicMock(status_code=201)
+        namespace = Namespace(name="ns1")
+        namespace.set_client(sensu_client)
+        namespace.create()
+
+        spans = by_name(tracer.exporter.spans)
+        create = spans["fawlty.create"]
+        assert create.attributes["resource"] == "Namespace"
+        assert spans["fawlty.encode"].attributes == {
+            "resource": "Namespace", "bytes": len(mock_request.call_args.kwargs["data"])
+        }
+        assert spans["fawlty.call"].parent_id == create.span_id
+        assert spans["fawlty.call"].attributes["bytes_out"] == spans["fawlty.encode"].attributes["bytes"]
+
+    @patch("fawlty.sensu_client.requests.Session.request")
+    def test_refresh_nested(self, mock_request, sensu_client, tracer):
+        sensu_client.token = SensuToken(access_token="old", refresh_token="r", expires_at=int(time.time()) + 10)
+        mock_request.return_value = MagicMock(
+            status_code=200, json=lambda: {"access_token": "new", "refresh_token": "r", "expires_at": int(time.time()) + 600}
+        )
+        sensu_client._make_call("GET", "/test")
+
+        spans = tracer.exporter.spans
+        outer = [_ for _ in spans if _.name == "fawlty.call" and _.parent_id is None][0]
+        refresh = by_name(spans)["fawlty.refresh"]
+        assert refresh.parent_id == outer.span_id
+
+    @patch("fawlty.sensu_client.requests.Session.request")
+    def test_login(self, mock_request, sensu_client, tracer):
+        mock_request.return_value = MagicMock(
+            status_code=200, json=lambda: {"access_token": "a", "refresh_token": "r", "expires_at": int(time.time()) + 600}
+        )
+        sensu_client.login("user", "pass")
+        span, = tracer.exporter.spans
+        assert span.name == "fawlty.login"
+        assert span.attributes == {"username": "user", "status_code": 200}
+
+    @patch("fawlty.sensu_client.SensuClient._make_call")
+    def test_prefetch_keeps_parent(self, mock_make_call, sensu_client, tracer):
+        parents = []
+
+        def page(*args, **kwargs):
+            parents.append(current_span())
+            headers = {"Sensu-Continue": "next"} if len(parents) < 3 else {}
+            return MagicMock(status_code=200, content=b'[{"name": "a"}]', headers=headers)
+
+        mock_make_call.side_effect = page
+        with tracer.span("job") as job:
+            assert len(list(sensu_client.resource_iter(Namespace, "/ns", page_size=1))) == 3
+        assert parents == [job, job, job]
+
+    @patch("fawlty.sensu_client.requests.Session.request")
+    def test_disabled(self, mock_request, sensu_client):
+        sensu_client.tracer = None
+        mock_request.return_value = MagicMock(status_code=200, content=b'[]', headers={})
+        assert Namespace.get(sensu_client) == []